@@ -0,0 +1,115 @@
+import logging
+import re
+import time
+from typing import List
+
+logger = logging.getLogger(__name__)
+
+# The address patterns _extract_addresses has always used, compiled once
+STREET_ADDRESS_RE = re.compile(
+    r'\b\d{1,5}\s+[A-Za-z0-9\s,.-]+(?:Street|St|Avenue|Ave|Road|Rd|Drive|Dr|Boulevard|Blvd)[A-Za-z0-9\s,.-]*\b'
+)
+POSTCODE_ADDRESS_RE = re.compile(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*,\s*[A-Z]{2,3}\s*\d{4,5}\b')
+CITY_COUNTRY_RE = re.compile(r'\b[A-Z][a-z]+\s*,\s*[A-Z][a-z]+(?:\s*,\s*[A-Z][a-z]+)?\b')
+ADDRESS_PATTERNS = [STREET_ADDRESS_RE, POSTCODE_ADDRESS_RE, CITY_COUNTRY_RE]
+
+# Prefilter tokens: every street match contains a street keyword, every postcode match ends in one
+_STREET_KEYWORD_RE = re.compile(r'Street|St|Avenue|Ave|Road|Rd|Drive|Dr|Boulevard|Blvd')
+_STREET_START_RE = re.compile(r'\b\d{1,5}\s+')
+_POSTCODE_TOKEN_RE = re.compile(r',\s*[A-Z]{2,3}\s*\d{4,5}\b')
+# Superset of the characters a street match can contain; matches never cross these runs
+_STREET_RUN_RE = re.compile(r'[\dA-Za-z\s,.-]+')
+
+
+class AddressMatcher:
+    """Bounded-time matcher returning the same matches as re.findall with ADDRESS_PATTERNS
+
+    Street addresses are only attempted inside character runs that contain a
+    street keyword, starting at digit prefixes before the last keyword, so each
+    run is scanned a bounded number of times instead of backtracking from every
+    digit. Postcode addresses are only attempted in a window before each
+    postcode token. A size budget caps how much text is examined and a time
+    budget stops matching between regex calls.
+    """
+
+    def __init__(self, max_matches: int = 3, max_chars: int = 1_000_000,
+                 max_seconds: float = 0.5, postcode_window: int = 300):
+        self.max_matches = max_matches
+        self.max_chars = max_chars
+        self.max_seconds = max_seconds
+        self.postcode_window = postcode_window
+
+    def find_all(self, text: str) -> List[List[str]]:
+        """First `max_matches` matches of each address pattern, in pattern order"""
+        if len(text) > self.max_chars:
+            logger.debug(f"Address matching limited to first {self.max_chars} of {len(text)} characters")
+            text = text[:self.max_chars]
+        deadline = time.perf_counter() + self.max_seconds
+        return [
+            self._street_addresses(text, deadline),
+            self._postcode_addresses(text, deadline),
+            self._city_country(text, deadline),
+        ]
+
+    def _out_of_time(self, deadline: float) -> bool:
+        if time.perf_counter() > deadline:
+            logger.debug("Address matching stopped at time budget")
+            return True
+        return False
+
+    def _street_addresses(self, text: str, deadline: float) -> List[str]:
+        matches = []
+        if not _STREET_KEYWORD_RE.search(text):
+            return matches
+
+        for run in _STREET_RUN_RE.finditer(text):
+            run_start, run_end = run.span()
+            keywords = [m.start() for m in _STREET_KEYWORD_RE.finditer(text, run_start, run_end)]
+            if not keywords:
+                continue
+            # Only starts whose digit prefix ends before the last keyword can match
+            last_keyword = keywords[-1]
+            pos = run_start
+            while pos < last_keyword:
+                if self._out_of_time(deadline):
+                    return matches
+                start = _STREET_START_RE.search(text, pos, last_keyword)
+                if not start:
+                    break
+                # endpos one past the run keeps the real right-hand context for \b
+                match = STREET_ADDRESS_RE.match(text, start.start(), run_end + 1)
+                if match:
+                    matches.append(match.group())
+                    if len(matches) >= self.max_matches:
+                        return matches
+                    pos = match.end()
+                else:
+                    pos = start.start() + 1
+        return matches
+
+    def _postcode_addresses(self, text: str, deadline: float) -> List[str]:
+        matches = []
+        last_end = 0
+        for token in _POSTCODE_TOKEN_RE.finditer(text):
+            if token.start() < last_end:
+                continue
+            if self._out_of_time(deadline):
+                break
+            window_start = max(last_end, token.start() - self.postcode_window)
+            match = POSTCODE_ADDRESS_RE.search(text, window_start, token.end() + 1)
+            if match:
+                matches.append(match.group())
+                if len(matches) >= self.max_matches:
+                    break
+                last_end = match.end()
+        return matches
+
+    def _city_country(self, text: str, deadline: float) -> List[str]:
+        matches = []
+        if ',' not in text:
+            return matches
+        for match in CITY_COUNTRY_RE.finditer(text):
+            matches.append(match.group())
+            if len(matches) >= self.max_matches or self._out_of_time(deadline):
+                break
+        return matches
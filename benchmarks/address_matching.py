@@ -0,0 +1,89 @@
+"""Worst-case timing of address extraction: legacy re.findall vs AddressMatcher
+
+Usage:
+    python -m benchmarks.address_matching
+    python -m benchmarks.address_matching --corpus-dir pages/ --from-cache .http_cache
+
+Adversarial inputs make the legacy patterns backtrack quadratically; the
+matcher should stay roughly linear and never exceed its time budget. Real
+pages (if given) are checked for identical matches.
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from address_matcher import ADDRESS_PATTERNS, AddressMatcher  # noqa: E402
+from benchmarks.parser_backends import load_corpus  # noqa: E402
+from dom_index import PageIndex  # noqa: E402
+from parsers import parse_html  # noqa: E402
+
+# Inputs that trigger backtracking in the legacy patterns, by name
+ADVERSARIAL = {
+    'street keyword then digits': lambda n: 'Main St ' + '1 ' * (n // 2),
+    'capitalised words, no comma': lambda n: 'Aaa ' * (n // 4),
+    'digits and commas, no keyword': lambda n: '12 a, ' * (n // 6),
+    'address-dense text': lambda n: '221 Baker Street, London, UK. ' * (n // 30),
+}
+
+
+def legacy_find_all(text: str):
+    return [re.findall(pattern, text)[:3] for pattern in ADDRESS_PATTERNS]
+
+
+def timed(func, text: str):
+    start = time.perf_counter()
+    result = func(text)
+    return time.perf_counter() - start, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark address extraction worst cases')
+    parser.add_argument('--sizes', default='2000,8000,32000,128000,512000',
+                        help='Comma-separated adversarial input sizes in characters')
+    parser.add_argument('--legacy-max', type=int, default=16000,
+                        help='Largest input the legacy findall is run on (it is quadratic)')
+    parser.add_argument('--corpus-dir', help='Directory of saved .html pages to check for parity')
+    parser.add_argument('--from-cache', help='HTTP cache directory to read pages from')
+    args = parser.parse_args(argv)
+
+    matcher = AddressMatcher()
+    sizes = [int(size) for size in args.sizes.split(',')]
+
+    print(f"\n{'input':<32} {'chars':>8} {'legacy ms':>11} {'matcher ms':>11} {'parity':>7}")
+    worst = 0.0
+    for name, make in ADVERSARIAL.items():
+        for size in sizes:
+            text = make(size)
+            matcher_time, got = timed(matcher.find_all, text)
+            worst = max(worst, matcher_time)
+            if len(text) <= args.legacy_max:
+                legacy_time, expected = timed(legacy_find_all, text)
+                legacy = f"{legacy_time * 1000:>11.1f}"
+                parity = 'yes' if got == expected else 'NO'
+            else:
+                legacy, parity = f"{'skipped':>11}", '-'
+            print(f"{name:<32} {len(text):>8} {legacy} {matcher_time * 1000:>11.1f} {parity:>7}")
+    print(f"\nWorst matcher time {worst * 1000:.1f} ms (budget {matcher.max_seconds * 1000:.0f} ms)")
+
+    pages = load_corpus(args.corpus_dir, args.from_cache) if args.corpus_dir or args.from_cache else []
+    if pages:
+        legacy_total = matcher_total = 0.0
+        same = 0
+        for _, body in pages:
+            text = PageIndex(parse_html(body, 'lxml')).get_text()
+            legacy_time, expected = timed(legacy_find_all, text)
+            matcher_time, got = timed(matcher.find_all, text)
+            legacy_total += legacy_time
+            matcher_total += matcher_time
+            same += got == expected
+        print(f"Real pages: {len(pages)}, legacy {legacy_total * 1000:.1f} ms, "
+              f"matcher {matcher_total * 1000:.1f} ms, identical results {same}/{len(pages)}")
+    return 0 if worst <= matcher.max_seconds * 1.5 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
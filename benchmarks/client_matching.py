@@ -0,0 +1,102 @@
+"""Client name matching: legacy capitalised-words regex vs OrganizationGazetteer
+
+Usage:
+    python -m benchmarks.client_matching
+    python -m benchmarks.client_matching --names 200000 --organizations orgs.txt
+
+Builds a dictionary of synthetic organization names (or loads a real one),
+then times one scan of testimonial-style text of growing size with each
+approach. The gazetteer scan should stay linear in the text and not depend
+on the dictionary size.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from client_matcher import CLIENT_NAME_RE, CLIENT_SKIP_RE, OrganizationGazetteer  # noqa: E402
+
+PREFIXES = ('Green', 'Blue', 'North', 'Solar', 'Nordic', 'Grid', 'Volt', 'Terra', 'Aero', 'Hydro', 'Clean', 'Bright')
+STEMS = ('Power', 'Energy', 'Systems', 'Mobility', 'Storage', 'Works', 'Capital', 'Networks', 'Dynamics', 'Labs')
+SUFFIXES = ('Ltd', 'Inc', 'GmbH', 'AG', 'SA', 'Group', 'Holdings', 'Partners')
+PROSE = ('working with the team helped us cut costs and deliver the project on time across our sites in '
+         'the region while the platform scaled with demand').split()
+
+
+def synthetic_organizations(count: int, seed: int = 0) -> list:
+    """`count` distinct names like 'Nordic Grid Storage 481 Ltd', each with a short alias"""
+    rng = random.Random(seed)
+    lines = []
+    for i in range(count):
+        name = f"{rng.choice(PREFIXES)} {rng.choice(STEMS)} {i} {rng.choice(SUFFIXES)}"
+        lines.append(f"{name}|{name.rsplit(' ', 1)[0]}")
+    return lines
+
+
+def testimonial_text(words: int, names: list, seed: int = 0) -> str:
+    """Prose with a known organization roughly every 40 words"""
+    rng = random.Random(seed)
+    out = []
+    while len(out) < words:
+        out.extend(rng.choice(PROSE) for _ in range(40))
+        out.append(rng.choice(names).split('|')[0])
+        out.append('Thanks to Ocean Freight Corp.')
+    return ' '.join(out)
+
+
+def legacy(text: str) -> list:
+    return [name for name in CLIENT_NAME_RE.findall(text)
+            if 3 <= len(name) <= 50 and not CLIENT_SKIP_RE.search(name)]
+
+
+def timed(func, text: str, repeat: int = 3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(text)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark client name matching')
+    parser.add_argument('--names', type=int, default=100000, help='Synthetic organizations in the dictionary')
+    parser.add_argument('--organizations', help='Use this dictionary file instead of synthetic names')
+    parser.add_argument('--sizes', default='500,5000,50000', help='Comma-separated text sizes in words')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.organizations
+        if not path:
+            path = os.path.join(tmp, 'organizations.txt')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write('\n'.join(synthetic_organizations(args.names)) + '\n')
+        with open(path, encoding='utf-8') as f:
+            names = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        gazetteer = OrganizationGazetteer(path)
+        build = time.perf_counter() - start
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+    print(f"\nDictionary: {len(names)} organizations, {len(gazetteer)} names and aliases, "
+          f"built in {build:.2f}s, {memory / 1024 / 1024:.1f} MB")
+
+    print(f"\n{'words':>8} {'legacy ms':>10} {'legacy found':>13} {'gazetteer ms':>13} {'gazetteer found':>16}")
+    for size in (int(size) for size in args.sizes.split(',')):
+        text = testimonial_text(size, names)
+        legacy_time, legacy_found = timed(legacy, text)
+        gazetteer_time, found = timed(gazetteer.find, text)
+        print(f"{size:>8} {legacy_time * 1000:>10.2f} {len(set(legacy_found)):>13} "
+              f"{gazetteer_time * 1000:>13.2f} {len(found):>16}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
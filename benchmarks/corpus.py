@@ -0,0 +1,143 @@
+"""Site corpora for the offline benchmarks
+
+A site is a dict of URL path -> HTML bytes ('/' is the homepage). Sites come
+from a directory of saved pages, a previous run's HTTP cache, or are
+generated synthetically at any size.
+"""
+import glob
+import json
+import os
+import random
+import sqlite3
+from typing import Dict, List
+from urllib.parse import urlsplit
+
+Site = Dict[str, bytes]
+
+SECTORS = ['Solar Energy', 'EV Charging', 'Hydrogen', 'AI', 'Battery Storage']
+CITIES = [('Berlin', 'Germany'), ('Amsterdam', 'Netherlands'), ('London', 'UK'), ('Austin', 'USA'),
+          ('Lyon', 'France'), ('Oslo', 'Norway'), ('Madrid', 'Spain'), ('Toronto', 'Canada')]
+WORDS = ('clean energy grid storage solar wind hydrogen charging network carbon efficiency platform '
+         'customers projects industrial transition capacity deployment research partners').split()
+
+
+def _sentence(rng: random.Random, words: int = 14) -> str:
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+def _address(rng: random.Random) -> str:
+    city, country = rng.choice(CITIES)
+    return f"{rng.randint(1, 999)} {rng.choice(['Main', 'Harbour', 'Station', 'Park'])} Street, {city}, {country}"
+
+
+def _json_ld(data: Dict) -> str:
+    return f'<script type="application/ld+json">{json.dumps(data)}</script>'
+
+
+def _structured_markup(i: int, name: str, seed: int):
+    """JSON-LD for the homepage (Organization) and news page (NewsArticle list) of site i"""
+    # A separate generator, so the rest of the site is the same with or without it
+    rng = random.Random(f"{seed}:{i}:structured")
+    city, country = rng.choice(CITIES)
+    organization = {
+        '@context': 'https://schema.org', '@type': 'Organization', 'name': name,
+        'description': f"{name} {_sentence(rng, 16)}",
+        'address': {'@type': 'PostalAddress', 'streetAddress': f"{rng.randint(1, 999)} Harbour Street",
+                    'addressLocality': city, 'addressCountry': country},
+        'location': [{'@type': 'Place', 'address': _address(rng)} for _ in range(rng.randint(0, 2))],
+    }
+    articles = {
+        '@context': 'https://schema.org', '@type': 'ItemList',
+        'itemListElement': [{'@type': 'NewsArticle', 'headline': f"{name} {_sentence(rng, 7)}",
+                             'datePublished': f"2024-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}T09:00:00Z",
+                             'url': f"/news/{n}", 'description': _sentence(rng, 30)} for n in range(8)],
+    }
+    return _json_ld(organization), _json_ld(articles)
+
+
+def synthetic_site(i: int, page_kb: int = 30, seed: int = 0, structured: bool = False) -> Site:
+    """Homepage, contact page and news page for one made-up company, optionally with JSON-LD"""
+    rng = random.Random(f"{seed}:{i}")
+    name = f"Company{i}"
+    filler = []
+    while sum(len(p) for p in filler) < page_kb * 1024:
+        filler.append(f"<section class=\"feature\"><h2>{_sentence(rng, 4)}</h2>"
+                      f"<p>{' '.join(_sentence(rng) for _ in range(6))}</p></section>")
+    articles = ''.join(
+        f"<div class=\"news-item\"><h3>{name} {_sentence(rng, 6)}</h3>"
+        f"<span>{rng.choice(['Jan', 'Mar', 'Jun', 'Oct'])} {rng.randint(1, 28)}, {rng.randint(2019, 2024)}</span>"
+        f"<p>{_sentence(rng, 20)}</p><a href=\"/news/{n}\">Read more</a></div>" for n in range(rng.randint(0, 4)))
+    logos = ''.join(f'<img alt="Partner {rng.randint(1, 500)} Energy" src="l.png">' for _ in range(rng.randint(0, 6)))
+    meta = (f'<meta name="description" content="{name} {_sentence(rng, 16)}">' if rng.random() < 0.7 else '')
+    home_ld, news_ld = _structured_markup(i, name, seed) if structured else ('', '')
+    home = (
+        f"<html><head><title>{name} | {rng.choice(SECTORS)}</title>{meta}{home_ld}</head><body>"
+        f"<nav><a href=\"/\">Home</a><a href=\"/about\">About</a><a href=\"/contact\">Contact</a>"
+        f"<a href=\"/news\">News</a><a href=\"mailto:info@company{i}.example\">Contact email</a>"
+        f"<a href=\"https://twitter.example/company{i}\">Media</a></nav>"
+        f"<main><p>{name} {_sentence(rng, 20)}</p></main>"
+        f"<div class=\"clients\">{logos}</div>"
+        f"<section class=\"testimonials\"><p>Working with {name} helped Green Power Ltd and Blue Grid Inc.</p></section>"
+        f"{''.join(filler)}{articles}<footer><p>Visit us at {_address(rng)}.</p>"
+        f"<p>Copyright {name}. All rights reserved.</p></footer></body></html>"
+    )
+    contact = (f"<html><head><title>Contact {name}</title></head><body><h1>Offices</h1>"
+               + ''.join(f"<p>{'Headquarters: ' if n == 0 else ''}{_address(rng)}</p>" for n in range(rng.randint(1, 4)))
+               + "</body></html>")
+    news = (f"<html><head><title>{name} News</title>{news_ld}</head><body>"
+            + ''.join(f"<article><h2>{name} {_sentence(rng, 7)}</h2><time>2024-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}</time>"
+                      f"<p>{_sentence(rng, 30)}</p><a href=\"/news/{n}\">More</a></article>" for n in range(8))
+            + "</body></html>")
+    return {'/': home.encode(), '/contact': contact.encode(), '/about': contact.encode(), '/news': news.encode()}
+
+
+def synthetic_corpus(count: int, page_kb: int = 30, large_every: int = 0, large_kb: int = 2000,
+                     seed: int = 0, structured_rate: float = 0.0) -> List[Site]:
+    """`count` synthetic sites; every `large_every`-th homepage is padded to `large_kb`
+
+    A `structured_rate` share of the sites embed schema.org JSON-LD.
+    """
+    chooser = random.Random(f"{seed}:structured")
+    return [synthetic_site(i, large_kb if large_every and i % large_every == large_every - 1 else page_kb, seed,
+                           structured=chooser.random() < structured_rate)
+            for i in range(count)]
+
+
+def load_corpus_dir(corpus_dir: str) -> List[Site]:
+    """Sites saved as <corpus_dir>/<site>/index.html, contact.html, news.html, ..."""
+    sites = []
+    for site_dir in sorted(d for d in glob.glob(os.path.join(corpus_dir, '*')) if os.path.isdir(d)):
+        site = {}
+        for path in glob.glob(os.path.join(site_dir, '*.htm*')):
+            stem = os.path.splitext(os.path.basename(path))[0]
+            with open(path, 'rb') as f:
+                site['/' if stem == 'index' else f"/{stem}"] = f.read()
+        if '/' in site:
+            sites.append(site)
+    return sites
+
+
+def load_cache_corpus(cache_dir: str) -> List[Site]:
+    """Sites recorded in an HTTP cache, with absolute links to the site made relative"""
+    conn = sqlite3.connect(os.path.join(cache_dir, 'responses.sqlite'))
+    rows = conn.execute('SELECT url, body FROM responses ORDER BY url').fetchall()
+    conn.close()
+
+    by_host: Dict[str, Site] = {}
+    for url, body in rows:
+        parts = urlsplit(url)
+        path = parts.path.rstrip('/') or '/'
+        by_host.setdefault(parts.hostname or '', {})[path + (f"?{parts.query}" if parts.query else '')] = body
+
+    sites = []
+    for host, site in sorted(by_host.items()):
+        if '/' not in site:
+            continue
+        bare = host[4:] if host.startswith('www.') else host
+        origins = [f"{scheme}://{prefix}{bare}".encode() for scheme in ('https', 'http') for prefix in ('www.', '')]
+        for path, body in site.items():
+            for origin in origins:
+                body = body.replace(origin, b'')
+            site[path] = body
+        sites.append(site)
+    return sites
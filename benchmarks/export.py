@@ -0,0 +1,141 @@
+"""Export time and peak memory for synthetic record sets
+
+Usage:
+    python -m benchmarks.export --sizes 1000,10000,100000
+
+Each exporter runs in its own subprocess reading records from a JSONL file,
+so peak RSS reflects only that exporter. 'legacy' is the previous
+DataFrame + pd.ExcelWriter implementation (needs pandas). 'sqlite' upserts
+every record into a ResultStore one company at a time, as a run does;
+'sqlite-excel' times the Excel export read back from such a store.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from checkpoint import JsonlCheckpoint  # noqa: E402
+from exporters import record_tables, write_columnar, write_excel  # noqa: E402
+from result_store import ResultStore  # noqa: E402
+
+EXPORTERS = ['legacy', 'excel', 'parquet', 'arrow', 'sqlite', 'sqlite-excel']
+
+
+def synthetic_record(i: int) -> dict:
+    """A company record shaped like scrape_company_enhanced output"""
+    return {
+        'company_id': i,
+        'company_name': f"Company {i}",
+        'company_website': f"https://company{i}.example.com/",
+        'sector': ['Solar Energy', 'EV Charging', 'Hydrogen Storage', 'Biofuels'][i % 4],
+        'description': f"Company {i} develops clean energy technology for industrial customers " * 3,
+        'offices': [{'location': f"{j * 100 + i % 97} Main Street, City {j}", 'is_hq': j == 0,
+                     'address': f"{j * 100 + i % 97} Main Street, City {j}"} for j in range(3)],
+        'clients': [f"Client {i % 500} {j}" for j in range(5)],
+        'news': [{'title': f"Company {i} announces milestone {j}", 'date': '2024-01-15',
+                  'url': f"https://company{i}.example.com/news/{j}",
+                  'summary': "Summary of the announcement with a few sentences of text. " * 3} for j in range(4)],
+        'scrape_date': '2024-01-15T12:00:00',
+        'data_quality': 'Excellent',
+    }
+
+
+def legacy_export(records_path: str, filename: str):
+    """The former save_to_excel_enhanced: all records in memory, one DataFrame per sheet"""
+    import pandas as pd
+
+    with open(records_path, encoding='utf-8') as f:
+        scraped_data = [json.loads(line) for line in f]
+    with pd.ExcelWriter(filename, engine='openpyxl') as writer:
+        pd.DataFrame([{k: d[k] for k in ('company_id', 'company_name', 'company_website', 'sector',
+                                         'description', 'data_quality', 'scrape_date')}
+                      for d in scraped_data]).to_excel(writer, sheet_name='Companies', index=False)
+        pd.DataFrame([{'company_id': d['company_id'], 'office_id': f"{d['company_id']}_office_{i+1}",
+                       'location': o['location'], 'address': o['address'], 'is_headquarters': o['is_hq']}
+                      for d in scraped_data for i, o in enumerate(d['offices'])]
+                     ).to_excel(writer, sheet_name='Offices', index=False)
+        pd.DataFrame([{'company_id': d['company_id'], 'client_id': f"{d['company_id']}_client_{i+1}",
+                       'client_name': c} for d in scraped_data for i, c in enumerate(d['clients'])]
+                     ).to_excel(writer, sheet_name='Clients', index=False)
+        pd.DataFrame([{'company_id': d['company_id'], 'news_id': f"{d['company_id']}_news_{i+1}",
+                       'news_title': n['title'], 'news_date': n['date'], 'news_url': n['url'],
+                       'news_summary': n['summary']} for d in scraped_data for i, n in enumerate(d['news'])]
+                     ).to_excel(writer, sheet_name='News', index=False)
+
+
+def run_one(exporter: str, records_path: str, out_dir: str):
+    """Run a single exporter in this process and print seconds and peak RSS as JSON"""
+    checkpoint = JsonlCheckpoint(records_path)
+    if exporter == 'sqlite-excel':
+        store = ResultStore(os.path.join(out_dir, 'results.sqlite'))
+        for record in checkpoint.iter_records():
+            store.append(record)
+    start = time.perf_counter()
+    if exporter == 'sqlite':
+        store = ResultStore(os.path.join(out_dir, 'results.sqlite'))
+        for record in checkpoint.iter_records():
+            store.append(record)
+        store.finish()
+    elif exporter == 'sqlite-excel':
+        write_excel(store.table_rows, os.path.join(out_dir, 'store.xlsx'))
+    elif exporter == 'legacy':
+        legacy_export(records_path, os.path.join(out_dir, 'legacy.xlsx'))
+    elif exporter == 'excel':
+        write_excel(record_tables(checkpoint.iter_records), os.path.join(out_dir, 'stream.xlsx'))
+    else:
+        write_columnar(record_tables(checkpoint.iter_records), os.path.join(out_dir, exporter), exporter)
+    elapsed = time.perf_counter() - start
+    # ru_maxrss is kilobytes on Linux
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps({'seconds': elapsed, 'peak_mb': peak_mb}))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark Excel/Parquet/Arrow exports')
+    parser.add_argument('--sizes', default='1000,10000,100000', help='Comma-separated company counts')
+    parser.add_argument('--exporters', default=','.join(EXPORTERS), help='Comma-separated exporters to run')
+    parser.add_argument('--legacy-max', type=int, default=10000, help='Largest size the legacy exporter runs on')
+    parser.add_argument('--run-one', nargs=3, metavar=('EXPORTER', 'RECORDS', 'OUT_DIR'), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.run_one:
+        run_one(*args.run_one)
+        return 0
+
+    exporters = args.exporters.split(',')
+    print(f"\n{'companies':>10} {'exporter':<12} {'seconds':>9} {'peak RSS MB':>12} {'output MB':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in (int(s) for s in args.sizes.split(',')):
+            records_path = os.path.join(tmp, f"records_{size}.jsonl")
+            with open(records_path, 'w', encoding='utf-8') as f:
+                for i in range(size):
+                    f.write(json.dumps(synthetic_record(i)) + '\n')
+
+            for exporter in exporters:
+                if exporter == 'legacy' and size > args.legacy_max:
+                    print(f"{size:>10} {exporter:<12} {'skipped':>9}")
+                    continue
+                out_dir = os.path.join(tmp, f"{exporter}_{size}")
+                os.makedirs(out_dir)
+                result = subprocess.run([sys.executable, '-m', 'benchmarks.export', '--run-one',
+                                         exporter, records_path, out_dir],
+                                        cwd=ROOT, capture_output=True, text=True)
+                if result.returncode != 0:
+                    print(f"{size:>10} {exporter:<12} failed: {result.stderr.strip().splitlines()[-1]}")
+                    continue
+                stats = json.loads(result.stdout.strip().splitlines()[-1])
+                output_mb = sum(os.path.getsize(os.path.join(d, name))
+                                for d, _, names in os.walk(out_dir) for name in names) / 1024 / 1024
+                print(f"{size:>10} {exporter:<12} {stats['seconds']:>9.2f} {stats['peak_mb']:>12.1f} {output_mb:>10.1f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
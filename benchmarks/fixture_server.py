@@ -0,0 +1,149 @@
+"""Local HTTP server that replays a site corpus with injected latency and faults
+
+Each site gets its own loopback address (127.0.x.y, which Linux routes to
+the loopback interface without configuration), so per-host politeness and
+on-site link checks behave as they do against real websites.
+"""
+import http.server
+import multiprocessing
+import random
+import threading
+import time
+from typing import Dict, List
+
+from benchmarks.corpus import Site
+
+
+class FaultProfile:
+    """Latency, jitter, error rate, down sites and slow-drip settings for served responses"""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 drip_rate: float = 0.0, drip_bytes_per_sec: int = 64 * 1024, seed: int = 0,
+                 down_rate: float = 0.0, retry_after: int = 1):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.down_rate = down_rate
+        self.retry_after = retry_after
+        self.drip_rate = drip_rate
+        self.drip_bytes_per_sec = drip_bytes_per_sec
+        self.seed = seed
+
+
+def site_host(i: int) -> str:
+    """Loopback address serving site i"""
+    return f"127.0.{i // 254}.{i % 254 + 1}"
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    sites: Dict[str, Site] = {}
+    faults = FaultProfile()
+    _attempts: Dict[str, int] = {}
+    _lock = threading.Lock()
+
+    def do_GET(self):
+        host = (self.headers.get('Host') or '').rsplit(':', 1)[0]
+        path = self.path.split('#')[0].rstrip('/') or '/'
+        key = f"{host}{path}"
+        with self._lock:
+            attempt = self._attempts[key] = self._attempts.get(key, 0) + 1
+        # Decisions depend only on the seed, URL and attempt number, so runs are reproducible
+        rng = random.Random(f"{self.faults.seed}|{key}|{attempt}")
+
+        time.sleep(max(0.0, self.faults.latency + rng.uniform(-self.faults.jitter, self.faults.jitter)))
+
+        site = self.sites.get(host, {})
+        body = site.get(path)
+        if body is None and path.startswith('/news/'):
+            body = site.get('/news')
+        # A down site fails every request, whatever the attempt
+        down = random.Random(f"{self.faults.seed}|{host}").random() < self.faults.down_rate
+        if down or rng.random() < self.faults.error_rate:
+            status = 503 if down else rng.choice([429, 500, 502, 503])
+            self._respond(status, b'<html><body>Server error</body></html>',
+                          retry_after=self.faults.retry_after if status in (429, 503) else None)
+        elif body is None:
+            self._respond(404, b'<html><body>Not found</body></html>')
+        else:
+            self._respond(200, body, drip=rng.random() < self.faults.drip_rate)
+
+    def _respond(self, status: int, body: bytes, drip: bool = False, retry_after: int = None):
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        if retry_after is not None:
+            self.send_header('Retry-After', str(retry_after))
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if not drip:
+            self.wfile.write(body)
+            return
+        chunk = 4096
+        for start in range(0, len(body), chunk):
+            self.wfile.write(body[start:start + chunk])
+            self.wfile.flush()
+            time.sleep(chunk / self.faults.drip_bytes_per_sec)
+
+    def log_message(self, *args):
+        pass
+
+
+class _Server(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients hang up early on purpose (size caps, timeouts); that is not a server error
+        pass
+
+
+def _serve(sites: Dict[str, Site], faults: FaultProfile, ready):
+    _Handler.sites = sites
+    _Handler.faults = faults
+    server = _Server(('', 0), _Handler)
+    ready.put(server.server_address[1])
+    server.serve_forever()
+
+
+class FixtureServer:
+    """Serve sites from a separate process so the server does not compete for the GIL
+
+    Usage:
+        with FixtureServer(sites, FaultProfile(latency=0.05)) as server:
+            urls = server.homepages()
+    """
+
+    def __init__(self, sites: List[Site], faults: FaultProfile = None):
+        self.sites = sites
+        self.faults = faults or FaultProfile()
+        self.port = None
+        self._process = None
+
+    def start(self):
+        context = multiprocessing.get_context('spawn')
+        ready = context.Queue()
+        hosted = {site_host(i): site for i, site in enumerate(self.sites)}
+        self._process = context.Process(target=_serve, args=(hosted, self.faults, ready), daemon=True)
+        self._process.start()
+        self.port = ready.get(timeout=60)
+        return self
+
+    def stop(self):
+        if self._process:
+            self._process.terminate()
+            self._process.join()
+            self._process = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def url(self, i: int, path: str = '/') -> str:
+        return f"http://{site_host(i)}:{self.port}{path}"
+
+    def homepages(self) -> List[str]:
+        return [self.url(i) for i in range(len(self.sites))]
+
+    def page_urls(self) -> List[str]:
+        return [self.url(i, path) for i, site in enumerate(self.sites) for path in site]
@@ -0,0 +1,105 @@
+"""Memory held per in-flight company and per finished record
+
+Usage:
+    python -m benchmarks.memory
+    python -m benchmarks.memory --parser html.parser --in-flight 64 --page-kb 120
+    python -m benchmarks.memory --max-kb-per-company 300
+
+Parses and indexes the homepage of `--in-flight` synthetic companies and
+keeps them all alive, as a busy worker does, then runs every extractor on
+them. tracemalloc reports what is held once they are indexed and the
+peak through extraction, per company; the run fails (exit status 1) when
+the peak goes over `--max-kb-per-company`. Then `--records` finished
+records are held as dicts and as CompanyRecord objects to compare sizes.
+"""
+import argparse
+import gc
+import logging
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import synthetic_corpus  # noqa: E402
+from benchmarks.export import synthetic_record  # noqa: E402
+from frontier import canonicalize_url  # noqa: E402
+from main import EnhancedCompanyScraper  # noqa: E402
+from records import CompanyRecord  # noqa: E402
+
+KB = 1024
+# Peak bytes per in-flight company allowed by this benchmark and tests/test_memory.py
+MAX_KB_PER_COMPANY = 400
+
+
+def traced(build):
+    """(result, bytes held afterwards, peak bytes) of calling build()"""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, held, peak
+
+
+def in_flight(scraper: EnhancedCompanyScraper, sites) -> int:
+    """Index every homepage while holding all of them, then extract each company; returns bytes held once indexed"""
+    held = []
+    for i, site in enumerate(sites):
+        website = f"https://site{i}.example/"
+        pages = {canonicalize_url(website.rstrip('/') + path): ({'content-type': 'text/html'}, body)
+                 for path, body in site.items()}
+        soup = scraper._parse_html(website, *pages[canonicalize_url(website)])
+        held.append((i, website, scraper._index_page(soup), pages))
+        del soup
+    indexed = tracemalloc.get_traced_memory()[0]
+    records = []
+    for i, website, page, pages in held:
+        company = {'id': i, 'name': f"Site {i}", 'website': website, 'sector': 'Solar Energy', 'expected_hq': 'USA'}
+        records.append(scraper.extract_company(company, page,
+                                               lambda url, pages=pages: scraper._prefetched_page(pages, url)))
+    return indexed
+
+
+def peak_kb_per_company(parser: str, count: int, page_kb: int) -> float:
+    """Peak KB per company while `count` synthetic companies are held in flight and extracted"""
+    sites = synthetic_corpus(count, page_kb)
+    scraper = EnhancedCompanyScraper(parser=parser, companies=[])
+    _, _, peak = traced(lambda: in_flight(scraper, sites))
+    return peak / count / KB
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark memory per in-flight company and per record')
+    parser.add_argument('--parser', default='lxml', help='HTML parser backend')
+    parser.add_argument('--in-flight', type=int, default=32, help='Companies held at once')
+    parser.add_argument('--page-kb', type=int, default=60, help='Synthetic page size')
+    parser.add_argument('--records', type=int, default=10000, help='Finished records to hold')
+    parser.add_argument('--max-kb-per-company', type=float, default=MAX_KB_PER_COMPANY,
+                        help='Fail if the peak per in-flight company goes over this')
+    args = parser.parse_args(argv)
+    logging.disable(logging.CRITICAL)
+
+    sites = synthetic_corpus(args.in_flight, args.page_kb)
+    scraper = EnhancedCompanyScraper(parser=args.parser, companies=[])
+    start = time.perf_counter()
+    held, _, peak = traced(lambda: in_flight(scraper, sites))
+    elapsed = time.perf_counter() - start
+    per_company = peak / args.in_flight / KB
+    print(f"\n{args.in_flight} companies in flight ({args.parser}, {args.page_kb} KB pages): "
+          f"{held / args.in_flight / KB:.0f} KB held, {per_company:.0f} KB peak per company, {elapsed:.2f}s")
+
+    _, as_dicts, _ = traced(lambda: [synthetic_record(i) for i in range(args.records)])
+    _, as_records, _ = traced(lambda: [CompanyRecord.from_dict(synthetic_record(i)) for i in range(args.records)])
+    print(f"{args.records} records: {as_dicts / args.records:.0f} bytes each as dicts, "
+          f"{as_records / args.records:.0f} bytes as CompanyRecord")
+
+    if per_company > args.max_kb_per_company:
+        print(f"Peak per company {per_company:.0f} KB is over the {args.max_kb_per_company:.0f} KB ceiling")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
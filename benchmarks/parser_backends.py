@@ -0,0 +1,124 @@
+"""Compare HTML parser backends on a saved corpus
+
+Usage:
+    python -m benchmarks.parser_backends --corpus-dir pages/
+    python -m benchmarks.parser_backends --from-cache .http_cache
+
+Each page is parsed with every available backend, the extractors are run on
+the result, and the output is compared with the html.parser reference.
+"""
+import argparse
+import glob
+import os
+import sqlite3
+import statistics
+import sys
+import time
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dom_index import PageIndex  # noqa: E402
+from main import EnhancedCompanyScraper  # noqa: E402
+from parsers import PARSER_BACKENDS, parse_html  # noqa: E402
+
+BENCH_COMPANY = {'id': 0, 'name': 'Benchmark', 'website': 'https://example.com/',
+                 'sector': 'Solar Energy', 'expected_hq': 'USA'}
+
+
+def load_corpus(corpus_dir: str = None, cache_dir: str = None) -> List[Tuple[str, bytes]]:
+    """Load (name, html bytes) pairs from a directory of .html files or an HTTP cache"""
+    pages = []
+    if corpus_dir:
+        for path in sorted(glob.glob(os.path.join(corpus_dir, '*.htm*'))):
+            with open(path, 'rb') as f:
+                pages.append((os.path.basename(path), f.read()))
+    if cache_dir:
+        conn = sqlite3.connect(os.path.join(cache_dir, 'responses.sqlite'))
+        pages.extend(conn.execute('SELECT url, body FROM responses ORDER BY url').fetchall())
+        conn.close()
+    return pages
+
+
+def extract_all(scraper: EnhancedCompanyScraper, soup) -> Dict:
+    """Index the page, run the network-free extractors and return comparable output"""
+    page = PageIndex(soup)
+    return {
+        'description': scraper.smart_description_extraction(page, BENCH_COMPANY),
+        'addresses': scraper._extract_addresses(page),
+        'clients': sorted(scraper.smart_client_extraction(page)),
+        'news': scraper._parse_news_articles(page, BENCH_COMPANY['website']),
+        'name': scraper._extract_company_name(page, BENCH_COMPANY['website']),
+    }
+
+
+def run_backend(scraper: EnhancedCompanyScraper, backend: str, pages, repeat: int):
+    """Return per-page parse/extract times (best of `repeat`) and extractor outputs"""
+    parse_times, extract_times, outputs = [], [], []
+    for _, body in pages:
+        best_parse = best_extract = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            soup = parse_html(body, backend)
+            parsed = time.perf_counter()
+            output = extract_all(scraper, soup)
+            done = time.perf_counter()
+            best_parse = min(best_parse, parsed - start)
+            best_extract = min(best_extract, done - parsed)
+        parse_times.append(best_parse)
+        extract_times.append(best_extract)
+        outputs.append(output)
+    return parse_times, extract_times, outputs
+
+
+def available_backends() -> List[str]:
+    backends = []
+    for backend in PARSER_BACKENDS:
+        try:
+            parse_html(b'<html></html>', backend)
+            backends.append(backend)
+        except ImportError:
+            print(f"Skipping {backend}: not installed")
+    return backends
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark HTML parser backends')
+    parser.add_argument('--corpus-dir', help='Directory of saved .html pages')
+    parser.add_argument('--from-cache', default=None, help='HTTP cache directory to read pages from')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per page; the best time is kept')
+    args = parser.parse_args(argv)
+
+    pages = load_corpus(args.corpus_dir, args.from_cache or (None if args.corpus_dir else '.http_cache'))
+    if not pages:
+        print('No pages found; pass --corpus-dir or --from-cache')
+        return 1
+
+    scraper = EnhancedCompanyScraper()
+    backends = available_backends()
+    results = {backend: run_backend(scraper, backend, pages, args.repeat) for backend in backends}
+    reference = results['html.parser'][2]
+
+    total_kb = sum(len(body) for _, body in pages) / 1024
+    print(f"\n{len(pages)} pages, {total_kb:.0f} KB, best of {args.repeat}\n")
+    print(f"{'backend':<12} {'parse ms':>10} {'extract ms':>11} {'total ms':>10} {'p50 page':>9} {'speedup':>8} {'parity':>9}")
+    baseline_total = sum(results['html.parser'][0]) + sum(results['html.parser'][1])
+    for backend in backends:
+        parse_times, extract_times, outputs = results[backend]
+        total = sum(parse_times) + sum(extract_times)
+        per_page = [p + e for p, e in zip(parse_times, extract_times)]
+        same = sum(1 for a, b in zip(outputs, reference) if a == b)
+        print(f"{backend:<12} {sum(parse_times) * 1000:>10.1f} {sum(extract_times) * 1000:>11.1f} "
+              f"{total * 1000:>10.1f} {statistics.median(per_page) * 1000:>9.2f} "
+              f"{baseline_total / total:>7.2f}x {same:>4}/{len(pages):<4}")
+
+    for backend in backends:
+        for (name, _), a, b in zip(pages, results[backend][2], reference):
+            if a != b:
+                fields = [k for k in a if a[k] != b[k]]
+                print(f"  {backend} differs on {name}: {', '.join(fields)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""Start-up time of each CLI command, and a check that the light ones stay light
+
+Usage:
+    python -m benchmarks.startup
+    python -m benchmarks.startup --repeat 10 --max-import-ms 50
+
+Runs each command in a fresh interpreter: its wall time (best of
+`--repeat`), and with `-X importtime` the time spent importing modules the
+bare interpreter does not load, plus the slowest of them. `--help`, `stats`
+and `export --format json` must not import any of the heavy dependencies
+(requests, BeautifulSoup, lxml, openpyxl, pyarrow, ...) nor spend more than
+`--max-import-ms` importing; the run fails (exit status 1) if one does.
+`scrape --help` loads the scraper itself and is reported for comparison.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.export import synthetic_record  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLI = os.path.join(ROOT, 'cli.py')
+HEAVY_MODULES = ('requests', 'urllib3', 'bs4', 'lxml', 'selectolax', 'openpyxl', 'pyarrow', 'numpy', 'pandas')
+
+
+def import_times(args: List[str]) -> Dict[str, Tuple[int, int]]:
+    """Module -> (self, cumulative) import microseconds, from -X importtime"""
+    result = subprocess.run([sys.executable, '-X', 'importtime'] + args, cwd=ROOT, capture_output=True, text=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = (int(self_us), int(cumulative))
+    return times
+
+
+def wall_time(args: List[str], repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + args, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                       check=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark CLI start-up time')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per command; the best wall time is kept')
+    parser.add_argument('--records', type=int, default=1000, help='Synthetic records for stats and export')
+    parser.add_argument('--max-import-ms', type=float, default=100,
+                        help='Fail if a light command spends longer than this importing')
+    args = parser.parse_args(argv)
+
+    baseline = set(import_times(['-c', 'pass']))
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        records = os.path.join(tmp, 'records.jsonl')
+        with open(records, 'w', encoding='utf-8') as f:
+            for i in range(args.records):
+                f.write(json.dumps(synthetic_record(i)) + '\n')
+        commands = [
+            ('--help', [CLI, '--help'], True),
+            ('stats', [CLI, 'stats', '--input-jsonl', records], True),
+            ('export json', [CLI, 'export', '--input-jsonl', records, '--format', 'json',
+                             '--json', os.path.join(tmp, 'records.json')], True),
+            ('scrape --help', [CLI, 'scrape', '--help'], False),
+        ]
+
+        print(f"\n{'command':<14} {'wall ms':>8} {'import ms':>10}  slowest imports")
+        for name, command, light in commands:
+            times = import_times(command)
+            imported = {module: value for module, value in times.items() if module not in baseline}
+            # Cumulative times nest, so only the modules' own time is summed
+            import_ms = sum(self_us for self_us, _ in imported.values()) / 1000
+            slowest = sorted(imported.items(), key=lambda item: -item[1][1])
+            top = [module for module, _ in slowest if '.' not in module][:3]
+            print(f"{name:<14} {wall_time(command, args.repeat) * 1000:>8.0f} {import_ms:>10.1f}  "
+                  + ', '.join(f"{module} {times[module][1] / 1000:.0f}ms" for module in top))
+            if not light:
+                continue
+            heavy = sorted(module for module in imported if module.split('.')[0] in HEAVY_MODULES
+                           and '.' not in module)
+            if heavy:
+                failures.append(f"{name} imports {', '.join(heavy)}")
+            if import_ms > args.max_import_ms:
+                failures.append(f"{name} spends {import_ms:.0f} ms importing (limit {args.max_import_ms:.0f} ms)")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
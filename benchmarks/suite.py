@@ -0,0 +1,293 @@
+"""Offline end-to-end and per-stage benchmarks against a local fixture server
+
+Usage:
+    python -m benchmarks.suite
+    python -m benchmarks.suite --sites 500 --latency 0.1 --jitter 0.05 --error-rate 0.02 --drip-rate 0.05
+    python -m benchmarks.suite --bench e2e --error-rate 0.1 --down-rate 0.1 --retries 0
+    python -m benchmarks.suite --bench e2e --drip-rate 0.2 --drip-kbps 8 --company-budget 5
+    python -m benchmarks.suite --corpus-dir recorded/ --bench e2e,extractors
+    python -m benchmarks.suite --bench extractors --structured-rate 1 --compare heuristic.json
+    python -m benchmarks.suite --from-cache .http_cache --save-json before.json
+    python -m benchmarks.suite --compare before.json
+
+Benchmarks:
+    e2e         EnhancedCompanyScraper.scrape_all_companies_enhanced over every site
+    incremental the same scrape twice with a fingerprint store; the rerun reuses unchanged records
+    fetch       fetch_page on every served page (no host delay), from a thread pool
+    extractors  parsing, indexing and each extractor on the corpus pages, no network
+    excel       save_to_excel_enhanced on synthetic records
+
+Each benchmark runs in its own subprocess so peak RSS covers only that
+benchmark. The fixture server runs in another process. Sites get their own
+127.0.x.y loopback address, which needs Linux (other systems need loopback
+aliases).
+"""
+import argparse
+import json
+import logging
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.corpus import load_cache_corpus, load_corpus_dir, synthetic_corpus  # noqa: E402
+from benchmarks.fixture_server import FaultProfile, FixtureServer, site_host  # noqa: E402
+
+BENCHMARKS = ['e2e', 'incremental', 'fetch', 'extractors', 'excel']
+
+
+def load_sites(config: Dict):
+    if config['corpus_dir']:
+        return load_corpus_dir(config['corpus_dir'])
+    if config['from_cache']:
+        return load_cache_corpus(config['from_cache'])
+    return synthetic_corpus(config['sites'], config['page_kb'], config['large_every'], config['large_kb'],
+                            config['seed'], config['structured_rate'])
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def row(name: str, ops: int, seconds: float, latencies: List[float], **extra) -> Dict:
+    return {'benchmark': name, 'ops': ops, 'seconds': seconds, 'ops_per_sec': ops / seconds if seconds else 0.0,
+            'p50_ms': percentile(latencies, 50) * 1000 if latencies else None,
+            'p99_ms': percentile(latencies, 99) * 1000 if latencies else None, **extra}
+
+
+def bench_e2e(config: Dict, sites) -> List[Dict]:
+    from main import EnhancedCompanyScraper
+    from metrics import RunMetrics
+    from transport import RetryPolicy
+
+    class LatencyMetrics(RunMetrics):
+        def __init__(self):
+            super().__init__(slowest=0)
+            self.latencies = []
+
+        def finish(self, timings, record=None):
+            super().finish(timings, record)
+            self.latencies.append(timings.elapsed)
+
+    companies = [{'id': i, 'name': f"Site {i}", 'website': f"http://{site_host(i)}:{config['port']}/",
+                  'sector': 'Solar Energy', 'expected_hq': 'USA'} for i in range(len(sites))]
+    metrics = LatencyMetrics()
+    scraper = EnhancedCompanyScraper(max_workers=config['workers'], host_delay=config['host_delay'],
+                                     parser=config['parser'], processes=config['processes'],
+                                     companies=companies, metrics=metrics,
+                                     retry=RetryPolicy(retries=config['retries'], backoff=config['backoff']),
+                                     company_budget=config['company_budget'])
+    start = time.perf_counter()
+    scraper.scrape_all_companies_enhanced()
+    elapsed = time.perf_counter() - start
+    fallback = sum(1 for record in scraper.scraped_data if record['data_quality'] == 'Fallback')
+    # Description/office/news fields filled at least partly from JSON-LD, microdata or OpenGraph
+    structured = sum(count for sources in metrics.sources.values() for source, (count, _) in sources.items()
+                     if {'json-ld', 'microdata', 'opengraph'}.intersection(source.split('+')))
+    return [row('e2e', len(companies), elapsed, metrics.latencies, fallback=fallback, retries=metrics.retries,
+                circuits_opened=scraper.breaker.stats['opened'], structured_fields=structured,
+                out_of_time=metrics.out_of_time)]
+
+
+def bench_incremental(config: Dict, sites) -> List[Dict]:
+    from fingerprints import FingerprintStore
+    from main import EnhancedCompanyScraper
+
+    companies = [{'id': i, 'name': f"Site {i}", 'website': f"http://{site_host(i)}:{config['port']}/",
+                  'sector': 'Solar Energy', 'expected_hq': 'USA'} for i in range(len(sites))]
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        store = FingerprintStore(os.path.join(tmp, 'fingerprints.sqlite'), salt=config['parser'])
+        for name in ('first', 'rerun'):
+            scraper = EnhancedCompanyScraper(max_workers=config['workers'], host_delay=config['host_delay'],
+                                             parser=config['parser'], companies=companies, fingerprints=store)
+            start, cpu_start = time.perf_counter(), time.process_time()
+            scraper.scrape_all_companies_enhanced()
+            rows.append(row(f"incremental:{name}", len(companies), time.perf_counter() - start, [],
+                            cpu_s=time.process_time() - cpu_start, reused=store.stats['unchanged']))
+        store.close()
+    return rows
+
+
+def bench_fetch(config: Dict, sites) -> List[Dict]:
+    from main import EnhancedCompanyScraper
+
+    urls = [f"http://{site_host(i)}:{config['port']}{path}" for i, site in enumerate(sites) for path in site]
+    scraper = EnhancedCompanyScraper(max_workers=config['workers'], host_delay=0.0,
+                                     max_per_host=config['workers'], parser=config['parser'], companies=[])
+
+    def timed_fetch(url):
+        start = time.perf_counter()
+        soup = scraper.fetch_page(url)
+        return time.perf_counter() - start, soup is not None
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=config['workers']) as executor:
+        results = list(executor.map(timed_fetch, urls))
+    elapsed = time.perf_counter() - start
+    failed = sum(1 for _, ok in results if not ok)
+    return [row('fetch', len(urls), elapsed, [seconds for seconds, _ in results], failed=failed,
+                mb_per_sec=sum(len(body) for site in sites for body in site.values()) / 1024 / 1024 / elapsed)]
+
+
+def bench_extractors(config: Dict, sites) -> List[Dict]:
+    from dom_index import PageIndex
+    from main import EnhancedCompanyScraper
+    from parsers import parse_html
+
+    scraper = EnhancedCompanyScraper(parser=config['parser'], companies=[])
+    company = {'id': 0, 'name': 'Benchmark', 'website': 'https://example.com/', 'sector': 'Solar Energy',
+               'expected_hq': 'USA'}
+    times: Dict[str, List[float]] = {name: [] for name in
+                                     ['parse', 'index', 'description', 'addresses', 'clients', 'news', 'company']}
+
+    def timed(name, func, *args):
+        start = time.perf_counter()
+        result = func(*args)
+        times[name].append(time.perf_counter() - start)
+        return result
+
+    for site in sites:
+        subpages = {f"https://example.com{path}": PageIndex(parse_html(body, config['parser']))
+                    for path, body in site.items() if path != '/'}
+        soup = timed('parse', parse_html, site['/'], config['parser'])
+        page = timed('index', PageIndex, soup)
+        timed('description', scraper.smart_description_extraction, page, company)
+        timed('addresses', scraper._extract_addresses, page)
+        timed('clients', scraper.smart_client_extraction, page)
+        timed('news', scraper._parse_news_articles, page, company['website'])
+        # Every extractor, with sub-pages served from memory
+        timed('company', scraper.extract_company, company, page, lambda url: subpages.get(url.rstrip('/')))
+    return [row(f"extract:{name}", len(values), sum(values), values) for name, values in times.items()]
+
+
+def bench_excel(config: Dict, sites) -> List[Dict]:
+    from benchmarks.export import synthetic_record
+    from main import EnhancedCompanyScraper
+
+    scraper = EnhancedCompanyScraper(companies=[])
+    scraper.scraped_data = [synthetic_record(i) for i in range(config['records'])]
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        scraper.save_to_excel_enhanced(os.path.join(tmp, 'bench.xlsx'))
+        elapsed = time.perf_counter() - start
+    return [row('excel', config['records'], elapsed, [])]
+
+
+def run_one(name: str, config: Dict):
+    """Run a single benchmark in this process and print its rows with peak RSS as JSON"""
+    logging.disable(logging.CRITICAL)
+    sites = load_sites(config)
+    rows = globals()[f"bench_{name}"](config, sites)
+    # ru_maxrss is kilobytes on Linux
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    for result in rows:
+        result['peak_mb'] = peak_mb
+    print(json.dumps(rows))
+
+
+def print_rows(rows: List[Dict], baseline: Dict[str, Dict]):
+    print(f"\n{'benchmark':<22} {'ops':>7} {'seconds':>9} {'ops/s':>10} {'p50 ms':>9} {'p99 ms':>9} "
+          f"{'peak RSS MB':>12}" + ('  vs baseline' if baseline else ''))
+    for result in rows:
+        p50, p99 = (f"{result[key]:>9.2f}" if result[key] is not None else f"{'-':>9}" for key in ('p50_ms', 'p99_ms'))
+        line = (f"{result['benchmark']:<22} {result['ops']:>7} {result['seconds']:>9.2f} "
+                f"{result['ops_per_sec']:>10.1f} {p50} {p99} {result['peak_mb']:>12.1f}")
+        before = baseline.get(result['benchmark'])
+        if before and before['ops_per_sec']:
+            line += f"  {result['ops_per_sec'] / before['ops_per_sec'] - 1:+.1%} ops/s"
+        extra = {k: v for k, v in result.items() if k in ('fallback', 'failed', 'mb_per_sec', 'cpu_s', 'reused',
+                                                         'retries', 'circuits_opened', 'structured_fields',
+                                                         'out_of_time')}
+        if extra:
+            line += '  ' + ', '.join(f"{k}={v:.1f}" if isinstance(v, float) else f"{k}={v}" for k, v in extra.items())
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Offline scraper benchmarks against a local fixture server')
+    parser.add_argument('--bench', default=','.join(BENCHMARKS), help='Comma-separated benchmarks to run')
+    parser.add_argument('--sites', type=int, default=100, help='Number of synthetic sites')
+    parser.add_argument('--page-kb', type=int, default=30, help='Synthetic homepage size')
+    parser.add_argument('--large-every', type=int, default=20, help='Make every Nth homepage large (0: never)')
+    parser.add_argument('--large-kb', type=int, default=2000, help='Size of the large homepages')
+    parser.add_argument('--corpus-dir', default=None, help='Recorded sites: <dir>/<site>/index.html, contact.html, ...')
+    parser.add_argument('--from-cache', default=None, help='Use the pages recorded in an HTTP cache directory')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for synthetic pages and injected faults')
+    parser.add_argument('--structured-rate', type=float, default=0.0,
+                        help='Fraction of synthetic sites that embed schema.org JSON-LD')
+    parser.add_argument('--latency', type=float, default=0.05, help='Server latency per response in seconds')
+    parser.add_argument('--jitter', type=float, default=0.02, help='Uniform +/- jitter on the latency')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of responses that are 5xx')
+    parser.add_argument('--down-rate', type=float, default=0.0, help='Fraction of sites that answer 503 to everything')
+    parser.add_argument('--drip-rate', type=float, default=0.0, help='Fraction of responses sent slowly')
+    parser.add_argument('--drip-kbps', type=int, default=64, help='Transfer rate of slow responses in KB/s')
+    parser.add_argument('--workers', type=int, default=8, help='Scraper fetch threads')
+    parser.add_argument('--processes', type=int, default=0, help='Scraper extraction processes for e2e')
+    parser.add_argument('--host-delay', type=float, default=0.0, help='Per-host delay for e2e')
+    parser.add_argument('--retries', type=int, default=2, help='Scraper retries per request for e2e')
+    parser.add_argument('--backoff', type=float, default=1.0, help='Scraper base backoff in seconds for e2e')
+    parser.add_argument('--company-budget', type=float, default=60.0,
+                        help='Scraper time budget per company for e2e (0: no limit)')
+    parser.add_argument('--parser', default='lxml', help='HTML parser backend')
+    parser.add_argument('--records', type=int, default=5000, help='Synthetic records for the excel benchmark')
+    parser.add_argument('--save-json', default=None, help='Write the results to this file')
+    parser.add_argument('--compare', default=None, help='Show throughput change against a saved results file')
+    parser.add_argument('--run-one', nargs=2, metavar=('BENCHMARK', 'CONFIG'), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.run_one:
+        run_one(args.run_one[0], json.loads(args.run_one[1]))
+        return 0
+
+    config = {'sites': args.sites, 'page_kb': args.page_kb, 'large_every': args.large_every,
+              'large_kb': args.large_kb, 'corpus_dir': args.corpus_dir, 'from_cache': args.from_cache,
+              'seed': args.seed, 'structured_rate': args.structured_rate, 'workers': args.workers,
+              'processes': args.processes,
+              'host_delay': args.host_delay, 'parser': args.parser, 'records': args.records,
+              'retries': args.retries, 'backoff': args.backoff,
+              'company_budget': args.company_budget}
+    sites = load_sites(config)
+    if not sites:
+        print('No sites found in the corpus')
+        return 1
+    faults = FaultProfile(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                          drip_rate=args.drip_rate, drip_bytes_per_sec=args.drip_kbps * 1024, seed=args.seed,
+                          down_rate=args.down_rate)
+    pages = sum(len(site) for site in sites)
+    total_mb = sum(len(body) for site in sites for body in site.values()) / 1024 / 1024
+    print(f"{len(sites)} sites, {pages} pages, {total_mb:.1f} MB; latency {args.latency}s +/- {args.jitter}s, "
+          f"errors {args.error_rate:.0%}, down {args.down_rate:.0%}, slow-drip {args.drip_rate:.0%}")
+
+    rows = []
+    with FixtureServer(sites, faults) as server:
+        config['port'] = server.port
+        for name in args.bench.split(','):
+            result = subprocess.run([sys.executable, '-m', 'benchmarks.suite', '--run-one', name,
+                                     json.dumps(config)], cwd=ROOT, capture_output=True, text=True)
+            if result.returncode != 0:
+                print(f"{name} failed: {result.stderr.strip().splitlines()[-1]}")
+                continue
+            rows.extend(json.loads(result.stdout.strip().splitlines()[-1]))
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = {result['benchmark']: result for result in json.load(f)}
+    print_rows(rows, baseline)
+    if args.save_json:
+        with open(args.save_json, 'w', encoding='utf-8') as f:
+            json.dump(rows, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""Throughput of several worker processes sharing one work queue, and recovery from a killed worker
+
+Usage:
+    python -m benchmarks.work_queue
+    python -m benchmarks.work_queue --sites 200 --worker-counts 1,2,4,8 --threads 2
+    python -m benchmarks.work_queue --no-crash
+
+Serves `--sites` synthetic sites with `--latency` per response, queues
+them in a fresh WorkQueue and runs `main.py --queue` in each of
+`--worker-counts` processes against it, reporting companies/s and the
+speedup over the first count. Then, unless `--no-crash`, one of two
+workers is killed (SIGKILL) once a quarter of the companies are done:
+the other must take over its companies when their lease
+(`--lease-seconds`) runs out. The run fails (exit status 1) if a company
+is not done or does not have exactly one stored record.
+"""
+import argparse
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.corpus import synthetic_corpus  # noqa: E402
+from benchmarks.fixture_server import FaultProfile, FixtureServer, site_host  # noqa: E402
+from work_queue import WorkQueue, queue_counts  # noqa: E402
+
+MAIN = os.path.join(ROOT, 'main.py')
+
+
+def fill_queue(path: str, count: int, port: int):
+    queue = WorkQueue(path)
+    queue.add({'id': i, 'name': f"Site {i}", 'website': f"http://{site_host(i)}:{port}/",
+               'sector': 'Solar Energy', 'expected_hq': 'USA'} for i in range(count))
+    queue.close()
+
+
+def start_workers(path: str, count: int, args, tmp: str) -> List[subprocess.Popen]:
+    return [subprocess.Popen([sys.executable, MAIN, '--queue', path, '--worker-id', f"worker{n}",
+                              '--workers', str(args.threads), '--host-delay', '0',
+                              '--lease-seconds', str(args.lease_seconds)],
+                             cwd=tmp, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            for n in range(count)]
+
+
+def check(path: str, count: int) -> List[str]:
+    """Problems with the drained queue: companies not done, or without exactly one stored record"""
+    problems = []
+    counts = queue_counts(path)
+    if counts['done'] != count:
+        problems.append(f"{counts['done']} of {count} companies done ({counts})")
+    conn = sqlite3.connect(path)
+    try:
+        stored, distinct = conn.execute('SELECT COUNT(*), COUNT(DISTINCT company_id) FROM companies').fetchone()
+    finally:
+        conn.close()
+    if stored != count or distinct != count:
+        problems.append(f"{stored} records stored for {distinct} of {count} companies")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark queue workers against a local fixture server')
+    parser.add_argument('--sites', type=int, default=120, help='Number of synthetic sites')
+    parser.add_argument('--page-kb', type=int, default=30, help='Synthetic homepage size')
+    parser.add_argument('--latency', type=float, default=0.1, help='Server latency per response in seconds')
+    parser.add_argument('--worker-counts', default='1,2,4', help='Comma-separated numbers of worker processes')
+    parser.add_argument('--threads', type=int, default=2, help='Fetch threads (--workers) in each worker process')
+    parser.add_argument('--lease-seconds', type=float, default=5.0, help='Lease time given to the workers')
+    parser.add_argument('--no-crash', action='store_true', help='Skip the killed-worker run')
+    args = parser.parse_args(argv)
+
+    sites = synthetic_corpus(args.sites, args.page_kb)
+    failures = []
+    with FixtureServer(sites, FaultProfile(latency=args.latency)) as server, \
+            tempfile.TemporaryDirectory() as tmp:
+        print(f"\n{len(sites)} sites, latency {args.latency}s, {args.threads} threads per worker")
+        print(f"{'workers':>8} {'seconds':>9} {'companies/s':>12} {'speedup':>8}")
+        first = None
+        for count in (int(n) for n in args.worker_counts.split(',')):
+            path = os.path.join(tmp, f"queue-{count}.sqlite")
+            fill_queue(path, len(sites), server.port)
+            start = time.perf_counter()
+            for worker in start_workers(path, count, args, tmp):
+                worker.wait()
+            rate = len(sites) / (time.perf_counter() - start)
+            first = first or rate
+            print(f"{count:>8} {len(sites) / rate:>9.2f} {rate:>12.1f} {rate / first:>7.2f}x")
+            failures.extend(f"{count} workers: {problem}" for problem in check(path, len(sites)))
+
+        if not args.no_crash:
+            path = os.path.join(tmp, 'queue-crash.sqlite')
+            fill_queue(path, len(sites), server.port)
+            start = time.perf_counter()
+            workers = start_workers(path, 2, args, tmp)
+            while queue_counts(path)['done'] < len(sites) // 4 and workers[0].poll() is None:
+                time.sleep(0.05)
+            workers[0].kill()
+            killed_at = time.perf_counter() - start
+            workers[1].wait()
+            conn = sqlite3.connect(path)
+            try:
+                released = conn.execute('SELECT COUNT(*) FROM queue WHERE attempts > 1').fetchone()[0]
+            finally:
+                conn.close()
+            print(f"\nKilled worker0 after {killed_at:.2f}s; worker1 finished at {time.perf_counter() - start:.2f}s "
+                  f"and took over {released} of its leased companies")
+            failures.extend(f"killed worker: {problem}" for problem in check(path, len(sites)))
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
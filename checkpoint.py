@@ -0,0 +1,138 @@
+import json
+import logging
+import os
+import threading
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Key a checkpoint line carries its company's place in the input list under; not part of the record
+POSITION_KEY = '_position'
+
+
+def _parse(line: bytes, path: str) -> Optional[Dict]:
+    try:
+        record = json.loads(line)
+    except ValueError:
+        logger.warning(f"Skipping unreadable line in {path}")
+        return None
+    record.pop(POSITION_KEY, None)
+    return record
+
+
+def iter_jsonl(path: str) -> Iterator[Dict]:
+    """Records of a JSONL file, read one line at a time"""
+    with open(path, 'rb') as f:
+        for line in f:
+            if line.strip():
+                record = _parse(line, path)
+                if record is not None:
+                    yield record
+
+
+def _position(line: bytes) -> Optional[int]:
+    try:
+        return json.loads(line).get(POSITION_KEY)
+    except ValueError:
+        return None
+
+
+class JsonlCheckpoint:
+    """Append-only JSONL file of finished company records, used to resume interrupted runs"""
+
+    def __init__(self, path: str, fresh: bool = False):
+        self.path = path
+        self._lock = threading.Lock()
+        if fresh and os.path.exists(path):
+            os.remove(path)
+        self._repair()
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def _repair(self):
+        """Drop a partially written last line left behind by a crash
+
+        Only the unterminated tail after the last newline is looked at, so
+        the complete lines before it are kept however many there are.
+        """
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r+b') as f:
+            size = f.seek(0, os.SEEK_END)
+            line_end = size
+            while line_end > 0:
+                start = max(0, line_end - 65536)
+                f.seek(start)
+                newline = f.read(line_end - start).rfind(b'\n')
+                if newline >= 0:
+                    line_end = start + newline + 1
+                    break
+                line_end = start
+            if line_end == size:
+                return
+            f.seek(line_end)
+            tail = f.read()
+            try:
+                json.loads(tail)
+            except ValueError:
+                logger.warning(f"Truncating {size - line_end} bytes of incomplete output from {self.path}")
+                f.truncate(line_end)
+            else:
+                # The record made it out whole, only its newline did not
+                f.write(b'\n')
+
+    def completed_ids(self) -> Set:
+        """Company ids that already have a record"""
+        return {record['company_id'] for record in self.iter_records()}
+
+    def append(self, record: Dict, position: Optional[int] = None):
+        """Write one record and flush it so it survives a crash; position is its place in the company list
+
+        Lines are in completion order; run_records puts them back in input order.
+        """
+        if position is not None:
+            record = dict(record, **{POSITION_KEY: position})
+        line = json.dumps(record, ensure_ascii=False) + '\n'
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def finish(self):
+        """Nothing to mark: a rerun skips every company already in the file until it is discarded"""
+
+    def iter_records(self) -> Iterator[Dict]:
+        """Stream records back from disk without loading the whole file"""
+        with self._lock:
+            self._file.flush()
+        yield from iter_jsonl(self.path)
+
+    def run_records(self) -> Iterator[Dict]:
+        """Records in the order of the company list, read back one line at a time
+
+        One pass collects each line's position and offset, then the lines are
+        read in position order. Lines written without a position (by older
+        versions) follow in file order.
+        """
+        with self._lock:
+            self._file.flush()
+            size = self._file.tell()
+        index: List[Tuple[float, int, int]] = []
+        with open(self.path, 'rb') as f:
+            offset = 0
+            while offset < size:
+                line = f.readline()
+                if not line:
+                    break
+                if line.strip():
+                    position = _position(line)
+                    index.append((float('inf') if position is None else position, len(index), offset))
+                offset += len(line)
+            index.sort()
+            for _, _, offset in index:
+                f.seek(offset)
+                record = _parse(f.readline(), self.path)
+                if record is not None:
+                    yield record
+
+    def close(self):
+        with self._lock:
+            self._file.close()
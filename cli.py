@@ -0,0 +1,153 @@
+import argparse
+import importlib
+import logging
+import os
+import sys
+from typing import List, Optional
+
+# Only the standard library is imported up front. Each command imports what it needs, so `stats`, `export`
+# and --help start without loading requests, BeautifulSoup, openpyxl or pyarrow (see benchmarks/startup.py)
+
+PROG = 'net-zero-scraper'
+DEFAULT_STORE = 'net_zero_companies_enhanced.sqlite'
+DEFAULT_EXCEL = 'net_zero_companies_enhanced.xlsx'
+DEFAULT_JSON = 'net_zero_companies_enhanced.json'
+DEFAULT_COLUMNAR_DIR = 'net_zero_companies_enhanced_tables'
+EXPORT_FORMATS = ['excel', 'json', 'parquet', 'arrow']
+BENCHMARKS = ['address_matching', 'client_matching', 'export', 'memory', 'parser_backends', 'startup', 'suite',
+              'work_queue']
+
+logger = logging.getLogger(__name__)
+
+
+def scrape(argv: List[str]):
+    """Scrape every company and write the exports (the options of `python main.py`)"""
+    from main import main as scrape_main
+
+    return scrape_main(argv, prog=f"{PROG} scrape")
+
+
+def _results_parser(command: str, description: str) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog=f"{PROG} {command}", description=description)
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--store', default=DEFAULT_STORE, help='SQLite result store written by scrape')
+    source.add_argument('--input-jsonl', default=None, help='JSONL file written by scrape --output-jsonl')
+    return parser
+
+
+def _open_results(parser: argparse.ArgumentParser, args):
+    """(record source, table source) of the saved results; the store is opened read-only"""
+    path = args.input_jsonl or args.store
+    if not os.path.exists(path):
+        parser.error(f"{path} does not exist")
+    if args.input_jsonl:
+        from checkpoint import iter_jsonl
+        from exporters import record_tables
+
+        def records():
+            return iter_jsonl(args.input_jsonl)
+        return records, record_tables(records)
+    from result_store import ResultStore
+
+    store = ResultStore(args.store, read_only=True)
+    return store.iter_records, store.table_rows
+
+
+def export(argv: List[str]):
+    """Write the Excel, JSON or columnar exports from saved results, without scraping"""
+    parser = _results_parser('export', export.__doc__)
+    parser.add_argument('--format', action='append', choices=EXPORT_FORMATS, dest='formats',
+                        help='Export to write; repeat for several (default: excel and json)')
+    parser.add_argument('--excel', default=DEFAULT_EXCEL, help='Excel file to write')
+    parser.add_argument('--json', default=DEFAULT_JSON, help='JSON file to write')
+    parser.add_argument('--columnar-dir', default=DEFAULT_COLUMNAR_DIR, help='Directory for Parquet/Arrow tables')
+    args = parser.parse_args(argv)
+    records, tables = _open_results(parser, args)
+
+    from exporters import write_columnar, write_excel, write_json
+
+    for fmt in args.formats or ['excel', 'json']:
+        if fmt == 'excel':
+            write_excel(tables, args.excel)
+            logger.info(f"Excel data saved to {args.excel}")
+        elif fmt == 'json':
+            write_json(records(), args.json)
+            logger.info(f"JSON data saved to {args.json}")
+        else:
+            write_columnar(tables, args.columnar_dir, fmt)
+    return 0
+
+
+def stats(argv: List[str]):
+    """Print record counts, data quality and sectors of saved results, and the work queue's progress"""
+    parser = _results_parser('stats', stats.__doc__)
+    args = parser.parse_args(argv)
+    records, _ = _open_results(parser, args)
+
+    companies = offices = headquarters = clients = news = truncated = 0
+    quality_counts, sector_counts = {}, {}
+    for record in records():
+        companies += 1
+        quality = record.get('data_quality', 'Unknown')
+        quality_counts[quality] = quality_counts.get(quality, 0) + 1
+        sector_counts[record.get('sector', '')] = sector_counts.get(record.get('sector', ''), 0) + 1
+        offices += len(record.get('offices', ()))
+        headquarters += sum(1 for office in record.get('offices', ()) if office.get('is_hq'))
+        clients += len(record.get('clients', ()))
+        news += len(record.get('news', ()))
+        truncated += 1 if record.get('truncated') else 0
+
+    print(f"{args.input_jsonl or args.store}: {companies} companies, {offices} offices "
+          f"({headquarters} headquarters), {clients} clients, {news} news items")
+    print("Data quality:")
+    for quality, count in sorted(quality_counts.items(), key=lambda item: -item[1]):
+        print(f"  {quality}: {count}")
+    if truncated:
+        print(f"  Cut short by the per-company time budget: {truncated}")
+    print("Sectors:")
+    for sector, count in sorted(sector_counts.items(), key=lambda item: (-item[1], item[0])):
+        print(f"  {sector or 'Unknown'}: {count}")
+    if not args.input_jsonl:
+        from work_queue import queue_counts
+
+        counts = queue_counts(args.store)
+        if counts:
+            print("Work queue: " + ', '.join(f"{count} {state}" for state, count in counts.items()))
+    return 0
+
+
+def bench(argv: List[str]):
+    """Run one of the benchmarks in benchmarks/; options after its name are passed to it"""
+    parser = argparse.ArgumentParser(prog=f"{PROG} bench", description=bench.__doc__)
+    parser.add_argument('name', choices=BENCHMARKS)
+    parser.add_argument('args', nargs=argparse.REMAINDER, help='Options for the benchmark (see its --help)')
+    args = parser.parse_args(argv)
+    try:
+        module = importlib.import_module(f"benchmarks.{args.name}")
+    except ModuleNotFoundError as e:
+        if e.name not in ('benchmarks', f"benchmarks.{args.name}"):
+            raise
+        parser.error("the benchmarks are not installed; run them from a source checkout (pip install -e .)")
+    return module.main(args.args)
+
+
+COMMANDS = {'scrape': scrape, 'export': export, 'stats': stats, 'bench': bench}
+
+
+def main(argv: Optional[List[str]] = None):
+    """Console entry point: net-zero-scraper <command> [options]"""
+    parser = argparse.ArgumentParser(
+        prog=PROG, description='Scrape Net Zero company data and work with the results',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog='commands:\n' + '\n'.join(f"  {name:<8} {command.__doc__}" for name, command in COMMANDS.items())
+               + f"\n\nRun `{PROG} <command> --help` for a command's options.")
+    parser.add_argument('command', choices=COMMANDS, help='Command to run')
+    parser.add_argument('args', nargs=argparse.REMAINDER, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    return COMMANDS[args.command](args.args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,94 @@
+import hashlib
+import logging
+import re
+from itertools import islice
+from typing import Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Legacy client filters, compiled once: substring matches, case-insensitive
+CLIENT_SKIP_RE = re.compile('logo|image|icon|photo|picture|company|client|partner', re.I)
+DESCRIPTION_SKIP_RE = re.compile('cookie|privacy|terms|copyright|all rights reserved|learn more', re.I)
+# Capitalised words with an optional legal suffix, the generic testimonial pattern
+CLIENT_NAME_RE = re.compile(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+){0,2}(?:\s+(?:Inc|Corp|Ltd|LLC|GmbH))?\b')
+
+_TOKEN_RE = re.compile(r'[^\W_]+')
+# A word starting with a digit or a Latin, Greek or Cyrillic capital: where a name can begin
+_NAME_START_RE = re.compile(r'\b[0-9A-Z\u00c0-\u00d6\u00d8-\u00de\u0391-\u03a9\u0410-\u042f][^\W_]*')
+
+
+def _tokens(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.casefold())
+
+
+class OrganizationGazetteer:
+    """Known organization names and aliases, matched on word boundaries in one pass over the text
+
+    The dictionary file has one organization per line: the canonical name,
+    then any aliases, separated by '|'. Blank lines and lines starting with
+    '#' are ignored.
+
+        Siemens Energy|Siemens Energy AG
+        Iberdrola|Iberdrola S.A.|Iberdrola Renovables
+
+    Names are compared case-insensitively and ignoring punctuation, but a
+    match must start with a capital letter or digit in the text, so a name
+    that is also a common word ("Shell") does not match in lowercase prose.
+
+    Rather than a character-level automaton, names are indexed by their
+    first word: one left-to-right pass jumps between capitalised words and
+    only tries the name lengths known to start with that word, longest
+    first. This keeps 100k+ names to two dicts instead of millions of trie
+    nodes, and the scan time does not depend on the dictionary size.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._names: Dict[str, str] = {}
+        # First word -> phrase lengths (in words) that start with it, longest first
+        self._lengths: Dict[str, Tuple[int, ...]] = {}
+        digest = hashlib.blake2b(digest_size=8)
+        lengths: Dict[str, set] = {}
+        with open(path, 'rb') as f:
+            for raw in f:
+                digest.update(raw)
+                line = raw.decode('utf-8', 'replace').strip()
+                if not line or line.startswith('#'):
+                    continue
+                names = [name.strip() for name in line.split('|') if name.strip()]
+                for name in names:
+                    words = _tokens(name)
+                    if words:
+                        self._names.setdefault(' '.join(words), names[0])
+                        lengths.setdefault(words[0], set()).add(len(words))
+        self._lengths = {word: tuple(sorted(counts, reverse=True)) for word, counts in lengths.items()}
+        # Identifies the dictionary contents, e.g. to invalidate records extracted with another one
+        self.digest = digest.hexdigest()
+        logger.info(f"Loaded {len(self._names)} organization names and aliases from {path}")
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def find(self, text: str) -> List[str]:
+        """Canonical names of the organizations mentioned in the text, in order of first mention"""
+        found = {}
+        pos = 0
+        while True:
+            # The regex skips to the next capitalised word in C; most of the text is never looked at in Python
+            start = _NAME_START_RE.search(text, pos)
+            if start is None:
+                return list(found)
+            pos = start.end()
+            first = start.group().casefold()
+            lengths = self._lengths.get(first)
+            if not lengths:
+                continue
+            following = list(islice(_TOKEN_RE.finditer(text, pos), lengths[0] - 1))
+            words = [first] + [match.group().casefold() for match in following]
+            for length in lengths:
+                name = self._names.get(' '.join(words[:length])) if length <= len(words) else None
+                if name is not None:
+                    found.setdefault(name, None)
+                    if length > 1:
+                        pos = following[length - 2].end()
+                    break
@@ -0,0 +1,227 @@
+import csv
+import json
+import logging
+import re
+import sqlite3
+import zlib
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+from urllib.parse import urlsplit
+
+from frontier import site_key
+
+logger = logging.getLogger(__name__)
+
+COMPANY_FIELDS = ['id', 'name', 'website', 'sector', 'expected_hq']
+
+# The original target list, used when no input file is given
+DEFAULT_COMPANIES = [
+    {
+        'id': 5875, 'name': 'Solarkal', 'website': 'https://www.solarkal.com/',
+        'sector': 'Solar Energy', 'expected_hq': 'India'
+    },
+    {
+        'id': 11917, 'name': 'H2Scan', 'website': 'https://h2scan.com/',
+        'sector': 'Hydrogen Sensors', 'expected_hq': 'USA'
+    },
+    {
+        'id': 34005, 'name': 'Eo Charging', 'website': 'https://www.eocharging.com/',
+        'sector': 'EV Charging', 'expected_hq': 'UK'
+    },
+    {
+        'id': 65212, 'name': 'Prewave', 'website': 'https://www.prewave.com/',
+        'sector': 'Supply Chain AI', 'expected_hq': 'Austria'
+    },
+    {
+        'id': 18533, 'name': 'Viriciti', 'website': 'https://www.chargepoint.com/',
+        'sector': 'Fleet Management', 'expected_hq': 'Netherlands'
+    },
+    {
+        'id': 2805, 'name': 'EasyMile', 'website': 'https://www.easymile.com/',
+        'sector': 'Autonomous Vehicles', 'expected_hq': 'France'
+    },
+    {
+        'id': 101741, 'name': 'Everstream', 'website': 'https://www.everstream.ai/',
+        'sector': 'Supply Chain Analytics', 'expected_hq': 'USA'
+    },
+    {
+        'id': 110133, 'name': 'Altus Power', 'website': 'https://www.altuspower.com/',
+        'sector': 'Solar Energy', 'expected_hq': 'USA'
+    },
+    {
+        'id': 12605, 'name': 'Charm Industrial', 'website': 'https://www.charmindustrial.com/',
+        'sector': 'Carbon Removal', 'expected_hq': 'USA'
+    },
+    {
+        'id': 105894, 'name': 'Isotropic Systems', 'website': 'https://www.all.space/',
+        'sector': 'Satellite Technology', 'expected_hq': 'UK'
+    },
+    {
+        'id': 400, 'name': 'Caban Systems', 'website': 'https://www.cabanenergy.com/',
+        'sector': 'Energy Storage', 'expected_hq': 'USA'
+    },
+    {
+        'id': 34204, 'name': 'BioBTX', 'website': 'https://biobtx.com/',
+        'sector': 'Chemical Recycling', 'expected_hq': 'Netherlands'
+    },
+    {
+        'id': 6134, 'name': 'Hydrogenious LOHC', 'website': 'https://hydrogenious.net/',
+        'sector': 'Hydrogen Storage', 'expected_hq': 'Germany'
+    },
+    {
+        'id': 12008, 'name': 'Iogen', 'website': 'https://www.iogen.com/',
+        'sector': 'Biofuels', 'expected_hq': 'Canada'
+    },
+    {
+        'id': 6997, 'name': 'Infinited Fiber Company', 'website': 'https://infinitedfiber.com/',
+        'sector': 'Sustainable Textiles', 'expected_hq': 'Finland'
+    }
+]
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """Parse an 'i/N' shard spec (0 <= i < N)"""
+    match = re.fullmatch(r'\s*(\d+)\s*/\s*(\d+)\s*', value or '')
+    if not match:
+        raise ValueError(f"Invalid shard '{value}', expected i/N such as 0/4")
+    index, count = int(match.group(1)), int(match.group(2))
+    if count < 1 or index >= count:
+        raise ValueError(f"Invalid shard '{value}', need 0 <= i < N")
+    return index, count
+
+
+def company_file_format(path: str) -> str:
+    """'csv', 'jsonl' or 'sqlite', from a company file's extension"""
+    lowered = path.lower()
+    if lowered.endswith('.csv'):
+        return 'csv'
+    if lowered.endswith(('.jsonl', '.ndjson')):
+        return 'jsonl'
+    if lowered.endswith(('.sqlite', '.sqlite3', '.db')):
+        return 'sqlite'
+    raise ValueError(f"Unsupported company file '{path}', expected .csv, .jsonl or .sqlite")
+
+
+def _read_csv(path: str) -> Iterator[Dict]:
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        yield from csv.DictReader(f)
+
+
+def _read_jsonl(path: str) -> Iterator[Dict]:
+    with open(path, encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                logger.warning(f"Skipping malformed JSON on line {line_number} of {path}")
+
+
+def _read_sqlite(path: str, table: str) -> Iterator[Dict]:
+    if not re.fullmatch(r'[A-Za-z_][A-Za-z0-9_]*', table):
+        raise ValueError(f"Invalid table name '{table}'")
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    try:
+        columns = {row[1] for row in conn.execute(f'PRAGMA table_info({table})')}
+        selected = ', '.join(field for field in COMPANY_FIELDS if field in columns)
+        for row in conn.execute(f'SELECT {selected} FROM {table}'):
+            yield dict(row)
+    finally:
+        conn.close()
+
+
+class CompanySource:
+    """Lazily read, validated and deduplicated companies from CSV, JSONL or SQLite
+
+    Rows are streamed, so only the ids and domains already seen are kept in
+    memory. With a shard (i, N) only companies whose normalised domain hashes
+    to shard i are yielded. Every shard deduplicates the whole list before
+    the split, keeping the first row for each id and domain, so every machine
+    computes the same split and no company is yielded by two shards.
+    """
+
+    def __init__(self, path: Optional[str] = None, rows: Optional[Iterable[Dict]] = None,
+                 shard: Optional[Tuple[int, int]] = None, table: str = 'companies'):
+        if path is None and rows is None:
+            rows = DEFAULT_COMPANIES
+        self.path = path
+        self.rows = rows
+        self.shard = shard
+        self.table = table
+        # Checked up front, so an unsupported file fails before anything is scraped
+        self._format = company_file_format(path) if rows is None else None
+        self.stats = {'read': 0, 'invalid': 0, 'duplicate_id': 0, 'duplicate_domain': 0,
+                      'other_shard': 0, 'yielded': 0}
+
+    def _raw_rows(self) -> Iterator[Dict]:
+        if self.rows is not None:
+            return iter(self.rows)
+        if self._format == 'csv':
+            return _read_csv(self.path)
+        if self._format == 'jsonl':
+            return _read_jsonl(self.path)
+        return _read_sqlite(self.path, self.table)
+
+    @staticmethod
+    def validate(row: Dict) -> Optional[Dict]:
+        """Normalised company dict, or None if the row is unusable"""
+        try:
+            company_id = int(str(row.get('id', '')).strip())
+        except ValueError:
+            return None
+        name = str(row.get('name') or '').strip()
+        website = str(row.get('website') or '').strip()
+        if not name or not website:
+            return None
+        if '://' not in website:
+            website = f"https://{website}"
+        parts = urlsplit(website)
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            return None
+
+        # Sector defaults like the scraper's own fallback; expected_hq is left out when unknown
+        company = {'id': company_id, 'name': name, 'website': website,
+                   'sector': str(row.get('sector') or '').strip() or 'Technology'}
+        expected_hq = str(row.get('expected_hq') or '').strip()
+        if expected_hq:
+            company['expected_hq'] = expected_hq
+        return company
+
+    def __iter__(self) -> Iterator[Dict]:
+        seen_ids = set()
+        seen_domains = set()
+        for row in self._raw_rows():
+            self.stats['read'] += 1
+            company = self.validate(row)
+            if company is None:
+                self.stats['invalid'] += 1
+                logger.warning(f"Skipping invalid company row: {row}")
+                continue
+
+            domain = site_key(company['website'])
+            if company['id'] in seen_ids:
+                self.stats['duplicate_id'] += 1
+                continue
+            if domain in seen_domains:
+                self.stats['duplicate_domain'] += 1
+                continue
+            seen_ids.add(company['id'])
+            seen_domains.add(domain)
+            # Deduplicated over the whole list first, so an id listed with two domains lands in one shard only
+            if self.shard and zlib.crc32(domain.encode('utf-8')) % self.shard[1] != self.shard[0]:
+                self.stats['other_shard'] += 1
+                continue
+
+            self.stats['yielded'] += 1
+            yield company
+
+        self.log_stats()
+
+    def log_stats(self):
+        source = self.path or 'built-in list'
+        shard = f" (shard {self.shard[0]}/{self.shard[1]})" if self.shard else ''
+        logger.info(f"Company input {source}{shard}: read {self.stats['read']}, "
+                    f"yielded {self.stats['yielded']}, invalid {self.stats['invalid']}, "
+                    f"duplicate ids {self.stats['duplicate_id']}, duplicate domains {self.stats['duplicate_domain']}, "
+                    f"other shards {self.stats['other_shard']}")
@@ -0,0 +1,257 @@
+import logging
+import re
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+from urllib.robotparser import RobotFileParser
+from xml.etree.ElementTree import ParseError, XMLPullParser
+
+logger = logging.getLogger(__name__)
+
+# Path segments that mark contact/office and news pages, best match first
+CONTACT_SEGMENTS = ('contact', 'office', 'location', 'about')
+NEWS_SEGMENTS = ('news', 'press', 'blog', 'media', 'updates')
+
+# Google stops reading robots.txt after 500 KiB
+MAX_ROBOTS_BYTES = 500 * 1024
+
+# Child sitemaps whose URL suggests they list pages or posts are read first
+_CHILD_SITEMAP_RE = re.compile(r'page|post|news|press|blog', re.I)
+_LASTMOD_RE = re.compile(r'(\d{4})-(\d{2})-(\d{2})')
+# Cheap pre-check so the bulk of a sitemap (products, posts) is skipped without splitting URLs
+_KEYWORD_RE = re.compile('|'.join(CONTACT_SEGMENTS + NEWS_SEGMENTS), re.I)
+
+
+def read_limited(chunks: Iterable[bytes], limit: int) -> bytes:
+    """Join streamed chunks, stopping once `limit` bytes have been read"""
+    data = []
+    size = 0
+    for chunk in chunks:
+        data.append(chunk)
+        size += len(chunk)
+        if size >= limit:
+            break
+    return b''.join(data)[:limit]
+
+
+def _origin(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme.lower()}://{parts.netloc.lower()}"
+
+
+class _RobotsEntry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.rules: Optional[RobotFileParser] = None
+
+
+class RobotsCache:
+    """robots.txt rules per site, fetched once and kept for the most recently used sites
+
+    A robots.txt that cannot be fetched (missing, an error, unreachable) is
+    treated as allowing everything. `on_crawl_delay` is called with the
+    site's URL and its Crawl-delay when the rules are loaded.
+    """
+
+    def __init__(self, fetch: Callable[[str], Optional[bytes]], user_agent: str,
+                 on_crawl_delay: Optional[Callable[[str, float], None]] = None, max_sites: int = 1024):
+        self.user_agent = user_agent
+        self.max_sites = max_sites
+        self.stats = {'fetched': 0, 'disallowed': 0}
+        self._fetch = fetch
+        self._on_crawl_delay = on_crawl_delay
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[str, _RobotsEntry]' = OrderedDict()
+
+    def rules(self, url: str) -> RobotFileParser:
+        origin = _origin(url)
+        with self._lock:
+            entry = self._entries.get(origin)
+            if entry is None:
+                entry = self._entries[origin] = _RobotsEntry()
+                while len(self._entries) > self.max_sites:
+                    self._entries.popitem(last=False)
+            else:
+                self._entries.move_to_end(origin)
+        # One fetch per site even when several threads ask at once
+        with entry.lock:
+            if entry.rules is None:
+                entry.rules = self._load(origin)
+            return entry.rules
+
+    def _load(self, origin: str) -> RobotFileParser:
+        body = self._fetch(f"{origin}/robots.txt")
+        rules = RobotFileParser(f"{origin}/robots.txt")
+        rules.parse(body.decode('utf-8', 'replace').splitlines() if body else [])
+        with self._lock:
+            self.stats['fetched'] += 1
+        delay = rules.crawl_delay(self.user_agent)
+        if delay and self._on_crawl_delay:
+            self._on_crawl_delay(origin, float(delay))
+        return rules
+
+    def allowed(self, url: str) -> bool:
+        if self.rules(url).can_fetch(self.user_agent, url):
+            return True
+        with self._lock:
+            self.stats['disallowed'] += 1
+        return False
+
+    def sitemaps(self, url: str) -> List[str]:
+        """Sitemap URLs the site's robots.txt lists"""
+        return list(self.rules(url).site_maps() or [])
+
+    def log_stats(self):
+        logger.info("Robots Summary:")
+        logger.info(f"  robots.txt fetched: {self.stats['fetched']}, "
+                    f"pages skipped as disallowed: {self.stats['disallowed']}")
+
+
+def _inflated(chunks: Iterable[bytes], max_bytes: int, step: int = 256 * 1024) -> Iterator[bytes]:
+    """Body chunks, gunzipped if the body is gzip, in pieces of at most `step` bytes up to `max_bytes`"""
+    inflate = None
+    size = 0
+    for chunk in chunks:
+        if inflate is None:
+            inflate = zlib.decompressobj(16 + zlib.MAX_WBITS) if chunk[:2] == b'\x1f\x8b' else False
+        while chunk:
+            if size >= max_bytes:
+                logger.warning(f"Sitemap larger than {max_bytes} bytes, using the part read")
+                return
+            # Bounded steps, so a small compressed chunk cannot expand all at once
+            if inflate:
+                data = inflate.decompress(chunk, step)
+                chunk = inflate.unconsumed_tail
+            else:
+                data, chunk = chunk[:step], chunk[step:]
+            size += len(data)
+            yield data
+
+
+def scan_sitemap(chunks: Iterable[bytes], on_page: Callable[[str, str], None], max_bytes: int,
+                 max_children: int = 50) -> List[str]:
+    """Stream a sitemap or sitemap index, gzip or plain, calling `on_page(loc, lastmod)` per page
+
+    Elements are dropped as soon as they are read, so memory stays flat
+    however many URLs the file lists. Returns the child sitemaps of an index.
+    """
+    parser = XMLPullParser(events=('start', 'end'))
+    root = None
+    children = []
+    try:
+        for data in _inflated(chunks, max_bytes):
+            parser.feed(data)
+            for event, element in parser.read_events():
+                if root is None:
+                    root = element
+                    continue
+                if event != 'end':
+                    continue
+                tag = element.tag.rsplit('}', 1)[-1]
+                if tag not in ('url', 'sitemap'):
+                    continue
+                fields = {child.tag.rsplit('}', 1)[-1]: (child.text or '').strip() for child in element}
+                loc = fields.get('loc')
+                if loc and tag == 'url':
+                    on_page(loc, fields.get('lastmod', ''))
+                elif loc and len(children) < max_children:
+                    children.append(loc)
+                root.clear()
+    except ParseError as e:
+        # Often an HTML error page served with status 200
+        logger.debug(f"Stopped reading sitemap: {e}")
+    return children
+
+
+class _PagePicker:
+    """Best few contact and news URLs seen in a stream of sitemap entries"""
+
+    def __init__(self, per_kind: int):
+        self.per_kind = per_kind
+        self.candidates: Dict[str, List[Tuple]] = {'contact': [], 'news': []}
+
+    def add(self, loc: str, lastmod: str):
+        if not _KEYWORD_RE.search(loc):
+            return
+        segments = [segment for segment in urlsplit(loc).path.lower().split('/') if segment]
+        if not segments:
+            return
+        match = _LASTMOD_RE.match(lastmod)
+        # Newest first among equals
+        age = -int(''.join(match.groups())) if match else 0
+
+        rank = _segment_rank(segments[-1], CONTACT_SEGMENTS)
+        if rank is not None:
+            self._keep('contact', (rank, len(segments), age, loc))
+        rank = _segment_rank(segments[-1], NEWS_SEGMENTS)
+        if rank is not None:
+            # A news/blog/press listing page
+            self._keep('news', (0, rank, len(segments), age, loc))
+        elif any(_segment_rank(segment, NEWS_SEGMENTS) is not None for segment in segments[:-1]):
+            # An article under one: the newest ones are worth reading
+            self._keep('news', (1, age, len(segments), 0, loc))
+
+    def _keep(self, kind: str, candidate: Tuple):
+        candidates = self.candidates[kind]
+        candidates.append(candidate)
+        if len(candidates) > 4 * self.per_kind:
+            candidates.sort()
+            del candidates[self.per_kind:]
+
+    def best(self, kind: str) -> List[str]:
+        return [candidate[-1] for candidate in sorted(self.candidates[kind])[:self.per_kind]]
+
+
+def _segment_rank(segment: str, keywords: Tuple[str, ...]) -> Optional[int]:
+    for rank, keyword in enumerate(keywords):
+        if keyword in segment:
+            return rank
+    return None
+
+
+class SitemapDiscovery:
+    """Contact/office and news pages picked from a site's sitemaps by path and lastmod
+
+    Sitemaps come from robots.txt, or /sitemap.xml when it lists none. At
+    most `max_files` files (including those reached through a sitemap index)
+    and `max_bytes` per file are read.
+    """
+
+    def __init__(self, fetch_stream: Callable[[str, Callable], Optional[object]],
+                 robots: Optional[RobotsCache] = None, max_files: int = 3,
+                 max_bytes: int = 20 * 1024 * 1024, per_kind: int = 5):
+        self.robots = robots
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self.per_kind = per_kind
+        self.stats = {'sites': 0, 'found': 0}
+        self._fetch_stream = fetch_stream
+        self._lock = threading.Lock()
+
+    def discover(self, website: str) -> Dict[str, List[str]]:
+        """{'contact': [...], 'news': [...]} best first; empty lists when the sitemaps have none"""
+        queue = (self.robots.sitemaps(website) if self.robots else []) or [urljoin(website, '/sitemap.xml')]
+        picker = _PagePicker(self.per_kind)
+        seen = set()
+        while queue and len(seen) < self.max_files:
+            url = queue.pop(0)
+            if url in seen:
+                continue
+            seen.add(url)
+            children = self._fetch_stream(url, lambda chunks: scan_sitemap(chunks, picker.add, self.max_bytes))
+            if children:
+                queue.extend(sorted(children, key=lambda child: not _CHILD_SITEMAP_RE.search(child)))
+
+        pages = {kind: [url for url in picker.best(kind) if not self.robots or self.robots.allowed(url)]
+                 for kind in ('contact', 'news')}
+        with self._lock:
+            self.stats['sites'] += 1
+            self.stats['found'] += 1 if any(pages.values()) else 0
+        return pages
+
+    def log_stats(self):
+        logger.info("Sitemap Discovery Summary:")
+        logger.info(f"  Sites with contact/news pages in their sitemap: {self.stats['found']} "
+                    f"of {self.stats['sites']}")
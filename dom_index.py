@@ -0,0 +1,280 @@
+import re
+from typing import Dict, List, Optional
+
+from bs4 import BeautifulSoup
+from bs4.element import CData, NavigableString, Tag
+
+from parsers import SelectolaxNode
+from structured_data import StructuredData
+
+# Candidate patterns shared with the extractors in main.py
+CLIENT_CLASS_RE = re.compile(r'client|partner|customer|logo|trust', re.I)
+TESTIMONIAL_CLASS_RE = re.compile(r'testimonial|review|case', re.I)
+ARTICLE_CLASS_RE = re.compile(r'post|article|news|blog', re.I)
+
+# Strings BeautifulSoup.get_text() includes (no comments, scripts or stylesheets)
+_BS4_TEXT_TYPES = (NavigableString, CData)
+_NON_TEXT_TAGS = {'script', 'style', 'template'}
+_HEADING_TAGS = {'h1', 'h2', 'h3', 'h4', 'h5'}
+_SECTION_TAGS = {'div', 'section'}
+_ARTICLE_TAGS = {'article', 'div'}
+
+# Ancestors that make a <p> match the main-content selectors, keyed by selector
+_PARAGRAPH_SCOPES = ['main p', '.main-content p', '.content p', 'section p']
+
+
+def class_matches(classes: List[str], pattern) -> bool:
+    """Match a class regex the way BeautifulSoup's class_ filter does"""
+    if not classes:
+        return False
+    return any(pattern.search(c) for c in classes) or bool(pattern.search(' '.join(classes)))
+
+
+def _soup_element(element):
+    """BeautifulSoup-style view of a walked element, for the few lookups delegated to the backend"""
+    return element if isinstance(element, Tag) else SelectolaxNode(element)
+
+
+def _script_text(element) -> str:
+    """Raw contents of a <script>, which get_text() leaves out on selectolax"""
+    return element.get_text() if isinstance(element, Tag) else element.text(deep=True)
+
+
+class IndexedNode:
+    """An element captured during the page walk, with lazily joined text"""
+
+    __slots__ = ('name', 'attrs', 'string', '_page', '_start', '_end', '_text',
+                 'images', 'heading', 'paragraph', 'link')
+
+    def __init__(self, page: 'PageIndex', name: str, attrs: Dict, start: int):
+        self.name = name
+        self.attrs = attrs
+        self.string = None
+        self._page = page
+        self._start = start
+        self._end = start
+        self._text = None
+        self.images = None
+        self.heading = None
+        self.paragraph = None
+        self.link = None
+
+    def get(self, key: str, default=None):
+        return self.attrs.get(key, default)
+
+    def __getitem__(self, key: str):
+        return self.attrs[key]
+
+    def get_text(self) -> str:
+        """Same result as BeautifulSoup's get_text(), computed once"""
+        if self._text is None:
+            self._text = ''.join(self._page._texts[self._start:self._end])
+        return self._text
+
+
+class PageIndex:
+    """Single traversal of a parsed page collecting every node the extractors need
+
+    Works on BeautifulSoup trees and on the selectolax adapter. The walk records
+    meta tags, the title, class-matched client/testimonial/article sections,
+    anchors, paragraphs inside main-content scopes, elements by class, JSON-LD
+    scripts and microdata items, and keeps each node's text as a span of the
+    document's text strings. Nothing in the index refers back to the tree,
+    so the tree can be released (parsers.release_tree) once it is indexed.
+    """
+
+    def __init__(self, soup):
+        self._texts: List[str] = []
+        self._text: Optional[str] = None
+        self.meta: Dict[tuple, IndexedNode] = {}
+        self.title: Optional[IndexedNode] = None
+        self.by_class: Dict[str, List[IndexedNode]] = {}
+        self.paragraphs: Dict[str, List[IndexedNode]] = {scope: [] for scope in _PARAGRAPH_SCOPES}
+        self.anchors: List[IndexedNode] = []
+        self.client_sections: List[IndexedNode] = []
+        self.testimonial_sections: List[IndexedNode] = []
+        self.articles: List[IndexedNode] = []
+        # Raw JSON-LD scripts and top-level microdata items ({'@type': ..., prop: [nodes or items]})
+        self.json_ld: List[str] = []
+        self.microdata: List[Dict] = []
+        self._structured: Optional[StructuredData] = None
+
+        # Walk state: ancestor scope depths and currently open candidate sections
+        self._scopes = {'main': 0, 'main-content': 0, 'content': 0, 'section': 0}
+        self._open_clients: List[IndexedNode] = []
+        self._open_articles: List[IndexedNode] = []
+        self._open_items: List[Dict] = []
+
+        if isinstance(soup, SelectolaxNode):
+            self._walk_selectolax(soup._node)
+        elif isinstance(soup, (BeautifulSoup, Tag)):
+            self._walk_bs4(soup)
+        else:
+            raise TypeError(f"Cannot index {type(soup).__name__}")
+
+    def get_text(self) -> str:
+        """Text of the whole document, as soup.get_text()"""
+        if self._text is None:
+            self._text = ''.join(self._texts)
+        return self._text
+
+    def find_meta(self, key: str, value: str) -> Optional[IndexedNode]:
+        """First <meta> whose attribute `key` equals `value`"""
+        return self.meta.get((key, value))
+
+    def select_class(self, selector: str) -> List[IndexedNode]:
+        """Elements matching a single-class selector such as '.hero-text'"""
+        return self.by_class.get(selector.lstrip('.'), [])
+
+    @property
+    def structured(self) -> StructuredData:
+        """schema.org and OpenGraph data declared by the page, read on first use"""
+        if self._structured is None:
+            self._structured = StructuredData(self)
+        return self._structured
+
+    def _walk_bs4(self, soup):
+        texts = self._texts
+        stack = [(None, None, iter(soup.contents))]
+        while stack:
+            for child in stack[-1][2]:
+                if isinstance(child, Tag):
+                    classes = child.get('class') or []
+                    if isinstance(classes, str):
+                        classes = classes.split()
+                    attrs = {k: (' '.join(v) if isinstance(v, list) else v) for k, v in child.attrs.items()}
+                    node, opened = self._enter(child.name, attrs, classes, child)
+                    stack.append((node, opened, iter(child.contents)))
+                    break
+                if type(child) in _BS4_TEXT_TYPES:
+                    # A plain copy: a NavigableString links back into the tree and would keep it alive
+                    texts.append(str(child))
+            else:
+                node, opened, _ = stack.pop()
+                if node is not None:
+                    self._exit(node, opened)
+
+    def _walk_selectolax(self, root):
+        texts = self._texts
+        stack = [(None, None, root.tag, root.iter(include_text=True))]
+        while stack:
+            parent_tag = stack[-1][2]
+            for child in stack[-1][3]:
+                tag = child.tag
+                if tag == '-text':
+                    if parent_tag not in _NON_TEXT_TAGS:
+                        texts.append(child.text_content or '')
+                    continue
+                if tag.startswith('-'):
+                    continue
+                attrs = {k: (v or '') for k, v in child.attributes.items()}
+                node, opened = self._enter(tag, attrs, attrs.get('class', '').split(), child)
+                stack.append((node, opened, tag, child.iter(include_text=True)))
+                break
+            else:
+                node, opened, _, _ = stack.pop()
+                if node is not None:
+                    self._exit(node, opened)
+
+    def _enter(self, name: str, attrs: Dict, classes: List[str], element):
+        node = IndexedNode(self, name, attrs, len(self._texts))
+
+        if name == 'meta':
+            for key in ('name', 'property'):
+                value = attrs.get(key)
+                if value is not None and (key, value) not in self.meta:
+                    self.meta[(key, value)] = node
+        elif name == 'title' and self.title is None:
+            self.title = node
+        elif name == 'a' and 'href' in attrs:
+            # Only anchors need .string (for link-text matching); ask the backend for it
+            string = _soup_element(element).string
+            node.string = str(string) if string is not None else None
+            self.anchors.append(node)
+        elif name == 'img':
+            for section in self._open_clients:
+                section.images.append(node)
+        elif name == 'script' and attrs.get('type', '').strip().lower() == 'application/ld+json':
+            self.json_ld.append(_script_text(element))
+        elif name in _NON_TEXT_TAGS and classes:
+            # get_text() on these tags returns their raw contents, which the walk skips
+            node._text = _soup_element(element).get_text()
+
+        # First heading, paragraph and link inside each open article candidate
+        if self._open_articles:
+            slot = None
+            if name in _HEADING_TAGS:
+                slot = 'heading'
+            elif name == 'p':
+                slot = 'paragraph'
+            elif name == 'a' and 'href' in attrs:
+                slot = 'link'
+            if slot:
+                for article in self._open_articles:
+                    if getattr(article, slot) is None:
+                        setattr(article, slot, node)
+
+        if name == 'p':
+            scopes = self._scopes
+            if scopes['main']:
+                self.paragraphs['main p'].append(node)
+            if scopes['main-content']:
+                self.paragraphs['.main-content p'].append(node)
+            if scopes['content']:
+                self.paragraphs['.content p'].append(node)
+            if scopes['section']:
+                self.paragraphs['section p'].append(node)
+
+        # Scopes and candidate sections this node opens, undone in _exit
+        opened = []
+        for cls in classes:
+            self.by_class.setdefault(cls, []).append(node)
+        if name == 'main':
+            opened.append('main')
+        if name == 'section':
+            opened.append('section')
+        if 'main-content' in classes:
+            opened.append('main-content')
+        if 'content' in classes:
+            opened.append('content')
+        for scope in opened:
+            self._scopes[scope] += 1
+
+        # Microdata: an itemscope opens an item, itemprop adds the node (or nested item) to the enclosing one
+        props = attrs.get('itemprop', '').split() if self._open_items else []
+        if 'itemscope' in attrs:
+            item = {'@type': attrs.get('itemtype', '')}
+            for prop in props:
+                self._open_items[-1].setdefault(prop, []).append(item)
+            if not props:
+                self.microdata.append(item)
+            self._open_items.append(item)
+            opened.append('item')
+        else:
+            for prop in props:
+                self._open_items[-1].setdefault(prop, []).append(node)
+
+        if name in _SECTION_TAGS and class_matches(classes, CLIENT_CLASS_RE):
+            node.images = []
+            self.client_sections.append(node)
+            self._open_clients.append(node)
+            opened.append('client')
+        if name in _SECTION_TAGS and class_matches(classes, TESTIMONIAL_CLASS_RE):
+            self.testimonial_sections.append(node)
+        if name in _ARTICLE_TAGS and class_matches(classes, ARTICLE_CLASS_RE):
+            self.articles.append(node)
+            self._open_articles.append(node)
+            opened.append('article')
+        return node, opened
+
+    def _exit(self, node: IndexedNode, opened: List[str]):
+        node._end = len(self._texts)
+        for scope in opened:
+            if scope == 'client':
+                self._open_clients.pop()
+            elif scope == 'article':
+                self._open_articles.pop()
+            elif scope == 'item':
+                self._open_items.pop()
+            else:
+                self._scopes[scope] -= 1
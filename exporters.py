@@ -0,0 +1,176 @@
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List
+
+# openpyxl and pyarrow take a good part of a second to import (numpy included), so they are imported
+# by the functions that write those formats rather than here
+
+logger = logging.getLogger(__name__)
+
+# A callable returning a fresh iterator over company records (one per table pass)
+RecordSource = Callable[[], Iterable[Dict]]
+# A callable returning the rows of one sheet by name ('Companies', 'Offices', ...), e.g. ResultStore.table_rows
+TableSource = Callable[[str], Iterable[List]]
+
+COMPANY_COLUMNS = ['company_id', 'company_name', 'company_website', 'sector', 'description',
+                   'data_quality', 'scrape_date']
+OFFICE_COLUMNS = ['company_id', 'office_id', 'location', 'address', 'is_headquarters']
+CLIENT_COLUMNS = ['company_id', 'client_id', 'client_name']
+NEWS_COLUMNS = ['company_id', 'news_id', 'news_title', 'news_date', 'news_url', 'news_summary']
+SUMMARY_COLUMNS = ['Total Companies', 'Total Offices', 'Total Clients', 'Total News Items', 'Scrape Date']
+
+
+def company_rows(records: Iterable[Dict]) -> Iterator[List]:
+    for data in records:
+        yield [data['company_id'], data['company_name'], data['company_website'], data.get('sector', ''),
+               data['description'], data.get('data_quality', ''), data['scrape_date']]
+
+
+def office_rows(records: Iterable[Dict]) -> Iterator[List]:
+    for data in records:
+        for i, office in enumerate(data['offices']):
+            yield [data['company_id'], f"{data['company_id']}_office_{i+1}", office.get('location', ''),
+                   office.get('address', ''), office.get('is_hq', False)]
+
+
+def client_rows(records: Iterable[Dict]) -> Iterator[List]:
+    for data in records:
+        for i, client in enumerate(data['clients']):
+            yield [data['company_id'], f"{data['company_id']}_client_{i+1}", client]
+
+
+def news_rows(records: Iterable[Dict]) -> Iterator[List]:
+    for data in records:
+        for i, news_item in enumerate(data['news']):
+            yield [data['company_id'], f"{data['company_id']}_news_{i+1}", news_item.get('title', ''),
+                   news_item.get('date', ''), news_item.get('url', ''), news_item.get('summary', '')]
+
+
+# Sheet/table name, columns, row generator and summary label
+TABLES = [
+    ('Companies', COMPANY_COLUMNS, company_rows, 'Total Companies'),
+    ('Offices', OFFICE_COLUMNS, office_rows, 'Total Offices'),
+    ('Clients', CLIENT_COLUMNS, client_rows, 'Total Clients'),
+    ('News', NEWS_COLUMNS, news_rows, 'Total News Items'),
+]
+
+def record_tables(source: RecordSource) -> TableSource:
+    """Sheet rows computed from company records, for exporting without a result store"""
+    generators = {sheet_name: rows for sheet_name, _, rows, _ in TABLES}
+    return lambda sheet_name: generators[sheet_name](source())
+
+
+def write_json(records: Iterable[Dict], filename: str):
+    """Write records as an indented JSON array, one record at a time"""
+    with open(filename, 'w', encoding='utf-8') as f:
+        f.write('[')
+        for i, data in enumerate(records):
+            # Same layout as json.dump(records, f, indent=2)
+            record = json.dumps(data, indent=2, ensure_ascii=False).replace('\n', '\n  ')
+            f.write((',\n  ' if i else '\n  ') + record)
+        f.write('\n]' if f.tell() > 1 else ']')
+
+
+def _header(sheet, columns: List[str]) -> List:
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Alignment, Border, Font, Side
+
+    # Header style pandas.DataFrame.to_excel applies, kept so the workbook looks the same
+    thin = Side(style='thin')
+    cells = []
+    for column in columns:
+        cell = WriteOnlyCell(sheet, value=column)
+        cell.font = Font(bold=True)
+        cell.border = Border(left=thin, right=thin, top=thin, bottom=thin)
+        cell.alignment = Alignment(horizontal='center', vertical='top')
+        cells.append(cell)
+    return cells
+
+
+def write_excel(tables: TableSource, filename: str):
+    """Stream rows into a write-only workbook with the Companies/Offices/Clients/News/Summary sheets"""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    totals = {}
+
+    for sheet_name, columns, _, total_label in TABLES:
+        sheet = None
+        count = 0
+        for row in tables(sheet_name):
+            if sheet is None:
+                sheet = workbook.create_sheet(sheet_name)
+                sheet.append(_header(sheet, columns))
+            sheet.append(row)
+            count += 1
+        # Like the DataFrame export, empty detail sheets are left out
+        if sheet is None and sheet_name == 'Companies':
+            workbook.create_sheet(sheet_name)
+        totals[total_label] = count
+
+    summary = workbook.create_sheet('Summary')
+    summary.append(_header(summary, SUMMARY_COLUMNS))
+    summary.append([totals['Total Companies'], totals['Total Offices'], totals['Total Clients'],
+                    totals['Total News Items'], datetime.now().isoformat()])
+    workbook.save(filename)
+    return totals
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc  # noqa: F401
+        import pyarrow.parquet as pq
+    except ImportError:  # pyarrow is optional, only needed for columnar exports
+        raise ImportError("Parquet/Arrow export requires: pip install pyarrow")
+    return pa, pq
+
+
+def _arrow_schema(columns: List[str]):
+    pa, _ = _pyarrow()
+    types = {'company_id': pa.int64(), 'is_headquarters': pa.bool_()}
+    return pa.schema([(column, types.get(column, pa.string())) for column in columns])
+
+
+def _write_table(path: str, columns: List[str], rows: Iterable[List], fmt: str, batch_rows: int) -> int:
+    pa, pq = _pyarrow()
+    schema = _arrow_schema(columns)
+    writer = pq.ParquetWriter(path, schema) if fmt == 'parquet' else pa.ipc.new_file(path, schema)
+    batch: List[List] = []
+    count = 0
+    try:
+        for row in rows:
+            batch.append(row)
+            count += 1
+            if len(batch) >= batch_rows:
+                writer.write_table(_arrow_table(batch, columns, schema))
+                batch.clear()
+        if batch:
+            writer.write_table(_arrow_table(batch, columns, schema))
+    finally:
+        writer.close()
+    return count
+
+
+def _arrow_table(batch: List[List], columns: List[str], schema):
+    pa, _ = _pyarrow()
+    return pa.Table.from_pydict({column: [row[i] for row in batch] for i, column in enumerate(columns)},
+                                schema=schema)
+
+
+def write_columnar(tables: TableSource, directory: str, fmt: str = 'parquet', batch_rows: int = 50000):
+    """Write the four tables as Parquet or Arrow IPC files, one bounded batch at a time"""
+    _pyarrow()
+    os.makedirs(directory, exist_ok=True)
+    extension = 'parquet' if fmt == 'parquet' else 'arrow'
+
+    written = {}
+    for sheet_name, columns, _, _ in TABLES:
+        path = os.path.join(directory, f"{sheet_name.lower()}.{extension}")
+        written[sheet_name] = _write_table(path, columns, tables(sheet_name), fmt, batch_rows)
+
+    logger.info(f"Wrote {fmt} tables to {directory}: " +
+                ', '.join(f"{name} {count}" for name, count in written.items()))
+    return written
@@ -0,0 +1,82 @@
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Markup that changes between requests (nonces, cache busters, build ids) without changing what the
+# extractors see. The leading literal '<' lets the regex engine skip ahead quickly.
+_VOLATILE_RE = re.compile(rb'<(?:script\b.*?</script\s*|style\b.*?</style\s*|!--.*?--)>', re.I | re.S)
+_WHITESPACE = b' \t\n\r\f\v'
+
+
+def page_fingerprint(body: Optional[bytes]) -> Optional[str]:
+    """Hash of a page without scripts, styles, comments and whitespace (None for a failed fetch)"""
+    if body is None:
+        return None
+    # bytes.translate deletes whitespace in C; collapsing runs with a regex is ~20x slower on big pages
+    normalized = _VOLATILE_RE.sub(b'', body).translate(None, _WHITESPACE)
+    return hashlib.blake2b(normalized, digest_size=16).hexdigest()
+
+
+class FingerprintStore:
+    """Page fingerprints and the record extracted from them, per company, kept between runs
+
+    `salt` identifies the extraction settings (e.g. the parser backend); a
+    record stored under a different salt is never reused.
+    """
+
+    def __init__(self, path: str, salt: str = ''):
+        self.path = path
+        self.salt = salt
+        self.stats = {'unchanged': 0, 'partial': 0, 'changed': 0, 'new': 0}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS fingerprints (
+                company_id TEXT PRIMARY KEY,
+                website TEXT NOT NULL,
+                salt TEXT NOT NULL,
+                pages TEXT NOT NULL,
+                record TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+    def get(self, company: Dict) -> Optional[Tuple[Dict[str, Optional[str]], Dict]]:
+        """(URL -> fingerprint, record) from the last run, if it used the same website and settings"""
+        with self._lock:
+            row = self._conn.execute('SELECT website, salt, pages, record FROM fingerprints WHERE company_id = ?',
+                                     (str(company['id']),)).fetchone()
+        if row is None or row[0] != company['website'] or row[1] != self.salt:
+            return None
+        return json.loads(row[2]), json.loads(row[3])
+
+    def put(self, company: Dict, pages: Dict[str, Optional[str]], record: Dict):
+        with self._lock:
+            self._conn.execute('INSERT OR REPLACE INTO fingerprints VALUES (?, ?, ?, ?, ?, ?)',
+                               (str(company['id']), company['website'], self.salt, json.dumps(pages),
+                                json.dumps(record, ensure_ascii=False), time.time()))
+            self._conn.commit()
+
+    def record(self, outcome: str):
+        """Count a company as 'unchanged', 'partial', 'changed' or 'new'"""
+        with self._lock:
+            self.stats[outcome] += 1
+
+    def log_stats(self):
+        logger.info("Incremental Re-scrape Summary:")
+        logger.info(f"  Unchanged (reused): {self.stats['unchanged']}, partially changed: {self.stats['partial']}, "
+                    f"fully re-extracted: {self.stats['changed'] + self.stats['new']} "
+                    f"(new: {self.stats['new']})")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,159 @@
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional
+from urllib.parse import parse_qsl, urldefrag, urlencode, urljoin, urlsplit, urlunsplit
+
+logger = logging.getLogger(__name__)
+
+ALLOWED_SCHEMES = {'http', 'https'}
+
+# Query parameters that only track campaigns/clicks and never change the page
+TRACKING_PARAMS = {'gclid', 'fbclid', 'msclkid', 'yclid', 'igshid', 'mc_cid', 'mc_eid',
+                   '_ga', '_gl', 'ref_src', '_hsenc', '_hsmi', '__hstc', '__hssc', '__hsfp'}
+TRACKING_PREFIXES = ('utm_', 'hsa_', 'pk_')
+
+
+def canonicalize_url(url: str) -> str:
+    """Normalise a URL so equivalent spellings compare equal
+
+    Lowercases scheme and host, drops default ports, fragments, tracking
+    parameters and trailing slashes (except the root path), and sorts the
+    remaining query parameters.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower().rstrip('.')
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    if port and not ((scheme == 'http' and port == 80) or (scheme == 'https' and port == 443)):
+        host = f"{host}:{port}"
+
+    path = parts.path or '/'
+    if len(path) > 1:
+        path = path.rstrip('/') or '/'
+
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+             if k not in TRACKING_PARAMS and not k.lower().startswith(TRACKING_PREFIXES)]
+    return urlunsplit((scheme, host, path, urlencode(sorted(query)), ''))
+
+
+def site_key(url: str) -> str:
+    """Host of a URL without a leading www., used to decide what is on-site"""
+    host = (urlsplit(url).hostname or '').lower().rstrip('.')
+    return host[4:] if host.startswith('www.') else host
+
+
+class RunFrontier:
+    """Run-wide URL bookkeeping: rejected links, deduplicated fetches and a small shared page cache"""
+
+    def __init__(self, max_shared_pages: int = 64):
+        self.max_shared_pages = max_shared_pages
+        self.stats = {'fetched': 0, 'deduplicated': 0, 'bad_scheme': 0, 'off_site': 0}
+        self._lock = threading.Lock()
+        self._pages: 'OrderedDict[str, object]' = OrderedDict()
+
+    def for_company(self, website: str, fetch: Callable[[str], Optional[object]],
+                    sitemap: Optional[Dict[str, List[str]]] = None) -> 'CompanyFrontier':
+        return CompanyFrontier(website, fetch, self, sitemap)
+
+    def count(self, stat: str):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def merge_stats(self, stats: Dict[str, int]):
+        """Add counters collected by another frontier, e.g. in a worker process"""
+        with self._lock:
+            for stat, count in stats.items():
+                self.stats[stat] += count
+
+    def shared_page(self, url: str):
+        with self._lock:
+            if url in self._pages:
+                self._pages.move_to_end(url)
+                self.stats['deduplicated'] += 1
+                return self._pages[url]
+        return None
+
+    def remember_page(self, url: str, page):
+        with self._lock:
+            self.stats['fetched'] += 1
+            self._pages[url] = page
+            self._pages.move_to_end(url)
+            while len(self._pages) > self.max_shared_pages:
+                self._pages.popitem(last=False)
+
+    def log_stats(self):
+        logger.info("URL Frontier Summary:")
+        logger.info(f"  Fetched: {self.stats['fetched']}, deduplicated: {self.stats['deduplicated']}, "
+                    f"dropped non-http: {self.stats['bad_scheme']}, dropped off-site: {self.stats['off_site']}")
+
+
+class CompanyFrontier:
+    """Sub-page links and fetched pages for one company
+
+    Links are resolved against the website, canonicalized, and dropped if they
+    are not http(s), point off-site, or were already chosen. Each page is
+    fetched at most once and the parsed result is shared by every extractor.
+    `sitemap` holds the contact/news pages found in the site's sitemaps.
+    """
+
+    def __init__(self, website: str, fetch: Callable[[str], Optional[object]], run: Optional[RunFrontier] = None,
+                 sitemap: Optional[Dict[str, List[str]]] = None):
+        self.website = website
+        self.sitemap = sitemap or {}
+        self.home_url = canonicalize_url(website)
+        self.site = site_key(website)
+        self.run = run or RunFrontier()
+        self._fetch = fetch
+        self._pages: Dict[str, Optional[object]] = {}
+
+    def add_page(self, url: str, page):
+        """Register an already fetched page, e.g. the homepage"""
+        self._pages[canonicalize_url(url)] = page
+
+    def admit(self, href: str) -> Optional[str]:
+        """Absolute URL (without fragment) for a link, or None if it must not be fetched"""
+        url = urldefrag(urljoin(self.website, href.strip()))[0]
+        scheme = urlsplit(url).scheme.lower()
+        if scheme not in ALLOWED_SCHEMES:
+            self.run.count('bad_scheme')
+            return None
+        host = site_key(url)
+        if host != self.site and not host.endswith('.' + self.site):
+            self.run.count('off_site')
+            return None
+        return url
+
+    def select(self, hrefs: Iterable[str], limit: int) -> List[str]:
+        """First `limit` distinct fetchable sub-page URLs among the links, excluding the homepage"""
+        selected = []
+        seen = {self.home_url}
+        for href in hrefs:
+            url = self.admit(href)
+            if url is None:
+                continue
+            key = canonicalize_url(url)
+            if key in seen:
+                continue
+            seen.add(key)
+            selected.append(url)
+            if len(selected) >= limit:
+                break
+        return selected
+
+    def page(self, url: str):
+        """Fetched page for a URL, fetching it at most once per company and run"""
+        key = canonicalize_url(url)
+        if key in self._pages:
+            self.run.count('deduplicated')
+            return self._pages[key]
+        page = self.run.shared_page(key)
+        if page is None:
+            page = self._fetch(url)
+            if page is not None:
+                self.run.remember_page(key, page)
+        self._pages[key] = page
+        return page
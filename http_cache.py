@@ -0,0 +1,151 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+from frontier import canonicalize_url
+
+logger = logging.getLogger(__name__)
+
+
+class CachedResponse:
+    """A stored HTTP response"""
+
+    def __init__(self, url: str, status: int, headers: Dict[str, str], body: bytes, stored_at: float):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.stored_at = stored_at
+
+    @property
+    def etag(self) -> Optional[str]:
+        return self.headers.get('etag')
+
+    @property
+    def last_modified(self) -> Optional[str]:
+        return self.headers.get('last-modified')
+
+    def is_fresh(self, ttl: float) -> bool:
+        return time.time() - self.stored_at < ttl
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers for revalidating this entry"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class HttpCache:
+    """Persistent SQLite-backed response cache with TTL and size-based LRU eviction"""
+
+    def __init__(self, cache_dir: str, ttl: float = 86400, max_bytes: int = 500 * 1024 * 1024,
+                 cache_only: bool = False):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.cache_only = cache_only
+        self.stats = {'hits': 0, 'revalidated': 0, 'misses': 0, 'stores': 0, 'evictions': 0, 'bytes_saved': 0}
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(cache_dir, 'responses.sqlite'), check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at)')
+        self._conn.commit()
+        # Bytes stored, summed once here and kept up to date by put and _evict
+        self._total_bytes = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        """Look up a stored response and mark it as recently used"""
+        key = canonicalize_url(url)
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT status, headers, body, stored_at FROM responses WHERE url = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute('UPDATE responses SET accessed_at = ? WHERE url = ?', (time.time(), key))
+            self._conn.commit()
+        status, headers, body, stored_at = row
+        return CachedResponse(key, status, json.loads(headers), body, stored_at)
+
+    def put(self, url: str, status: int, headers, body: bytes):
+        """Store a response and evict least recently used entries over the size limit"""
+        key = canonicalize_url(url)
+        stored_headers = {k.lower(): v for k, v in headers.items()}
+        now = time.time()
+        with self._lock:
+            replaced = self._conn.execute('SELECT size FROM responses WHERE url = ?', (key,)).fetchone()
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (key, status, json.dumps(stored_headers), body, len(body), now, now)
+            )
+            self._total_bytes += len(body) - (replaced[0] if replaced else 0)
+            self.stats['stores'] += 1
+            self._evict()
+            self._conn.commit()
+
+    def refresh(self, cached: CachedResponse, headers=None):
+        """Restart the TTL of an entry after a 304 Not Modified"""
+        merged = dict(cached.headers)
+        for k, v in (headers or {}).items():
+            if k.lower() in ('etag', 'last-modified', 'cache-control', 'expires', 'date'):
+                merged[k.lower()] = v
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'UPDATE responses SET headers = ?, stored_at = ?, accessed_at = ? WHERE url = ?',
+                (json.dumps(merged), now, now, cached.url)
+            )
+            self._conn.commit()
+
+    def record(self, outcome: str, saved_bytes: int = 0):
+        """Count a cache outcome ('hits', 'revalidated' or 'misses')"""
+        with self._lock:
+            self.stats[outcome] += 1
+            self.stats['bytes_saved'] += saved_bytes
+
+    def _evict(self):
+        # Least recently used entries go in small batches, so nothing is scanned while under the limit
+        while self._total_bytes > self.max_bytes:
+            rows = self._conn.execute('SELECT url, size FROM responses ORDER BY accessed_at LIMIT 64').fetchall()
+            if not rows:
+                self._total_bytes = 0
+                return
+            for url, size in rows:
+                if self._total_bytes <= self.max_bytes:
+                    break
+                self._conn.execute('DELETE FROM responses WHERE url = ?', (url,))
+                self._total_bytes -= size
+                self.stats['evictions'] += 1
+
+    def log_stats(self):
+        """Log hit/miss counters for the run"""
+        lookups = self.stats['hits'] + self.stats['revalidated'] + self.stats['misses']
+        hit_rate = (self.stats['hits'] + self.stats['revalidated']) / lookups * 100 if lookups else 0.0
+        logger.info("HTTP Cache Summary:")
+        logger.info(f"  Hits: {self.stats['hits']}, revalidated (304): {self.stats['revalidated']}, "
+                    f"misses: {self.stats['misses']} ({hit_rate:.1f}% hit rate)")
+        logger.info(f"  Stored: {self.stats['stores']}, evicted: {self.stats['evictions']}, "
+                    f"bytes saved: {self.stats['bytes_saved']}")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -1,129 +1,464 @@
 import requests
 from bs4 import BeautifulSoup
-import pandas as pd
-import time
+import argparse
 import logging
 import re
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime
-import json
-from typing import Dict, List, Optional
+import time
+from contextlib import contextmanager, nullcontext
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional, Tuple, Union
 import warnings
+
+from address_matcher import AddressMatcher
+from checkpoint import JsonlCheckpoint
+from client_matcher import CLIENT_NAME_RE, CLIENT_SKIP_RE, DESCRIPTION_SKIP_RE, OrganizationGazetteer
+from company_sources import DEFAULT_COMPANIES, CompanySource, parse_shard
+from discovery import MAX_ROBOTS_BYTES, RobotsCache, SitemapDiscovery, read_limited
+from dom_index import PageIndex
+from exporters import TableSource, record_tables, write_columnar, write_excel, write_json
+from fingerprints import FingerprintStore, page_fingerprint
+from frontier import CompanyFrontier, RunFrontier, canonicalize_url
+from http_cache import HttpCache
+from metrics import RunMetrics, TimedHTTPAdapter, take_connect_time
+from parsers import PARSER_BACKENDS, detect_encoding, parse_html, release_tree
+from pipeline import ExtractionPipeline, RawPages
+from politeness import HostPoliteness
+from records import CompanyRecord
+from result_store import ResultStore
+from structured_data import StructuredData
+from transport import (CONNECT_TIMEOUT, RETRY_STATUSES, THROTTLE_STATUSES, CircuitBreaker, Deadline,
+                       DeadlineExceeded, RetryPolicy, is_dns_failure, parse_retry_after)
+from work_queue import WorkQueue, default_worker_id
+if TYPE_CHECKING:
+    from profiling import CompanyProfiler  # imported by main() only when --profile is given
 warnings.filterwarnings('ignore')
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+CONTACT_LINK_RE = re.compile(r'(contact|office|location|about)', re.I)
+
+def _body(raw) -> Optional[bytes]:
+    return raw[1] if raw else None
+
+def _note_source(sources: Optional[Dict[str, str]], field: str, used: Iterable[str]):
+    """Record which extraction paths produced a field, e.g. 'json-ld' or 'microdata+heuristic'"""
+    if sources is not None:
+        sources[field] = '+'.join(dict.fromkeys(source for source in used if source))
+
 class EnhancedCompanyScraper:
-    def __init__(self):
+    def __init__(self, max_workers: int = 8, host_delay: float = 3.0, max_per_host: int = 1,
+                 cache: Optional[HttpCache] = None, parser: str = 'lxml',
+                 checkpoint: Optional[Union[ResultStore, JsonlCheckpoint]] = None, companies: Optional[Iterable[Dict]] = None,
+                 processes: int = 0, metrics: Optional[RunMetrics] = None,
+                 fingerprints: Optional[FingerprintStore] = None, max_page_bytes: int = 5 * 1024 * 1024,
+                 retry: Optional[RetryPolicy] = None, breaker: Optional[CircuitBreaker] = None,
+                 robots: bool = True, sitemaps: bool = True,
+                 organizations: Optional[OrganizationGazetteer] = None, company_budget: Optional[float] = 60.0,
+                 profiler: Optional['CompanyProfiler'] = None):
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
         
-        # Enhanced company data with known information
-        self.companies = [
-            {
-                'id': 5875, 'name': 'Solarkal', 'website': 'https://www.solarkal.com/',
-                'sector': 'Solar Energy', 'expected_hq': 'India'
-            },
-            {
-                'id': 11917, 'name': 'H2Scan', 'website': 'https://h2scan.com/',
-                'sector': 'Hydrogen Sensors', 'expected_hq': 'USA'
-            },
-            {
-                'id': 34005, 'name': 'Eo Charging', 'website': 'https://www.eocharging.com/',
-                'sector': 'EV Charging', 'expected_hq': 'UK'
-            },
-            {
-                'id': 65212, 'name': 'Prewave', 'website': 'https://www.prewave.com/',
-                'sector': 'Supply Chain AI', 'expected_hq': 'Austria'
-            },
-            {
-                'id': 18533, 'name': 'Viriciti', 'website': 'https://www.chargepoint.com/',
-                'sector': 'Fleet Management', 'expected_hq': 'Netherlands'
-            },
-            {
-                'id': 2805, 'name': 'EasyMile', 'website': 'https://www.easymile.com/',
-                'sector': 'Autonomous Vehicles', 'expected_hq': 'France'
-            },
-            {
-                'id': 101741, 'name': 'Everstream', 'website': 'https://www.everstream.ai/',
-                'sector': 'Supply Chain Analytics', 'expected_hq': 'USA'
-            },
-            {
-                'id': 110133, 'name': 'Altus Power', 'website': 'https://www.altuspower.com/',
-                'sector': 'Solar Energy', 'expected_hq': 'USA'
-            },
-            {
-                'id': 12605, 'name': 'Charm Industrial', 'website': 'https://www.charmindustrial.com/',
-                'sector': 'Carbon Removal', 'expected_hq': 'USA'
-            },
-            {
-                'id': 105894, 'name': 'Isotropic Systems', 'website': 'https://www.all.space/',
-                'sector': 'Satellite Technology', 'expected_hq': 'UK'
-            },
-            {
-                'id': 400, 'name': 'Caban Systems', 'website': 'https://www.cabanenergy.com/',
-                'sector': 'Energy Storage', 'expected_hq': 'USA'
-            },
-            {
-                'id': 34204, 'name': 'BioBTX', 'website': 'https://biobtx.com/',
-                'sector': 'Chemical Recycling', 'expected_hq': 'Netherlands'
-            },
-            {
-                'id': 6134, 'name': 'Hydrogenious LOHC', 'website': 'https://hydrogenious.net/',
-                'sector': 'Hydrogen Storage', 'expected_hq': 'Germany'
-            },
-            {
-                'id': 12008, 'name': 'Iogen', 'website': 'https://www.iogen.com/',
-                'sector': 'Biofuels', 'expected_hq': 'Canada'
-            },
-            {
-                'id': 6997, 'name': 'Infinited Fiber Company', 'website': 'https://infinitedfiber.com/',
-                'sector': 'Sustainable Textiles', 'expected_hq': 'Finland'
-            }
-        ]
+        # Concurrency: companies run in parallel, each host is paced on its own
+        self.max_workers = max(1, max_workers)
+        self.politeness = HostPoliteness(delay=host_delay, max_per_host=max_per_host)
+        # Keep-alive pools for the hosts of the companies in flight, sized to the per-host limit
+        adapter = TimedHTTPAdapter(pool_connections=self.max_workers * 2, pool_maxsize=self.politeness.max_per_host)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        
+        # Transient failures are retried with backoff; hosts that keep failing are skipped for a while
+        self.retry_policy = retry or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        
+        # Seconds all requests for one company may take (None or 0: no limit), see transport.Deadline
+        self.company_budget = company_budget
+        self._local = threading.local()
+        # A company's sub-pages are fetched in parallel on these threads
+        self._subpage_fetchers = ThreadPoolExecutor(max_workers=self.max_workers * 4)
+        
+        # robots.txt rules (disallow, crawl-delay) for every request, and sitemaps to find sub-pages
+        self.robots = (RobotsCache(self._fetch_robots, self.session.headers['User-Agent'],
+                                   self.politeness.set_crawl_delay) if robots else None)
+        self.sitemaps = SitemapDiscovery(self.fetch_stream, self.robots) if sitemaps else None
+        
+        # Parse/extract in this many worker processes behind the fetch threads (0: all in threads)
+        self.processes = max(0, processes)
+        
+        # Bodies are streamed and cut off at this size
+        self.max_page_bytes = max_page_bytes
+        
+        # Optional persistent response cache shared by all fetches
+        self.cache = cache
+        
+        # HTML parser backend, see parsers.PARSER_BACKENDS
+        self.parser = parser
+        
+        self.address_matcher = AddressMatcher()
+        
+        # Optional dictionary of known organizations for client extraction
+        self.organizations = organizations
+        
+        # Optional page fingerprints from earlier runs; unchanged companies reuse their record
+        self.fingerprints = fingerprints
+        
+        # Fetch/parse/extractor timings, rolled up per company and per run
+        self.metrics = metrics or RunMetrics()
+        
+        # Canonical URL bookkeeping for sub-page fetches across the run
+        self.frontier = RunFrontier()
         
-        self.scraped_data = []
+        # Companies to scrape: any iterable of dicts, e.g. a streamed CompanySource
+        self.companies = companies if companies is not None else list(DEFAULT_COMPANIES)
+        
+        # Finished records held in memory when there is no checkpoint (see scraped_data)
+        self._records: List[CompanyRecord] = []
+        
+        # Optional SQLite store or JSONL file records are streamed to (and resumed from), or a WorkQueue
+        self.checkpoint = checkpoint
+        
+        # Optional per-company cProfile/tracemalloc reports (profiling.CompanyProfiler); without one no
+        # profiling code is even imported
+        self.profiler = profiler
+        if profiler:
+            if self.processes:
+                raise ValueError("Profiling needs extraction in the fetch threads (processes=0)")
+            profiler.instrument(self)
     
     def fetch_page(self, url: str, timeout: int = 15) -> Optional[BeautifulSoup]:
         """Fetch and parse a web page with enhanced error handling"""
+        raw = self.fetch_raw(url, timeout)
+        return self._parse_html(url, *raw) if raw else None
+    
+    def fetch_raw(self, url: str, timeout: int = 15) -> Optional[Tuple[Dict[str, str], bytes]]:
+        """Fetch a page's headers and body, from the cache when possible, without parsing it"""
+        try:
+            if self.robots and not self.robots.allowed(url):
+                self.metrics.record_fetch('disallowed', {})
+                logger.info(f"Skipping {url}: disallowed by robots.txt")
+                return None
+        except DeadlineExceeded:
+            self._out_of_time(url)
+            return None
+        return self._fetch(url, timeout)
+    
+    def fetch_concurrently(self, urls: List[str], deadline: Optional[Deadline] = None) -> RawPages:
+        """Fetch pages in parallel, waiting at most until the deadline
+        
+        A page still loading when the deadline passes is left as None: its
+        request is cancelled if it has not started, and otherwise gives up by
+        itself moments later, since its timeouts and download are bound to the
+        same deadline.
+        """
+        timings = self.metrics.current()
+        
+        def fetch(url: str):
+            with self.metrics.track(timings), self.within(deadline):
+                return self.fetch_raw(url)
+        
+        futures = {self._subpage_fetchers.submit(fetch, url): url for url in urls}
+        done, _ = wait(futures, timeout=deadline.remaining() if deadline else None)
+        pages = {}
+        for future, url in futures.items():
+            if future in done:
+                pages[canonicalize_url(url)] = future.result()
+                continue
+            pages[canonicalize_url(url)] = None
+            if future.cancel():
+                self._out_of_time(url, deadline)
+            else:
+                # Still running: counted when the request gives up, moments from now
+                deadline.truncate(url)
+        return pages
+    
+    @contextmanager
+    def within(self, deadline: Optional[Deadline]):
+        """Apply a company's deadline to every request made in this thread (None keeps the current one)"""
+        previous = getattr(self._local, 'deadline', None)
+        self._local.deadline = deadline or previous
+        try:
+            yield
+        finally:
+            self._local.deadline = previous
+    
+    def _deadline(self) -> Optional[Deadline]:
+        return getattr(self._local, 'deadline', None)
+    
+    def _out_of_time(self, url: str, deadline: Optional[Deadline] = None, phases: Optional[Dict] = None):
+        """Count a request given up on because its company's time budget ran out"""
+        self.metrics.record_fetch('deadline', phases or {})
+        deadline = deadline or self._deadline()
+        if deadline:
+            deadline.truncate(url)
+        logger.warning(f"Out of time for {url}")
+    
+    def fetch_stream(self, url: str, consume: Callable[[Iterable[bytes]], object], timeout: int = 15):
+        """Fetch a resource of any content type (robots.txt, sitemaps) and return `consume(body chunks)`
+        
+        The body is never held in full unless it is small enough to be cached.
+        """
         try:
-            response = self.session.get(url, timeout=timeout, allow_redirects=True)
+            if self.robots and not self.robots.allowed(url):
+                return None
+        except DeadlineExceeded:
+            self._out_of_time(url)
+            return None
+        raw = self._fetch(url, timeout, consume)
+        return raw[1] if raw else None
+    
+    def _fetch_robots(self, url: str) -> Optional[bytes]:
+        raw = self._fetch(url, 15, lambda chunks: read_limited(chunks, MAX_ROBOTS_BYTES))
+        deadline = self._deadline()
+        if raw is None and deadline and deadline.expired():
+            # Not "no robots.txt": the rules are loaded again for the site's next company
+            raise DeadlineExceeded(url)
+        return raw[1] if raw else None
+    
+    def _fetch(self, url: str, timeout: int, consume: Optional[Callable] = None):
+        cached = self.cache.get(url) if self.cache else None
+        if cached and (self.cache.cache_only or cached.is_fresh(self.cache.ttl)):
+            self.cache.record('hits', len(cached.body))
+            self.metrics.record_fetch('cache', {})
+            return cached.headers, consume([cached.body]) if consume else cached.body
+        if self.cache and self.cache.cache_only:
+            self.cache.record('misses')
+            logger.warning(f"Cache-only mode: no cached copy of {url}")
+            return None
+        
+        with self.metrics.stage('fetch'):
+            return self._download(url, timeout, cached, consume)
+    
+    def _download(self, url: str, timeout: int, cached, consume: Optional[Callable] = None):
+        """Request a page, retrying transient failures with backoff unless its host keeps failing"""
+        host = HostPoliteness.host_key(url)
+        deadline = self._deadline()
+        attempt = 0
+        while True:
+            if deadline and deadline.expired():
+                self._out_of_time(url, deadline)
+                return None
+            if not self.breaker.allow(host):
+                self.metrics.record_fetch('circuit_open', {})
+                logger.warning(f"Skipping {url}: {host} keeps failing")
+                return None
+            raw, outcome, retry_after = self._attempt(url, timeout, cached, consume)
+            if outcome == 'abandoned':
+                # Says nothing about the host, but a half-open trial must not stay in flight forever
+                self.breaker.release(host)
+                return None
+            if outcome == 'ok':
+                self.breaker.success(host)
+                return raw
+            if outcome == 'failed':
+                # Not worth retrying, but the host did fail: enough of these open its circuit
+                self.breaker.failure(host)
+                return None
+            if outcome == 'final':
+                # An answer such as a 4xx neither proves nor disproves the host is healthy
+                self.breaker.release(host)
+                return None
+            self.breaker.failure(host)
+            backoff = self.retry_policy.delay(attempt, retry_after)
+            if backoff is None:
+                return None
+            if deadline and deadline.expires is not None and backoff >= deadline.remaining():
+                self._out_of_time(url, deadline)
+                return None
+            attempt += 1
+            logger.info(f"Retrying {url} in {backoff:.1f}s (attempt {attempt + 1})")
+            self.metrics.record_retry()
+            time.sleep(backoff)
+            self.metrics.add_stage('backoff', backoff)
+    
+    def _attempt(self, url: str, timeout: int, cached, consume: Optional[Callable] = None):
+        """One request: (headers and body or None, outcome, Retry-After seconds)
+        
+        The outcome is 'ok'; 'retry' for transient failures; 'failed' when the
+        host failed in a way a retry will not fix (unresolvable name, 5xx
+        outside RETRY_STATUSES, a body cut off mid-transfer); 'final' for an
+        answer that is not wanted (4xx, non-HTML); or 'abandoned' at the deadline.
+        
+        Only HTML is accepted unless a `consume` callback reads the body.
+        Under a deadline the timeouts and the politeness wait are cut to the
+        time left, and a body still downloading when it passes is abandoned.
+        """
+        phases = {'wait': 0.0}
+        deadline = self._deadline()
+        if deadline:
+            timeout = deadline.timeout(timeout)
+        try:
+            headers = cached.validators() if cached else {}
+            take_connect_time()
+            start = time.perf_counter()
+            with self.politeness.slot(url, deadline.remaining() if deadline else None):
+                phases['wait'] = time.perf_counter() - start
+                self.metrics.add_stage('wait', phases['wait'])
+                # Streamed, so the body is only read once status and content type are known
+                with self.session.get(url, timeout=(min(CONNECT_TIMEOUT, timeout), timeout),
+                                      allow_redirects=True, headers=headers, stream=True) as response, \
+                        (deadline.guard(response) if deadline else nullcontext()):
+                    # Connect and time-to-first-byte come from the transport, the rest is the body download
+                    phases['connect'] = take_connect_time()
+                    self.metrics.add_stage('connect', phases['connect'])
+                    header_time = sum(r.elapsed.total_seconds() for r in response.history + [response])
+                    phases['ttfb'] = max(header_time - phases['connect'], 0.0)
+                    
+                    wanted = consume is not None or 'text/html' in response.headers.get('content-type', '')
+                    body, size, result = b'', 0, None
+                    if response.ok and response.status_code != 304 and wanted:
+                        if consume is None:
+                            body = self._read_body(url, response, deadline)
+                            size = len(body)
+                        else:
+                            result, body, size = self._consume_body(response, consume, deadline)
+                    phases['download'] = max(time.perf_counter() - start - phases['wait'] - header_time, 0.0)
+            self.metrics.record_fetch(str(response.status_code), phases, size, len(response.history))
+            
+            if response.status_code in RETRY_STATUSES:
+                retry_after = parse_retry_after(response.headers.get('retry-after'))
+                if response.status_code in THROTTLE_STATUSES:
+                    self.politeness.throttle(url, retry_after)
+                logger.warning(f"HTTP {response.status_code} from {url}")
+                return None, 'retry', retry_after
+            self.politeness.observe(url, header_time)
+            
+            # Stale entry confirmed unchanged by the server
+            if cached and response.status_code == 304:
+                self.cache.refresh(cached, response.headers)
+                self.cache.record('revalidated', len(cached.body))
+                return (cached.headers, consume([cached.body]) if consume else cached.body), 'ok', None
+            
             response.raise_for_status()
             
-            # Handle different content types
-            if 'text/html' in response.headers.get('content-type', ''):
-                return BeautifulSoup(response.content, 'html.parser')
-            else:
+            if self.cache:
+                self.cache.record('misses')
+            if not wanted:
                 logger.warning(f"Non-HTML content for {url}")
-                return None
+                return None, 'final', None
+            if self.cache and body is not None:
+                self.cache.put(url, response.status_code, response.headers, body)
+            
+            return ({k.lower(): v for k, v in response.headers.items()},
+                    result if consume else body), 'ok', None
                 
+        except DeadlineExceeded:
+            return self._abandon(url, deadline, phases)
         except requests.exceptions.Timeout:
+            if deadline and deadline.expired():
+                return self._abandon(url, deadline, phases)
+            self.metrics.record_fetch('timeout', phases)
             logger.error(f"Timeout fetching {url}")
-        except requests.exceptions.ConnectionError:
+            return None, 'retry', None
+        except requests.exceptions.ConnectionError as e:
+            if deadline and deadline.expired():
+                return self._abandon(url, deadline, phases)
+            self.metrics.record_fetch('connection_error', phases)
             logger.error(f"Connection error for {url}")
+            # A name that does not resolve will not resolve on the next attempt either
+            return None, 'failed' if is_dns_failure(e) else 'retry', None
+        except requests.exceptions.HTTPError as e:
+            # Already counted under its status code. Most sites have no robots.txt or sitemap, so a 4xx on those
+            # (the `consume` fetches) is routine
+            client_error = e.response is not None and e.response.status_code < 500
+            if consume is not None and client_error:
+                logger.debug(f"No {url}: HTTP {e.response.status_code}")
+            else:
+                logger.error(f"Error fetching {url}: {str(e)}")
+            return None, 'final' if client_error else 'failed', None
         except Exception as e:
+            if deadline and deadline.expired():
+                return self._abandon(url, deadline, phases)
+            self.metrics.record_fetch('error', phases)
             logger.error(f"Error fetching {url}: {str(e)}")
+            return None, 'failed', None
+    
+    def _abandon(self, url: str, deadline: Deadline, phases: Dict[str, float]):
+        """_attempt result for a request the deadline cut short: not the host's fault, so no retry or breaker"""
+        self._out_of_time(url, deadline, phases)
+        return None, 'abandoned', None
+    
+    def _consume_body(self, response, consume: Callable,
+                      deadline: Optional[Deadline] = None) -> Tuple[object, Optional[bytes], int]:
+        """Feed a streamed body to `consume`: (its result, the whole body if small enough to cache, bytes read)"""
+        kept = []
+        size = 0
+        complete = False
+        
+        def chunks():
+            nonlocal size, complete
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                if deadline and deadline.expired():
+                    raise DeadlineExceeded(response.url)
+                size += len(chunk)
+                if size <= self.max_page_bytes:
+                    kept.append(chunk)
+                yield chunk
+            complete = True
         
-        return None
+        result = consume(chunks())
+        if deadline and deadline.expired() and not complete:
+            raise DeadlineExceeded(response.url)
+        return result, b''.join(kept) if complete and size <= self.max_page_bytes else None, size
     
-    def smart_description_extraction(self, soup: BeautifulSoup, company_info: Dict) -> str:
+    def _read_body(self, url: str, response, deadline: Optional[Deadline] = None) -> bytes:
+        """Read a streamed body, stopping at max_page_bytes"""
+        chunks = []
+        size = 0
+        for chunk in response.iter_content(chunk_size=64 * 1024):
+            if deadline and deadline.expired():
+                raise DeadlineExceeded(url)
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= self.max_page_bytes:
+                logger.warning(f"Truncating {url} at {self.max_page_bytes} bytes")
+                self.metrics.record_truncated()
+                return b''.join(chunks)[:self.max_page_bytes]
+        if deadline and deadline.expired():
+            # Closed by the deadline's guard, which can look like the end of the body
+            raise DeadlineExceeded(url)
+        return b''.join(chunks)
+    
+    def _parse_html(self, url: str, headers, content: bytes) -> Optional[BeautifulSoup]:
+        """Parse an HTML body, skipping other content types"""
+        # Handle different content types
+        content_type = headers.get('content-type', '')
+        if 'text/html' in content_type:
+            with self.metrics.stage('parse'):
+                return parse_html(content, self.parser, detect_encoding(content, content_type))
+        else:
+            logger.warning(f"Non-HTML content for {url}")
+            return None
+    
+    def smart_description_extraction(self, page: PageIndex, company_info: Dict,
+                                     sources: Optional[Dict[str, str]] = None) -> str:
         """Enhanced description extraction with sector-specific knowledge"""
         
+        # The organization's own schema.org description needs no guessing
+        structured = self._structured(page)
+        if structured.description:
+            _note_source(sources, 'description', [structured.description_source])
+            return structured.description
+        
         # Try meta descriptions first
-        meta_desc = soup.find('meta', attrs={'name': 'description'})
+        meta_desc = page.find_meta('name', 'description')
         if meta_desc and meta_desc.get('content'):
             desc = meta_desc['content'].strip()
             if len(desc) > 50:
+                _note_source(sources, 'description', ['meta'])
                 return desc
         
         # Try Open Graph description
-        og_desc = soup.find('meta', attrs={'property': 'og:description'})
+        og_desc = page.find_meta('property', 'og:description')
         if og_desc and og_desc.get('content'):
             desc = og_desc['content'].strip()
             if len(desc) > 50:
+                _note_source(sources, 'description', ['opengraph'])
                 return desc
         
         # Sector-specific selectors
@@ -141,47 +476,56 @@ class EnhancedCompanyScraper:
         
         # Try sector-specific and general selectors
         for selector in selectors:
-            elements = soup.select(selector)
+            elements = page.select_class(selector)
             for element in elements:
                 text = element.get_text().strip()
                 if 50 < len(text) < 300 and self._is_description_text(text):
+                    _note_source(sources, 'description', ['heuristic'])
                     return text
         
         # Look for main content paragraphs
         main_selectors = ['main p', '.main-content p', '.content p', 'section p']
         for selector in main_selectors:
-            paragraphs = soup.select(selector)
+            paragraphs = page.paragraphs[selector]
             for p in paragraphs[:5]:  # Check first 5 paragraphs
                 text = p.get_text().strip()
                 if 50 < len(text) < 400 and self._is_description_text(text):
+                    _note_source(sources, 'description', ['heuristic'])
                     return text
         
         # Fallback: Create description based on sector
+        _note_source(sources, 'description', ['default'])
         return f"{company_info['name']} is a {company_info.get('sector', 'technology')} company focused on sustainable solutions and clean energy innovation."
     
     def _is_description_text(self, text: str) -> bool:
         """Check if text looks like a company description"""
-        skip_words = ['cookie', 'privacy', 'terms', 'copyright', 'all rights reserved', 'learn more']
-        return not any(skip.lower() in text.lower() for skip in skip_words)
+        return not DESCRIPTION_SKIP_RE.search(text)
     
-    def enhanced_office_extraction(self, soup: BeautifulSoup, company_info: Dict) -> List[Dict]:
-        """Enhanced office location extraction"""
+    def enhanced_office_extraction(self, page: PageIndex, company_info: Dict,
+                                   frontier: Optional[CompanyFrontier] = None,
+                                   sources: Optional[Dict[str, str]] = None,
+                                   deadline: Optional[Deadline] = None) -> List[Dict]:
+        """Enhanced office location extraction; contact pages not fetched by `deadline` are skipped"""
         offices = []
+        used = []
+        frontier = frontier or self._company_frontier(company_info['website'], page)
         
         # Check for dedicated contact/office pages
-        contact_links = soup.find_all('a', href=True, string=re.compile(r'(contact|office|location|about)', re.I))
-        
-        for link in contact_links[:2]:
+        for contact_url in self._contact_urls(page, frontier):
             try:
-                contact_url = self._resolve_url(link['href'], company_info['website'])
-                contact_soup = self.fetch_page(contact_url)
-                if contact_soup:
-                    offices.extend(self._extract_addresses(contact_soup))
+                with self.within(deadline):
+                    contact_page = frontier.page(contact_url)
+                if contact_page:
+                    found, source = self._page_offices(contact_page)
+                    offices.extend(found)
+                    used.append(source if found else '')
             except:
                 continue
         
         # Extract from main page
-        offices.extend(self._extract_addresses(soup))
+        found, source = self._page_offices(page)
+        offices.extend(found)
+        used.append(source if found else '')
         
         # Add expected HQ if no offices found
         if not offices and company_info.get('expected_hq'):
@@ -190,25 +534,27 @@ class EnhancedCompanyScraper:
                 'is_hq': True,
                 'address': f"Headquarters location: {company_info['expected_hq']}"
             })
+            used.append('default')
         
+        _note_source(sources, 'offices', used)
         return self._deduplicate_offices(offices)
     
-    def _extract_addresses(self, soup: BeautifulSoup) -> List[Dict]:
-        """Extract addresses from soup"""
+    def _page_offices(self, page: PageIndex) -> Tuple[List[Dict], str]:
+        """Addresses the page declares as structured data, else the text-pattern matches, with their source"""
+        structured = self._structured(page)
+        if structured.offices:
+            return [dict(office) for office in structured.offices], structured.offices_source
+        return self._extract_addresses(page), 'heuristic'
+    
+    def _extract_addresses(self, page: PageIndex) -> List[Dict]:
+        """Extract addresses from page text"""
         offices = []
         
-        # Look for structured address data
-        address_patterns = [
-            r'\b\d{1,5}\s+[A-Za-z0-9\s,.-]+(?:Street|St|Avenue|Ave|Road|Rd|Drive|Dr|Boulevard|Blvd)[A-Za-z0-9\s,.-]*\b',
-            r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*,\s*[A-Z]{2,3}\s*\d{4,5}\b',
-            r'\b[A-Z][a-z]+\s*,\s*[A-Z][a-z]+(?:\s*,\s*[A-Z][a-z]+)?\b'
-        ]
-        
-        text_content = soup.get_text()
+        text_content = page.get_text()
         
-        for pattern in address_patterns:
-            matches = re.findall(pattern, text_content)
-            for match in matches[:3]:  # Limit matches
+        # Look for structured address data (first 3 matches per pattern, time-bounded)
+        for matches in self.address_matcher.find_all(text_content):
+            for match in matches:
                 if len(match) > 10:  # Filter out short matches
                     offices.append({
                         'location': match.strip(),
@@ -235,33 +581,37 @@ class EnhancedCompanyScraper:
         
         return unique_offices[:5]  # Limit to 5 offices
     
-    def smart_client_extraction(self, soup: BeautifulSoup) -> List[str]:
+    def smart_client_extraction(self, page: PageIndex) -> List[str]:
         """Enhanced client extraction with logo recognition"""
         clients = []
         
         # Look for client/partner sections
-        client_sections = soup.find_all(['div', 'section'], 
-                                      class_=re.compile(r'client|partner|customer|logo|trust', re.I))
+        client_sections = page.client_sections
         
         for section in client_sections:
             # Extract from image alt texts and titles
-            images = section.find_all('img')
+            images = section.images
             for img in images:
                 alt_text = img.get('alt', '').strip()
                 title_text = img.get('title', '').strip()
                 
                 for text in [alt_text, title_text]:
-                    if text and self._is_valid_client_name(text):
+                    # Known organizations are reported under their canonical name
+                    known = self.organizations.find(text) if self.organizations and text else []
+                    if known:
+                        clients.extend(known)
+                    elif text and self._is_valid_client_name(text):
                         clients.append(text)
         
         # Look for testimonial sections
-        testimonial_sections = soup.find_all(['div', 'section'], 
-                                           class_=re.compile(r'testimonial|review|case', re.I))
+        testimonial_sections = page.testimonial_sections
         
         for section in testimonial_sections:
-            # Extract company names from testimonials
-            company_mentions = re.findall(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+){0,2}(?:\s+(?:Inc|Corp|Ltd|LLC|GmbH))?\b', 
-                                        section.get_text())
+            # Extract company names from testimonials: known organizations if there is a dictionary
+            if self.organizations:
+                clients.extend(self.organizations.find(section.get_text()))
+                continue
+            company_mentions = CLIENT_NAME_RE.findall(section.get_text())
             clients.extend([c for c in company_mentions if self._is_valid_client_name(c)])
         
         return list(set(clients))[:10]  # Remove duplicates and limit
@@ -271,57 +621,116 @@ class EnhancedCompanyScraper:
         if not name or len(name) < 3 or len(name) > 50:
             return False
         
-        skip_words = ['logo', 'image', 'icon', 'photo', 'picture', 'company', 'client', 'partner']
-        return not any(skip.lower() in name.lower() for skip in skip_words)
+        return not CLIENT_SKIP_RE.search(name)
     
-    def enhanced_news_extraction(self, soup: BeautifulSoup, base_url: str) -> List[Dict]:
-        """Enhanced news extraction with multiple strategies"""
+    def enhanced_news_extraction(self, page: PageIndex, base_url: str,
+                                 frontier: Optional[CompanyFrontier] = None,
+                                 sources: Optional[Dict[str, str]] = None,
+                                 deadline: Optional[Deadline] = None) -> List[Dict]:
+        """Enhanced news extraction with multiple strategies; news pages not fetched by `deadline` are skipped"""
         news_items = []
+        used = []
+        frontier = frontier or self._company_frontier(base_url, page)
         
         # Strategy 1: Check dedicated news/blog pages
-        news_links = soup.find_all('a', href=True)
-        news_urls = []
-        
-        for link in news_links:
-            href = link.get('href', '')
-            text = link.get_text().strip().lower()
-            
-            if any(keyword in text for keyword in ['news', 'blog', 'press', 'media', 'updates']):
-                news_urls.append(self._resolve_url(href, base_url))
-        
-        # Visit news pages
-        for news_url in news_urls[:2]:
+        for news_url in self._news_urls(page, frontier):
             try:
-                news_soup = self.fetch_page(news_url)
-                if news_soup:
-                    news_items.extend(self._parse_news_articles(news_soup, news_url))
+                with self.within(deadline):
+                    news_page = frontier.page(news_url)
+                if news_page:
+                    found, source = self._page_news(news_page, news_url)
+                    news_items.extend(found)
+                    used.append(source if found else '')
             except:
                 continue
         
         # Strategy 2: Look for news on main page
-        news_items.extend(self._parse_news_articles(soup, base_url))
+        found, source = self._page_news(page, base_url)
+        news_items.extend(found)
+        used.append(source if found else '')
         
         # Strategy 3: Generate synthetic news if none found
         if not news_items:
             news_items.append({
-                'title': f"Latest Updates from {self._extract_company_name(soup, base_url)}",
+                'title': f"Latest Updates from {self._extract_company_name(page, base_url)}",
                 'date': datetime.now().strftime('%Y-%m-%d'),
                 'url': base_url,
                 'summary': "Stay updated with the latest developments and innovations from our team."
             })
+            used.append('default')
         
+        _note_source(sources, 'news', used)
         return news_items[:5]
     
-    def _parse_news_articles(self, soup: BeautifulSoup, base_url: str) -> List[Dict]:
-        """Parse news articles from soup"""
+    def _page_news(self, page: PageIndex, base_url: str) -> Tuple[List[Dict], str]:
+        """Dated articles the page declares as structured data, else the parsed article elements, with their source"""
+        structured = self._structured(page)
+        if structured.news:
+            return [dict(item, url=self._resolve_url(item['url'], base_url)) for item in structured.news[:5]], \
+                structured.news_source
+        return self._parse_news_articles(page, base_url), 'heuristic'
+    
+    def _structured(self, page: PageIndex) -> StructuredData:
+        """The page's JSON-LD, microdata and OpenGraph data, read once and timed as its own stage"""
+        with self.metrics.stage('structured'):
+            return page.structured
+    
+    def _contact_urls(self, page: PageIndex, frontier: CompanyFrontier) -> List[str]:
+        """Up to two contact/office pages: from the sitemap, or the homepage's links when it lists none"""
+        return (frontier.select(frontier.sitemap.get('contact', []), limit=2)
+                or frontier.select(self._contact_links(page), limit=2))
+    
+    def _news_urls(self, page: PageIndex, frontier: CompanyFrontier) -> List[str]:
+        """Up to two news/blog pages: from the sitemap, or the homepage's links when it lists none"""
+        return (frontier.select(frontier.sitemap.get('news', []), limit=2)
+                or frontier.select(self._news_links(page), limit=2))
+    
+    def _contact_links(self, page: PageIndex) -> List[str]:
+        """Hrefs of links that look like contact/office pages"""
+        return [link['href'] for link in page.anchors
+                if link.string is not None and CONTACT_LINK_RE.search(link.string)]
+    
+    def _news_links(self, page: PageIndex) -> List[str]:
+        """Hrefs of links that look like news/blog pages"""
+        news_urls = []
+        for link in page.anchors:
+            href = link.get('href', '')
+            text = link.get_text().strip().lower()
+            
+            if any(keyword in text for keyword in ['news', 'blog', 'press', 'media', 'updates']):
+                news_urls.append(href)
+        return news_urls
+    
+    def subpage_urls(self, page: PageIndex, website: str,
+                     sitemap: Optional[Dict[str, List[str]]] = None) -> List[str]:
+        """Sub-pages the office and news extractors will request for this homepage"""
+        # A scratch frontier so planning does not count towards the run's stats
+        frontier = CompanyFrontier(website, self._fetch_page_index, RunFrontier(), sitemap)
+        return self._contact_urls(page, frontier) + self._news_urls(page, frontier)
+    
+    def discover_pages(self, website: str) -> Dict[str, List[str]]:
+        """Contact and news pages listed in the site's sitemaps (empty when there are none)"""
+        if not self.sitemaps:
+            return {}
+        try:
+            with self.metrics.stage('discover'):
+                return self.sitemaps.discover(website)
+        except DeadlineExceeded:
+            # robots.txt could not be read in time (already counted); the homepage links are used instead
+            return {}
+        except Exception as e:
+            logger.error(f"Error reading sitemaps for {website}: {str(e)}")
+            return {}
+    
+    def _parse_news_articles(self, page: PageIndex, base_url: str) -> List[Dict]:
+        """Parse news articles from page"""
         articles = []
         
         # Look for article elements
-        article_elements = soup.find_all(['article', 'div'], 
-                                       class_=re.compile(r'post|article|news|blog', re.I))
+        article_elements = page.articles
         
         for element in article_elements[:5]:
-            title_elem = element.find(['h1', 'h2', 'h3', 'h4', 'h5'])
+            title_elem = element.heading
             if not title_elem:
                 continue
             
@@ -333,11 +742,11 @@ class EnhancedCompanyScraper:
             date_text = self._extract_date(element)
             
             # Extract summary
-            summary_elem = element.find('p')
+            summary_elem = element.paragraph
             summary = summary_elem.get_text().strip()[:200] + "..." if summary_elem else ""
             
             # Extract URL
-            link_elem = element.find('a', href=True)
+            link_elem = element.link
             article_url = self._resolve_url(link_elem['href'], base_url) if link_elem else base_url
             
             articles.append({
@@ -366,10 +775,10 @@ class EnhancedCompanyScraper:
         
         return datetime.now().strftime('%Y-%m-%d')
     
-    def _extract_company_name(self, soup: BeautifulSoup, url: str) -> str:
+    def _extract_company_name(self, page: PageIndex, url: str) -> str:
         """Extract company name from page"""
         # Try title tag
-        title_tag = soup.find('title')
+        title_tag = page.title
         if title_tag:
             title = title_tag.get_text().strip()
             # Extract first part before common separators
@@ -382,26 +791,162 @@ class EnhancedCompanyScraper:
         domain = urlparse(url).netloc
         return domain.replace('www.', '').split('.')[0].title()
     
+    def _company_frontier(self, website: str, homepage: PageIndex,
+                          fetch: Optional[Callable[[str], Optional[PageIndex]]] = None,
+                          sitemap: Optional[Dict[str, List[str]]] = None) -> CompanyFrontier:
+        """Frontier for one company's sub-page fetches, seeded with its homepage"""
+        frontier = self.frontier.for_company(website, fetch or self._fetch_page_index, sitemap)
+        frontier.add_page(website, homepage)
+        return frontier
+    
+    def _fetch_page_index(self, url: str) -> Optional[PageIndex]:
+        """Fetch a page and index it for the extractors"""
+        soup = self.fetch_page(url)
+        if not soup:
+            return None
+        return self._index_page(soup)
+    
+    def _index_page(self, soup) -> PageIndex:
+        """Index a parsed page for the extractors and free its tree, which nothing needs after that"""
+        with self.metrics.stage('index'):
+            page = PageIndex(soup)
+            release_tree(soup)
+        return page
+    
     def _resolve_url(self, href: str, base_url: str) -> str:
         """Resolve relative URLs"""
         from urllib.parse import urljoin
         return urljoin(base_url, href)
     
-    def scrape_company_enhanced(self, company: Dict) -> Dict:
-        """Enhanced scraping with better error handling and data quality"""
+    def scrape_company_enhanced(self, company: Dict, deadline: Optional[Deadline] = None) -> Dict:
+        """Enhanced scraping with better error handling and data quality
+        
+        All requests share `deadline` (default: `company_budget` from now).
+        What could not be fetched in time is listed in the record's 'truncated'.
+        """
+        deadline = deadline or Deadline(self.company_budget)
+        timings = self.metrics.start(company)
+        with self.metrics.track(timings), self.within(deadline):
+            company_data = self._scrape_company(company, deadline)
+        self.flag_truncated(company_data, deadline)
+        self.metrics.finish(timings, company_data)
+        return company_data
+    
+    def flag_truncated(self, company_data: Dict, deadline: Deadline):
+        """Mark a record as partial when pages were given up on because the company ran out of time"""
+        if deadline.truncated:
+            company_data['truncated'] = list(deadline.truncated)
+            logger.warning(f"{company_data['company_name']} ran out of its {deadline.seconds:g}s budget, "
+                           f"{len(deadline.truncated)} pages not fetched - Quality: {company_data['data_quality']}")
+    
+    def _scrape_company(self, company: Dict, deadline: Optional[Deadline] = None) -> Dict:
         logger.info(f"Scraping {company['name']} ({company['sector']}) - {company['website']}")
         
-        soup = self.fetch_page(company['website'])
+        # Raw pages fetched for this company, shared by the fingerprint check and the extractors
+        pages: RawPages = {}
+        home = pages[canonicalize_url(company['website'])] = self.fetch_raw(company['website'])
+        
+        if home and self.fingerprints:
+            previous, missing = self.reuse_unchanged(company, pages)
+            if missing:
+                pages.update(self.fetch_concurrently(missing, deadline))
+                previous, _ = self.reuse_unchanged(company, pages)
+            if previous:
+                return previous
+        
+        soup = self._parse_html(company['website'], *home) if home else None
         if not soup:
             logger.warning(f"Failed to fetch {company['name']}, creating fallback data")
             return self._create_fallback_data(company)
         
         try:
-            # Extract all information with enhanced methods
-            description = self.smart_description_extraction(soup, company)
-            offices = self.enhanced_office_extraction(soup, company)
-            clients = self.smart_client_extraction(soup)
-            news = self.enhanced_news_extraction(soup, company['website'])
+            # One walk over the tree feeds every extractor
+            page = self._index_page(soup)
+        except Exception as e:
+            logger.error(f"Error scraping {company['name']}: {str(e)}")
+            return self._create_fallback_data(company)
+        
+        sitemap = self.discover_pages(company['website'])
+        # Contact and news pages are requested together rather than one after another by each extractor
+        subpages = [url for url in self.subpage_urls(page, company['website'], sitemap)
+                    if canonicalize_url(url) not in pages]
+        pages.update(self.fetch_concurrently(subpages, deadline))
+        company_data = self.extract_company(company, page, lambda url: self._prefetched_page(pages, url), sitemap,
+                                            deadline)
+        self.remember_pages(company, company_data, pages, deadline)
+        return company_data
+    
+    def _prefetched_page(self, pages: RawPages, url: str) -> Optional[PageIndex]:
+        """Indexed sub-page, fetched into `pages` unless it is already there"""
+        key = canonicalize_url(url)
+        if key not in pages:
+            pages[key] = self.fetch_raw(url)
+        raw = pages[key]
+        soup = self._parse_html(url, *raw) if raw else None
+        if not soup:
+            return None
+        return self._index_page(soup)
+    
+    def reuse_unchanged(self, company: Dict, pages: RawPages) -> Tuple[Optional[Dict], List[str]]:
+        """Previous record if every page it came from is unchanged, else None
+        
+        Also returns the previously used sub-page URLs that still have to be
+        fetched before the comparison can be made.
+        """
+        previous = self.fingerprints.get(company)
+        if previous is None:
+            return None, []
+        fingerprints, record = previous
+        home = canonicalize_url(company['website'])
+        if page_fingerprint(_body(pages.get(home))) != fingerprints.get(home):
+            return None, []
+        missing = [url for url in fingerprints if url not in pages]
+        if missing:
+            return None, missing
+        if any(page_fingerprint(_body(pages[url])) != fingerprint for url, fingerprint in fingerprints.items()):
+            return None, []
+        
+        self.fingerprints.record('unchanged')
+        logger.info(f"Unchanged since last run, reusing {company['name']} - Quality: {record['data_quality']}")
+        return dict(record, company_name=company['name'], sector=company.get('sector', 'Technology')), []
+    
+    def remember_pages(self, company: Dict, company_data: Dict, pages: RawPages,
+                       deadline: Optional[Deadline] = None):
+        """Store the fingerprints of the pages a fresh record was extracted from"""
+        if not self.fingerprints or company_data.get('data_quality') == 'Fallback':
+            return
+        if deadline and deadline.truncated:
+            # A partial record must not be reused as if it were complete
+            return
+        current = {url: page_fingerprint(_body(raw)) for url, raw in pages.items()}
+        previous = self.fingerprints.get(company)
+        if previous is None:
+            self.fingerprints.record('new')
+        elif any(previous[0].get(url) == fingerprint for url, fingerprint in current.items()):
+            self.fingerprints.record('partial')
+        else:
+            self.fingerprints.record('changed')
+        self.fingerprints.put(company, current, company_data)
+    
+    def extract_company(self, company: Dict, page: PageIndex,
+                        fetch: Optional[Callable[[str], Optional[PageIndex]]] = None,
+                        sitemap: Optional[Dict[str, List[str]]] = None,
+                        deadline: Optional[Deadline] = None) -> Dict:
+        """Run every extractor on an indexed homepage; sub-pages come from `fetch` (default: the network)"""
+        try:
+            # Sub-pages are fetched once and shared between extractors
+            frontier = self._company_frontier(company['website'], page, fetch, sitemap)
+            
+            # Extract all information with enhanced methods, noting which path filled each field
+            sources = {}
+            with self.metrics.stage('description'):
+                description = self.smart_description_extraction(page, company, sources)
+            with self.metrics.stage('offices'):
+                offices = self.enhanced_office_extraction(page, company, frontier, sources, deadline)
+            with self.metrics.stage('clients'):
+                clients = self.smart_client_extraction(page)
+            with self.metrics.stage('news'):
+                news = self.enhanced_news_extraction(page, company['website'], frontier, sources, deadline)
             
             company_data = {
                 'company_id': company['id'],
@@ -413,7 +958,8 @@ class EnhancedCompanyScraper:
                 'clients': clients,
                 'news': news,
                 'scrape_date': datetime.now().isoformat(),
-                'data_quality': self._assess_data_quality(description, offices, clients, news)
+                'data_quality': self._assess_data_quality(description, offices, clients, news),
+                'data_sources': sources
             }
             
             logger.info(f"Successfully scraped {company['name']} - Quality: {company_data['data_quality']}")
@@ -474,130 +1020,376 @@ class EnhancedCompanyScraper:
         }
     
     def scrape_all_companies_enhanced(self):
-        """Scrape all companies with enhanced methods"""
-        logger.info("Starting enhanced scraping of all companies...")
+        """Scrape all companies concurrently with per-host politeness"""
+        logger.info(f"Starting enhanced scraping of all companies with {self.max_workers} workers"
+                    + (f" and {self.processes} extraction processes..." if self.processes else "..."))
+        
+        done_ids = self.checkpoint.completed_ids() if self.checkpoint else set()
+        if done_ids:
+            logger.info(f"Resuming: {len(done_ids)} companies already in {self.checkpoint.path}")
+        # Place of each company in flight in the full list, so a resumed run still stores input order
+        positions = {}
+        
+        def remaining():
+            for position, company in enumerate(self.companies):
+                if company['id'] not in done_ids:
+                    positions[company['id']] = position
+                    yield company
         
-        for i, company in enumerate(self.companies):
+        results = {}
+        scraped = 0
+        for i, company_data in self._scrape_concurrently(remaining()):
+            scraped += 1
+            position = positions.pop(company_data['company_id'], i)
+            if self.checkpoint:
+                # Stream finished records to disk instead of holding them
+                self.checkpoint.append(company_data, position)
+            else:
+                results[position] = CompanyRecord.from_dict(company_data)
+        
+        # Keep records in input order regardless of completion order
+        self._records.extend(results[i] for i in sorted(results))
+        if self.checkpoint:
+            self.checkpoint.finish()
+        
+        logger.info(f"Completed enhanced scraping of {scraped} companies")
+        self._log_summaries()
+    
+    def scrape_queue(self, worker: Optional[str] = None, batch: Optional[int] = None):
+        """Work through the shared WorkQueue given as checkpoint until every company in it is done or failed
+        
+        Any number of processes, on this machine or others sharing the queue's filesystem, can run this
+        against the same queue. Each claims `batch` companies at a time (default: max_workers), keeps its
+        leases alive while it works, and stores each record as its company finishes. When nothing is left
+        to claim it waits for the other workers' leases, taking over those that expire.
+        """
+        queue = self.checkpoint
+        if not isinstance(queue, WorkQueue):
+            raise ValueError("scrape_queue needs a WorkQueue as checkpoint")
+        worker = worker or default_worker_id()
+        batch = max(1, batch or self.max_workers)
+        logger.info(f"Worker {worker} starting on {queue.path} with {self.max_workers} workers...")
+        
+        scraped = 0
+        claimed = deque()
+        with queue.keep_alive(worker), ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = {}
             try:
-                company_data = self.scrape_company_enhanced(company)
-                self.scraped_data.append(company_data)
-                
-                # Respectful delay between requests
-                if i < len(self.companies) - 1:
-                    time.sleep(3)  # Increased delay for better success rate
+                while True:
+                    while len(pending) < self.max_workers * 2:
+                        if not claimed:
+                            claimed.extend(queue.claim(worker, batch))
+                            if not claimed:
+                                break
+                        company = claimed.popleft()
+                        pending[executor.submit(self.scrape_company_enhanced, company)] = company
+                    
+                    if not pending:
+                        # Other workers still hold leases: wait, in case one of them has died
+                        wait_seconds = queue.next_expiry()
+                        if wait_seconds is None:
+                            break
+                        time.sleep(min(max(wait_seconds, 0.1), 5.0))
+                        continue
                     
-            except Exception as e:
-                logger.error(f"Critical error scraping {company['name']}: {str(e)}")
-                self.scraped_data.append(self._create_fallback_data(company))
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        company = pending.pop(future)
+                        try:
+                            company_data = future.result()
+                        except Exception as e:
+                            logger.error(f"Critical error scraping {company['name']}: {str(e)}")
+                            queue.fail(worker, company['id'], str(e))
+                            continue
+                        if queue.complete(worker, company['id'], company_data):
+                            scraped += 1
+            finally:
+                # Companies claimed but not started go straight back to the other workers
+                queue.release(worker, [company['id'] for company in claimed])
         
-        logger.info(f"Completed enhanced scraping of {len(self.scraped_data)} companies")
+        logger.info(f"Worker {worker} completed {scraped} companies")
+        queue.log_stats()
+        self._log_summaries()
+    
+    def _log_summaries(self):
+        """Log data quality and the run's fetch, cache and profiling summaries"""
         self._print_quality_summary()
+        self.metrics.log_slowest()
+        self.metrics.log_sources()
+        self.frontier.log_stats()
+        self.breaker.log_stats()
+        if self.robots:
+            self.robots.log_stats()
+        if self.sitemaps:
+            self.sitemaps.log_stats()
+        if self.fingerprints:
+            self.fingerprints.log_stats()
+        if self.cache:
+            self.cache.log_stats()
+        if self.profiler:
+            self.profiler.finish()
+            self.profiler.log_stats()
+    
+    def _scrape_concurrently(self, companies):
+        """Yield (input index, record) pairs as companies finish, keeping a bounded number in flight"""
+        if self.processes:
+            yield from ExtractionPipeline(self, self.processes).run(companies)
+            return
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = {}
+            company_iter = enumerate(companies)
+            
+            def submit_next() -> bool:
+                for i, company in company_iter:
+                    pending[executor.submit(self.scrape_company_enhanced, company)] = (i, company)
+                    return True
+                return False
+            
+            for _ in range(self.max_workers * 2):
+                if not submit_next():
+                    break
+            
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    i, company = pending.pop(future)
+                    try:
+                        company_data = future.result()
+                    except Exception as e:
+                        logger.error(f"Critical error scraping {company['name']}: {str(e)}")
+                        company_data = self._create_fallback_data(company)
+                    yield i, company_data
+                    submit_next()
+    
+    @property
+    def scraped_data(self) -> List[Dict]:
+        """Records scraped into memory, as dicts (a new list on each access; iter_records() streams them)"""
+        return [record.to_dict() for record in self._records]
+    
+    @scraped_data.setter
+    def scraped_data(self, records: Iterable[Dict]):
+        # Held for the rest of the run, so kept in the compact form
+        self._records = [CompanyRecord.from_dict(record) for record in records]
+    
+    def iter_records(self):
+        """This run's records, streamed from the checkpoint when one is used"""
+        if self.checkpoint:
+            return getattr(self.checkpoint, 'run_records', self.checkpoint.iter_records)()
+        return (record.to_dict() for record in self._records)
     
     def _print_quality_summary(self):
         """Print data quality summary"""
         quality_counts = {}
-        for data in self.scraped_data:
+        truncated = 0
+        for data in self.iter_records():
             quality = data.get('data_quality', 'Unknown')
             quality_counts[quality] = quality_counts.get(quality, 0) + 1
+            truncated += 1 if data.get('truncated') else 0
         
         logger.info("Data Quality Summary:")
         for quality, count in quality_counts.items():
             logger.info(f"  {quality}: {count} companies")
+        if truncated:
+            logger.info(f"  Cut short by the per-company time budget: {truncated} companies")
+    
+    def save_to_json(self, filename: str = 'net_zero_companies_enhanced.json'):
+        """Write all records as an indented JSON array, one record at a time"""
+        logger.info(f"Saving JSON data to {filename}")
+        write_json(self.iter_records(), filename)
+        logger.info(f"JSON data saved to {filename}")
     
     def save_to_excel_enhanced(self, filename: str = 'net_zero_companies_enhanced.xlsx'):
         """Save to Excel with enhanced structure and metadata"""
         logger.info(f"Saving enhanced data to {filename}")
         
-        with pd.ExcelWriter(filename, engine='openpyxl') as writer:
-            # Companies sheet with enhanced data
-            companies_df = pd.DataFrame([
-                {
-                    'company_id': data['company_id'],
-                    'company_name': data['company_name'],
-                    'company_website': data['company_website'],
-                    'sector': data.get('sector', ''),
-                    'description': data['description'],
-                    'data_quality': data.get('data_quality', ''),
-                    'scrape_date': data['scrape_date']
-                }
-                for data in self.scraped_data
-            ])
-            companies_df.to_excel(writer, sheet_name='Companies', index=False)
-            
-            # Offices sheet
-            offices_data = []
-            for data in self.scraped_data:
-                for i, office in enumerate(data['offices']):
-                    offices_data.append({
-                        'company_id': data['company_id'],
-                        'office_id': f"{data['company_id']}_office_{i+1}",
-                        'location': office.get('location', ''),
-                        'address': office.get('address', ''),
-                        'is_headquarters': office.get('is_hq', False)
-                    })
-            
-            if offices_data:
-                offices_df = pd.DataFrame(offices_data)
-                offices_df.to_excel(writer, sheet_name='Offices', index=False)
-            
-            # Clients sheet
-            clients_data = []
-            for data in self.scraped_data:
-                for i, client in enumerate(data['clients']):
-                    clients_data.append({
-                        'company_id': data['company_id'],
-                        'client_id': f"{data['company_id']}_client_{i+1}",
-                        'client_name': client
-                    })
-            
-            if clients_data:
-                clients_df = pd.DataFrame(clients_data)
-                clients_df.to_excel(writer, sheet_name='Clients', index=False)
-            
-            # News sheet
-            news_data = []
-            for data in self.scraped_data:
-                for i, news_item in enumerate(data['news']):
-                    news_data.append({
-                        'company_id': data['company_id'],
-                        'news_id': f"{data['company_id']}_news_{i+1}",
-                        'news_title': news_item.get('title', ''),
-                        'news_date': news_item.get('date', ''),
-                        'news_url': news_item.get('url', ''),
-                        'news_summary': news_item.get('summary', '')
-                    })
-            
-            if news_data:
-                news_df = pd.DataFrame(news_data)
-                news_df.to_excel(writer, sheet_name='News', index=False)
-            
-            # Summary sheet
-            summary_data = {
-                'Total Companies': len(self.scraped_data),
-                'Total Offices': sum(len(data['offices']) for data in self.scraped_data),
-                'Total Clients': sum(len(data['clients']) for data in self.scraped_data),
-                'Total News Items': sum(len(data['news']) for data in self.scraped_data),
-                'Scrape Date': datetime.now().isoformat()
-            }
-            
-            summary_df = pd.DataFrame([summary_data])
-            summary_df.to_excel(writer, sheet_name='Summary', index=False)
+        # Rows stream from the record source straight into a write-only workbook
+        write_excel(self._tables(), filename)
         
         logger.info(f"Enhanced data saved to {filename}")
+    
+    def save_to_columnar(self, directory: str, fmt: str = 'parquet'):
+        """Save the companies/offices/clients/news tables as Parquet or Arrow IPC files"""
+        logger.info(f"Saving {fmt} tables to {directory}")
+        write_columnar(self._tables(), directory, fmt)
+    
+    def _tables(self) -> TableSource:
+        """Export rows: read from the result store's tables for this run, else computed from the records"""
+        return getattr(self.checkpoint, 'run_table_rows', None) or record_tables(self.iter_records)
 
-def main():
-    """Main execution function"""
-    scraper = EnhancedCompanyScraper()
+def main(argv: Optional[List[str]] = None, prog: Optional[str] = None):
+    """Scrape every company, then write the Excel and JSON (and optional columnar) exports"""
+    parser = argparse.ArgumentParser(prog=prog, description='Scrape Net Zero company data')
+    parser.add_argument('--workers', type=int, default=8,
+                        help='Maximum number of companies scraped concurrently')
+    parser.add_argument('--host-delay', type=float, default=3.0,
+                        help='Minimum seconds between requests to the same host')
+    parser.add_argument('--max-per-host', type=int, default=1,
+                        help='Maximum concurrent requests to the same host')
+    parser.add_argument('--retries', type=int, default=2,
+                        help='Retries for timeouts, connection errors, 429 and 5xx responses, with jittered '
+                             'exponential backoff that honours Retry-After')
+    parser.add_argument('--backoff', type=float, default=1.0,
+                        help='Base backoff in seconds before the first retry (doubles on each retry)')
+    parser.add_argument('--breaker-failures', type=int, default=5,
+                        help='Consecutive failed requests after which a host is skipped for a while')
+    parser.add_argument('--breaker-cooldown', type=float, default=60.0,
+                        help='Seconds before a failing host gets a trial request (doubles while it keeps failing)')
+    parser.add_argument('--ignore-robots', action='store_true',
+                        help='Do not fetch robots.txt or apply its Disallow and Crawl-delay rules')
+    parser.add_argument('--no-sitemaps', action='store_true',
+                        help='Find contact/news pages only from homepage links, without reading sitemaps')
+    parser.add_argument('--processes', type=int, default=0,
+                        help='Parse and extract pages in this many worker processes while threads fetch '
+                             '(default 0: everything runs in the fetch threads)')
+    parser.add_argument('--cache-dir', default=None,
+                        help='Directory for the persistent HTTP response cache (disabled if omitted)')
+    parser.add_argument('--cache-ttl', type=float, default=86400,
+                        help='Seconds a cached page is used without revalidation')
+    parser.add_argument('--cache-max-mb', type=int, default=500,
+                        help='Cache size limit in megabytes; least recently used pages are evicted')
+    parser.add_argument('--cache-only', action='store_true',
+                        help='Serve pages only from the cache and never touch the network')
+    parser.add_argument('--parser', choices=PARSER_BACKENDS, default='lxml',
+                        help='HTML parser backend (selectolax must be installed separately)')
+    parser.add_argument('--store', default='net_zero_companies_enhanced.sqlite',
+                        help='SQLite result store each finished company is upserted into; an interrupted run '
+                             'resumes, a finished one is refreshed by the next run')
+    parser.add_argument('--output-jsonl', default=None,
+                        help='Append records to this JSONL file instead of the SQLite store; reruns skip '
+                             'companies already in it')
+    parser.add_argument('--fresh', action='store_true',
+                        help='Scrape every company again: start a new run in the store even if the last one '
+                             'was interrupted, or discard the existing JSONL output')
+    parser.add_argument('--queue', default=None, metavar='PATH',
+                        help='Work through a shared SQLite work queue instead of the whole company list: run any '
+                             'number of workers against the same PATH, on this machine or others sharing the '
+                             'filesystem. Records are stored in PATH (in place of --store); companies from '
+                             '--companies are added to it first (the built-in list if it is new and none are '
+                             'given). Export with `net-zero-scraper export --store PATH` once it is drained')
+    parser.add_argument('--worker-id', default=None,
+                        help='Name of this worker in the queue (default: host:pid)')
+    parser.add_argument('--queue-batch', type=int, default=None,
+                        help='Companies claimed from the queue at a time (default: --workers)')
+    parser.add_argument('--lease-seconds', type=float, default=120.0,
+                        help="Seconds a claimed company stays leased without a heartbeat; a dead worker's "
+                             'companies are claimed again after this long')
+    parser.add_argument('--max-attempts', type=int, default=3,
+                        help='Leases a company gets before it is marked failed')
+    parser.add_argument('--queue-network-fs', action='store_true',
+                        help="The queue is on a network filesystem shared by several machines: use SQLite's "
+                             'rollback journal instead of WAL (every worker must pass this)')
+    parser.add_argument('--columnar', choices=['parquet', 'arrow'], default=None,
+                        help='Also export the four tables as Parquet or Arrow IPC files (requires pyarrow)')
+    parser.add_argument('--columnar-dir', default='net_zero_companies_enhanced_tables',
+                        help='Directory for the columnar export')
+    parser.add_argument('--companies', default=None,
+                        help='CSV, JSONL or SQLite file with id,name,website,sector,expected_hq (default: built-in list)')
+    parser.add_argument('--companies-table', default='companies',
+                        help='Table to read when --companies is a SQLite database')
+    parser.add_argument('--shard', type=parse_shard, default=None,
+                        help='Only scrape shard i of N (e.g. 0/4), split by website domain; '
+                             'give each shard its own --store')
+    parser.add_argument('--fingerprints', default=None,
+                        help='SQLite file of page fingerprints; companies whose pages are unchanged since the '
+                             'last run reuse their previous record instead of being re-extracted')
+    parser.add_argument('--organizations', default=None,
+                        help='File of known organization names (one per line, aliases separated by "|"); '
+                             'clients are then matched against it instead of guessed from capitalised words')
+    parser.add_argument('--company-budget', type=float, default=60.0,
+                        help='Seconds all requests for one company may take; sub-pages still loading then are '
+                             'abandoned and the partial record lists them under "truncated" (0: no limit)')
+    parser.add_argument('--max-page-mb', type=float, default=5,
+                        help='Stop downloading a page after this many megabytes and parse what was received')
+    parser.add_argument('--metrics-json', default=None,
+                        help='Write fetch/parse/extractor timing histograms and the slowest companies as JSON')
+    parser.add_argument('--metrics-prom', default=None,
+                        help='Write the same metrics in Prometheus text format (e.g. for node_exporter)')
+    parser.add_argument('--slowest', type=int, default=5,
+                        help='Number of slowest companies to report at the end of the run')
+    parser.add_argument('--profile', nargs='?', const='profiles', default=None, metavar='DIR',
+                        help='Profile each company with cProfile and tracemalloc and write pstats files, collapsed '
+                             'stacks for flamegraphs and allocation reports to DIR (default: profiles). Companies '
+                             'are then scraped one at a time')
+    parser.add_argument('--profile-extractors', action='store_true',
+                        help='With --profile, also write a separate profile of each extractor per company')
+    parser.add_argument('--profile-clock', choices=['cpu', 'wall'], default='cpu',
+                        help="Profile the company thread's CPU time, or wall time including network waits")
+    parser.add_argument('--profile-top', type=int, default=20,
+                        help='Functions and allocation sites listed in the profile summaries')
+    args = parser.parse_args(argv)
+    if args.profile and args.processes:
+        parser.error('--profile needs extraction in the fetch threads; leave out --processes')
+    if args.queue and (args.processes or args.output_jsonl or args.fresh):
+        parser.error('--queue cannot be combined with --processes, --output-jsonl or --fresh')
+    profiler = None
+    if args.profile:
+        from profiling import CompanyProfiler
+        profiler = CompanyProfiler(args.profile, top=args.profile_top, extractors=args.profile_extractors,
+                                   clock=args.profile_clock)
+    
+    try:
+        companies = CompanySource(args.companies, shard=args.shard, table=args.companies_table)
+    except ValueError as e:
+        parser.error(str(e))
+    organizations = OrganizationGazetteer(args.organizations) if args.organizations else None
+    # Records extracted with another parser or organization dictionary are not reused
+    salt = args.parser + (f"+organizations:{organizations.digest}" if organizations else '')
+    
+    # Finished records go to the SQLite store (or a JSONL file, or the work queue); the exports are read back from it
+    if args.queue:
+        checkpoint = WorkQueue(args.queue, lease_seconds=args.lease_seconds, max_attempts=args.max_attempts,
+                               wal=not args.queue_network_fs)
+        if args.companies or not any(checkpoint.counts().values()):
+            logger.info(f"Added {checkpoint.add(companies)} companies to the queue in {args.queue}")
+    else:
+        checkpoint = (JsonlCheckpoint(args.output_jsonl, fresh=args.fresh) if args.output_jsonl
+                      else ResultStore(args.store, fresh=args.fresh))
+    
+    cache = None
+    if args.cache_dir or args.cache_only:
+        cache = HttpCache(args.cache_dir or '.http_cache', ttl=args.cache_ttl,
+                          max_bytes=args.cache_max_mb * 1024 * 1024, cache_only=args.cache_only)
+    
+    scraper = EnhancedCompanyScraper(max_workers=args.workers, host_delay=args.host_delay,
+                                     max_per_host=args.max_per_host, cache=cache, parser=args.parser,
+                                     checkpoint=checkpoint,
+                                     companies=companies, processes=args.processes,
+                                     metrics=RunMetrics(slowest=args.slowest),
+                                     fingerprints=FingerprintStore(args.fingerprints, salt=salt)
+                                     if args.fingerprints else None,
+                                     max_page_bytes=int(args.max_page_mb * 1024 * 1024),
+                                     retry=RetryPolicy(retries=args.retries, backoff=args.backoff),
+                                     breaker=CircuitBreaker(failures=args.breaker_failures,
+                                                            cooldown=args.breaker_cooldown),
+                                     robots=not args.ignore_robots, sitemaps=not args.no_sitemaps,
+                                     organizations=organizations, company_budget=args.company_budget,
+                                     profiler=profiler)
     
     # Run enhanced scraping
-    scraper.scrape_all_companies_enhanced()
+    if args.queue:
+        scraper.scrape_queue(worker=args.worker_id, batch=args.queue_batch)
+    else:
+        scraper.scrape_all_companies_enhanced()
+    
+    if args.metrics_json:
+        scraper.metrics.write_json(args.metrics_json)
+    if args.metrics_prom:
+        scraper.metrics.write_prometheus(args.metrics_prom)
+    
+    if args.queue:
+        # Other workers may still be storing records, so the exports are written separately
+        logger.info(f"Queue worker finished; write the exports with: net-zero-scraper export --store {args.queue}")
+        return
     
     # Save to Excel with enhanced structure
     scraper.save_to_excel_enhanced()
     
     # Save JSON backup
-    with open('net_zero_companies_enhanced.json', 'w', encoding='utf-8') as f:
-        json.dump(scraper.scraped_data, f, indent=2, ensure_ascii=False)
+    scraper.save_to_json()
+    
+    if args.columnar:
+        scraper.save_to_columnar(args.columnar_dir, args.columnar)
     
     logger.info("Enhanced scraping completed successfully!")
 
@@ -0,0 +1,359 @@
+import heapq
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+logger = logging.getLogger(__name__)
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+BYTES_BUCKETS = (1024, 10 * 1024, 100 * 1024, 1024 * 1024, 10 * 1024 * 1024)
+
+# Per-company stages, in the order a company goes through them
+STAGES = ['wait', 'connect', 'fetch', 'backoff', 'discover', 'parse', 'index', 'structured',
+          'description', 'offices', 'clients', 'news']
+FETCH_PHASES = ['wait', 'connect', 'ttfb', 'download']
+
+# Seconds the current thread spent opening connections, read back by fetch_raw
+_connect_time = threading.local()
+
+
+def take_connect_time() -> float:
+    """Connect time (DNS, TCP and TLS) accumulated by this thread since the last call"""
+    seconds = getattr(_connect_time, 'seconds', 0.0)
+    _connect_time.seconds = 0.0
+    return seconds
+
+
+class _TimedConnectMixin:
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _connect_time.seconds = getattr(_connect_time, 'seconds', 0.0) + time.perf_counter() - start
+
+
+class _TimedHTTPConnection(_TimedConnectMixin, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimedConnectMixin, HTTPSConnection):
+    pass
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose new connections report how long they took to open"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {'http': _TimedHTTPConnectionPool,
+                                                   'https': _TimedHTTPSConnectionPool}
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus layout"""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List:
+        """(upper bound, count of observations <= bound) pairs, ending with +Inf"""
+        return list(zip([*self.buckets, float('inf')], itertools.accumulate(self.counts)))
+
+    def to_dict(self) -> Dict:
+        return {'count': self.count, 'sum': round(self.sum, 6),
+                'buckets': {('+Inf' if bound == float('inf') else str(bound)): count
+                            for bound, count in self.cumulative()}}
+
+
+class CompanyTimings:
+    """Where the time for one company went, as exclusive seconds per stage"""
+
+    def __init__(self, company: Dict):
+        self.company_id = company.get('id')
+        self.name = company.get('name', '')
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+        self.stages: Dict[str, float] = {}
+        self.requests = 0
+        self.retries = 0
+        self.bytes = 0
+        self.quality = ''
+
+    def add(self, stage: str, seconds: float):
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def merge(self, stages: Dict[str, float]):
+        """Add stage times measured elsewhere, e.g. in an extraction process"""
+        for stage, seconds in stages.items():
+            self.add(stage, seconds)
+
+    def breakdown(self) -> str:
+        # Time outside every stage: waiting in queues, thread and process hand-offs
+        stages = dict(self.stages, other=self.elapsed - sum(self.stages.values()))
+        parts = [f"{stage} {seconds:.2f}s" for stage, seconds in
+                 sorted(stages.items(), key=lambda item: item[1], reverse=True) if seconds >= 0.005]
+        return ', '.join(parts) or 'no stages recorded'
+
+    def to_dict(self) -> Dict:
+        return {'company_id': self.company_id, 'company_name': self.name, 'elapsed': round(self.elapsed, 6),
+                'requests': self.requests, 'retries': self.retries, 'bytes': self.bytes,
+                'data_quality': self.quality,
+                'stages': {stage: round(seconds, 6) for stage, seconds in self.stages.items()}}
+
+
+class RunMetrics:
+    """Per-run histograms of fetch, parse and extractor timings plus the slowest companies
+
+    Stage times are exclusive: time spent in a nested stage (e.g. the fetch
+    of a contact page inside the office extractor) is counted only there.
+    """
+
+    def __init__(self, slowest: int = 5):
+        self.slowest = slowest
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._slowest: List = []
+        self._order = itertools.count()
+
+        self.company_seconds = Histogram(SECONDS_BUCKETS)
+        self.stage_seconds = {stage: Histogram(SECONDS_BUCKETS) for stage in STAGES}
+        self.fetch_seconds = {phase: Histogram(SECONDS_BUCKETS) for phase in FETCH_PHASES}
+        self.response_bytes = Histogram(BYTES_BUCKETS)
+        self.fetches: Dict[str, int] = {}
+        self.redirects = 0
+        self.truncated = 0
+        self.retries = 0
+        # Companies whose time budget ran out before all their pages were fetched
+        self.out_of_time = 0
+        self.companies: Dict[str, int] = {}
+        # Field -> extraction path (json-ld, heuristic, ...) -> [companies, extractor seconds]
+        self.sources: Dict[str, Dict[str, List]] = {}
+
+    def start(self, company: Dict) -> CompanyTimings:
+        return CompanyTimings(company)
+
+    def current(self) -> Optional[CompanyTimings]:
+        """The company tracked in this thread, e.g. to hand to the threads fetching its sub-pages"""
+        return getattr(self._local, 'timings', None)
+
+    @contextmanager
+    def track(self, timings: Optional[CompanyTimings]):
+        """Attribute stages and fetches in this thread to a company"""
+        previous = getattr(self._local, 'timings', None)
+        self._local.timings = timings
+        self._local.stack = []
+        try:
+            yield timings
+        finally:
+            self._local.timings = previous
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time a stage for the company tracked in this thread"""
+        timings = getattr(self._local, 'timings', None)
+        if timings is None:
+            yield
+            return
+        stack = self._local.stack
+        frame = [0.0]
+        stack.append(frame)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            stack.pop()
+            timings.add(name, elapsed - frame[0])
+            if stack:
+                stack[-1][0] += elapsed
+
+    def add_stage(self, name: str, seconds: float):
+        """Record time measured inside the current stage as a separate nested stage"""
+        timings = getattr(self._local, 'timings', None)
+        if timings is None:
+            return
+        timings.add(name, seconds)
+        if self._local.stack:
+            self._local.stack[-1][0] += seconds
+
+    def record_fetch(self, status: str, phases: Dict[str, float], size: int = 0, redirects: int = 0):
+        """Count one request: outcome, phase timings, body size and redirects followed"""
+        with self._lock:
+            self.fetches[status] = self.fetches.get(status, 0) + 1
+            for phase, seconds in phases.items():
+                self.fetch_seconds[phase].observe(seconds)
+            if size:
+                self.response_bytes.observe(size)
+            self.redirects += redirects
+        timings = getattr(self._local, 'timings', None)
+        if timings is not None:
+            timings.requests += 1
+            timings.bytes += size
+
+    def record_truncated(self):
+        """Count a body cut off at the page size limit"""
+        with self._lock:
+            self.truncated += 1
+
+    def record_retry(self):
+        """Count a request repeated after a transient failure"""
+        with self._lock:
+            self.retries += 1
+        timings = getattr(self._local, 'timings', None)
+        if timings is not None:
+            timings.retries += 1
+
+    def finish(self, timings: CompanyTimings, record: Optional[Dict] = None):
+        """Close a company's timings and roll them into the run histograms"""
+        timings.elapsed = time.perf_counter() - timings.started
+        timings.quality = (record or {}).get('data_quality', '')
+        with self._lock:
+            self.company_seconds.observe(timings.elapsed)
+            for stage, seconds in timings.stages.items():
+                self.stage_seconds.setdefault(stage, Histogram(SECONDS_BUCKETS)).observe(seconds)
+            self.companies[timings.quality] = self.companies.get(timings.quality, 0) + 1
+            if (record or {}).get('truncated'):
+                self.out_of_time += 1
+            for field, source in (record or {}).get('data_sources', {}).items():
+                # Reused records were not extracted this run and cost nothing
+                if field in timings.stages:
+                    entry = self.sources.setdefault(field, {}).setdefault(source, [0, 0.0])
+                    entry[0] += 1
+                    entry[1] += timings.stages[field]
+            if self.slowest > 0:
+                entry = (timings.elapsed, next(self._order), timings)
+                if len(self._slowest) < self.slowest:
+                    heapq.heappush(self._slowest, entry)
+                else:
+                    heapq.heappushpop(self._slowest, entry)
+
+    def slowest_companies(self) -> List[CompanyTimings]:
+        return [entry[2] for entry in sorted(self._slowest, reverse=True)]
+
+    def log_slowest(self):
+        """Log the slowest companies with the stages their time went to"""
+        slowest = self.slowest_companies()
+        if not slowest:
+            return
+        logger.info(f"Slowest {len(slowest)} Companies:")
+        for timings in slowest:
+            retried = f" ({timings.retries} retried)" if timings.retries else ''
+            logger.info(f"  {timings.name}: {timings.elapsed:.2f}s, {timings.requests} requests{retried}, "
+                        f"{timings.bytes} bytes ({timings.breakdown()})")
+
+    def log_sources(self):
+        """Log how each field was filled and what its extractor cost per company on each path"""
+        if not self.sources:
+            return
+        logger.info("Extraction Sources Summary:")
+        for field, sources in self.sources.items():
+            parts = [f"{source} {count} ({seconds / count * 1000:.1f} ms avg)" for source, (count, seconds) in
+                     sorted(sources.items(), key=lambda item: item[1][0], reverse=True)]
+            logger.info(f"  {field}: {', '.join(parts)}")
+
+    def to_dict(self) -> Dict:
+        return {
+            'companies': dict(self.companies),
+            'company_seconds': self.company_seconds.to_dict(),
+            'stage_seconds': {stage: hist.to_dict() for stage, hist in self.stage_seconds.items() if hist.count},
+            'fetch_seconds': {phase: hist.to_dict() for phase, hist in self.fetch_seconds.items() if hist.count},
+            'response_bytes': self.response_bytes.to_dict(),
+            'fetches': dict(self.fetches),
+            'redirects': self.redirects,
+            'truncated': self.truncated,
+            'retries': self.retries,
+            'out_of_time': self.out_of_time,
+            'data_sources': {field: {source: {'companies': count, 'seconds': round(seconds, 6)}
+                                     for source, (count, seconds) in sources.items()}
+                             for field, sources in self.sources.items()},
+            'slowest_companies': [timings.to_dict() for timings in self.slowest_companies()],
+        }
+
+    def write_json(self, path: str):
+        _write_atomic(path, json.dumps(self.to_dict(), indent=2, ensure_ascii=False))
+        logger.info(f"Metrics written to {path}")
+
+    def write_prometheus(self, path: str):
+        """Write the metrics in the Prometheus text exposition format (e.g. for node_exporter)"""
+        lines = []
+        _histogram_lines(lines, 'scraper_company_seconds', 'Wall time per company', {None: self.company_seconds})
+        _histogram_lines(lines, 'scraper_stage_seconds', 'Exclusive time per company and stage',
+                         {('stage', stage): hist for stage, hist in self.stage_seconds.items()})
+        _histogram_lines(lines, 'scraper_fetch_seconds', 'Time per request and phase',
+                         {('phase', phase): hist for phase, hist in self.fetch_seconds.items()})
+        _histogram_lines(lines, 'scraper_response_bytes', 'Response body size', {None: self.response_bytes})
+        lines += ['# HELP scraper_fetches_total Page requests by outcome', '# TYPE scraper_fetches_total counter']
+        lines += [f'scraper_fetches_total{{status="{status}"}} {count}' for status, count in self.fetches.items()]
+        lines += ['# HELP scraper_redirects_total Redirects followed', '# TYPE scraper_redirects_total counter',
+                  f'scraper_redirects_total {self.redirects}',
+                  '# HELP scraper_truncated_total Bodies cut off at the page size limit',
+                  '# TYPE scraper_truncated_total counter', f'scraper_truncated_total {self.truncated}',
+                  '# HELP scraper_retries_total Requests repeated after a transient failure',
+                  '# TYPE scraper_retries_total counter', f'scraper_retries_total {self.retries}',
+                  '# HELP scraper_out_of_time_total Companies whose time budget ran out before all pages were fetched',
+                  '# TYPE scraper_out_of_time_total counter', f'scraper_out_of_time_total {self.out_of_time}']
+        lines += ['# HELP scraper_companies_total Companies scraped by data quality',
+                  '# TYPE scraper_companies_total counter']
+        lines += [f'scraper_companies_total{{quality="{quality}"}} {count}'
+                  for quality, count in self.companies.items()]
+        lines += ['# HELP scraper_field_source_total Fields extracted by extraction path',
+                  '# TYPE scraper_field_source_total counter']
+        lines += [f'scraper_field_source_total{{field="{field}",source="{source}"}} {count}'
+                  for field, sources in self.sources.items() for source, (count, _) in sources.items()]
+        lines += ['# HELP scraper_field_source_seconds_total Extractor time by field and extraction path',
+                  '# TYPE scraper_field_source_seconds_total counter']
+        lines += [f'scraper_field_source_seconds_total{{field="{field}",source="{source}"}} {seconds}'
+                  for field, sources in self.sources.items() for source, (_, seconds) in sources.items()]
+        _write_atomic(path, '\n'.join(lines) + '\n')
+        logger.info(f"Prometheus metrics written to {path}")
+
+
+def _histogram_lines(lines: List[str], name: str, help_text: str, series: Dict):
+    lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+    for label, hist in series.items():
+        base = f'{label[0]}="{label[1]}",' if label else ''
+        for bound, count in hist.cumulative():
+            le = '+Inf' if bound == float('inf') else repr(float(bound))
+            lines.append(f'{name}_bucket{{{base}le="{le}"}} {count}')
+        suffix = f'{{{base[:-1]}}}' if base else ''
+        lines.append(f'{name}_sum{suffix} {hist.sum}')
+        lines.append(f'{name}_count{suffix} {hist.count}')
+
+
+def _write_atomic(path: str, text: str):
+    """Write through a temporary file so readers never see a half-written file"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
@@ -0,0 +1,202 @@
+import codecs
+import re
+from typing import Dict, Iterator, List, Optional
+
+from bs4 import BeautifulSoup
+from bs4.dammit import UnicodeDammit
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:  # selectolax is optional
+    LexborHTMLParser = None
+
+PARSER_BACKENDS = ['html.parser', 'lxml', 'selectolax']
+
+# Text inside these tags is not part of the visible page text (matches BeautifulSoup.get_text)
+_NON_TEXT_TAGS = {'script', 'style', 'template'}
+
+
+_BOMS = [(codecs.BOM_UTF8, 'utf-8'), (codecs.BOM_UTF16_LE, 'utf-16-le'), (codecs.BOM_UTF16_BE, 'utf-16-be')]
+_HEADER_CHARSET_RE = re.compile(r'charset=["\']?([\w.:-]+)', re.I)
+_META_CHARSET_RE = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([\w.:-]+)', re.I)
+# Encoding sniffing only looks at the start of the document, as browsers do
+_PRESCAN_BYTES = 1024
+
+
+def _known_encoding(name) -> Optional[str]:
+    if isinstance(name, bytes):
+        name = name.decode('ascii', 'ignore')
+    try:
+        encoding = codecs.lookup(name).name
+    except LookupError:
+        return None
+    # Browsers decode pages labelled latin-1 or ascii as windows-1252
+    return 'cp1252' if encoding in ('iso8859-1', 'ascii') else encoding
+
+
+def detect_encoding(content: bytes, content_type: str = '') -> Optional[str]:
+    """Character encoding from the BOM, the Content-Type charset or a <meta> in the first 1 KB
+
+    Returns None when none of them names a known encoding; the parser then guesses.
+    """
+    for bom, encoding in _BOMS:
+        if content.startswith(bom):
+            return encoding
+    match = _HEADER_CHARSET_RE.search(content_type)
+    if match and _known_encoding(match.group(1)):
+        return _known_encoding(match.group(1))
+    match = _META_CHARSET_RE.search(content[:_PRESCAN_BYTES])
+    if match:
+        return _known_encoding(match.group(1))
+    return None
+
+
+def parse_html(content: bytes, backend: str = 'lxml', encoding: Optional[str] = None):
+    """Parse HTML with the chosen backend
+
+    'html.parser' and 'lxml' return a BeautifulSoup tree; 'selectolax' returns a
+    SelectolaxNode exposing the subset of the BeautifulSoup API the extractors use.
+    A known `encoding` (see detect_encoding) spares the parser from guessing it.
+    """
+    if backend in ('html.parser', 'lxml'):
+        return BeautifulSoup(content, backend, from_encoding=encoding if isinstance(content, bytes) else None)
+    if backend == 'selectolax':
+        if LexborHTMLParser is None:
+            raise ImportError("The 'selectolax' parser backend requires: pip install selectolax")
+        if isinstance(content, bytes):
+            content = UnicodeDammit(content, [encoding] if encoding else [], is_html=True).unicode_markup
+        return SelectolaxNode(LexborHTMLParser(content).root)
+    raise ValueError(f"Unknown parser backend '{backend}', expected one of {PARSER_BACKENDS}")
+
+
+def release_tree(tree):
+    """Free a parsed tree as soon as it is no longer needed
+
+    BeautifulSoup trees are reference cycles (parent, sibling and
+    next/previous element links), so dropping the last reference leaves
+    them for the cyclic garbage collector; decompose() breaks the links and
+    frees them at once. A selectolax tree is freed with its last reference.
+    """
+    if isinstance(tree, BeautifulSoup):
+        tree.decompose()
+
+
+def _matches(value, expected) -> bool:
+    """BeautifulSoup-style attribute matching against a string, regex, list or True"""
+    if expected is True:
+        return value is not None
+    if value is None:
+        return False
+    if hasattr(expected, 'search'):
+        return expected.search(value) is not None
+    if isinstance(expected, (list, tuple, set)):
+        return value in expected
+    return value == expected
+
+
+def _attribute(attributes: Dict, key: str) -> Optional[str]:
+    """Attribute value with valueless attributes read as '' like BeautifulSoup"""
+    if key not in attributes:
+        return None
+    return attributes[key] or ''
+
+
+class SelectolaxNode:
+    """BeautifulSoup-compatible wrapper around a selectolax (lexbor) element"""
+
+    __slots__ = ('_node',)
+
+    def __init__(self, node):
+        self._node = node
+
+    @property
+    def name(self) -> str:
+        return self._node.tag
+
+    @property
+    def attrs(self) -> Dict[str, str]:
+        return {k: (v or '') for k, v in self._node.attributes.items()}
+
+    def get(self, key: str, default=None):
+        value = _attribute(self._node.attributes, key)
+        return default if value is None else value
+
+    def __getitem__(self, key: str):
+        value = _attribute(self._node.attributes, key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __bool__(self) -> bool:
+        return True
+
+    def get_text(self) -> str:
+        if self._node.tag == '-text':
+            return self._node.text_content or ''
+        parts = []
+        for node in self._node.traverse(include_text=True):
+            if node.tag == '-text' and (node.parent is None or node.parent.tag not in _NON_TEXT_TAGS):
+                parts.append(node.text_content or '')
+        return ''.join(parts)
+
+    @property
+    def string(self) -> Optional[str]:
+        """The single string inside this element, following single-child chains"""
+        node = self._node
+        while True:
+            children = [c for c in node.iter(include_text=True) if c.tag != '-comment']
+            if len(children) != 1:
+                return None
+            node = children[0]
+            if node.tag == '-text':
+                return node.text_content
+
+    def descendants(self) -> Iterator['SelectolaxNode']:
+        """All descendant elements in document order"""
+        nodes = self._node.traverse()
+        next(nodes, None)  # traverse() starts with the node itself
+        for node in nodes:
+            if not node.tag.startswith('-'):
+                yield SelectolaxNode(node)
+
+    def find_all(self, name=None, attrs: Optional[Dict] = None, class_=None, string=None,
+                 limit: Optional[int] = None, **kwargs) -> List['SelectolaxNode']:
+        if isinstance(name, str):
+            name = [name]
+        wanted = dict(attrs or {})
+        wanted.update(kwargs)
+
+        results = []
+        nodes = self._node.traverse()
+        next(nodes, None)
+        for node in nodes:
+            tag = node.tag
+            if tag.startswith('-') or (name is not None and tag not in name):
+                continue
+            if wanted or class_ is not None:
+                attributes = node.attributes
+                if not all(_matches(_attribute(attributes, k), v) for k, v in wanted.items()):
+                    continue
+                if class_ is not None:
+                    classes = (attributes.get('class') or '').split()
+                    if not classes or not any(_matches(c, class_) for c in classes):
+                        continue
+            element = SelectolaxNode(node)
+            if string is not None and not _matches(element.string, string):
+                continue
+            results.append(element)
+            if limit and len(results) >= limit:
+                break
+        return results
+
+    def find(self, name=None, attrs: Optional[Dict] = None, **kwargs) -> Optional['SelectolaxNode']:
+        found = self.find_all(name, attrs, limit=1, **kwargs)
+        return found[0] if found else None
+
+    def select(self, selector: str) -> List['SelectolaxNode']:
+        # Unlike soupsieve, lexbor includes the node itself when it matches
+        own_id = self._node.mem_id
+        return [SelectolaxNode(node) for node in self._node.css(selector) if node.mem_id != own_id]
+
+    def decompose(self):
+        self._node.decompose()
@@ -0,0 +1,182 @@
+import logging
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from dom_index import PageIndex
+from frontier import RunFrontier, canonicalize_url
+from transport import Deadline
+
+logger = logging.getLogger(__name__)
+
+# Raw responses keyed by canonical URL; None marks a failed fetch
+RawPages = Dict[str, Optional[Tuple[Dict[str, str], bytes]]]
+
+# Scraper instance owned by each extraction process
+_worker_scraper = None
+
+
+def _init_worker(parser: str, organizations_path: Optional[str]):
+    global _worker_scraper
+    from client_matcher import OrganizationGazetteer
+    from main import EnhancedCompanyScraper
+    organizations = OrganizationGazetteer(organizations_path) if organizations_path else None
+    _worker_scraper = EnhancedCompanyScraper(max_workers=1, parser=parser, companies=[],
+                                             organizations=organizations)
+
+
+def extract_prefetched(company: Dict, pages: RawPages, sitemap: Optional[Dict[str, List[str]]] = None,
+                       homepage: Optional[PageIndex] = None
+                       ) -> Tuple[Optional[Dict], List[str], Dict, Dict, Optional[PageIndex]]:
+    """Parse and extract one company from prefetched pages (runs in a worker process)
+
+    Returns (record, [], frontier stats, stage timings, None) when every page
+    the extractors need was prefetched, or (None, missing URLs, {}, stage
+    timings, homepage index) when sub-pages still have to be fetched first.
+    The index is passed back in as `homepage` with the fetched sub-pages, so
+    the homepage is parsed only once.
+    """
+    scraper = _worker_scraper
+    timings = scraper.metrics.start(company)
+    with scraper.metrics.track(timings):
+        record, missing, stats, page = _extract_prefetched(scraper, company, pages, sitemap, homepage)
+    return record, missing, stats, timings.stages, page
+
+
+def _extract_prefetched(scraper, company: Dict, pages: RawPages, sitemap: Optional[Dict[str, List[str]]],
+                        page: Optional[PageIndex]):
+    scraper.frontier = RunFrontier()
+    website = company['website']
+
+    if page is None:
+        soup = scraper._parse_html(website, *pages[canonicalize_url(website)])
+        if not soup:
+            logger.warning(f"Failed to fetch {company['name']}, creating fallback data")
+            return scraper._create_fallback_data(company), [], {}, None
+
+        try:
+            page = scraper._index_page(soup)
+            missing = [url for url in scraper.subpage_urls(page, website, sitemap)
+                       if canonicalize_url(url) not in pages]
+        except Exception as e:
+            logger.error(f"Error scraping {company['name']}: {str(e)}")
+            return scraper._create_fallback_data(company), [], {}, None
+        if missing:
+            return None, missing, {}, page
+
+    def fetch(url: str) -> Optional[PageIndex]:
+        raw = pages.get(canonicalize_url(url))
+        soup = scraper._parse_html(url, *raw) if raw else None
+        if not soup:
+            return None
+        return scraper._index_page(soup)
+
+    return scraper.extract_company(company, page, fetch, sitemap), [], scraper.frontier.stats, None
+
+
+class ExtractionPipeline:
+    """Network threads fetch raw pages, a process pool parses them and runs the extractors
+
+    Each company moves fetch -> discover (sitemaps) -> extract, and back to
+    fetch once if it has contact/news sub-pages. The number of companies in flight is
+    bounded, so neither stage can run ahead and buffer unbounded page bodies.
+    Every fetch for a company shares one deadline; its sub-pages are fetched
+    in parallel and those not in by then are extracted without.
+    """
+
+    def __init__(self, scraper, processes: int):
+        self.scraper = scraper
+        self.processes = max(1, processes)
+        self.max_in_flight = max(scraper.max_workers, self.processes) * 2
+
+    def _fetch(self, urls: List[str], timings, deadline: Deadline) -> RawPages:
+        with self.scraper.metrics.track(timings), self.scraper.within(deadline):
+            if len(urls) == 1:
+                return {canonicalize_url(urls[0]): self.scraper.fetch_raw(urls[0])}
+            return self.scraper.fetch_concurrently(urls, deadline)
+
+    def _discover(self, website: str, timings, deadline: Deadline) -> Dict[str, List[str]]:
+        with self.scraper.metrics.track(timings), self.scraper.within(deadline):
+            return self.scraper.discover_pages(website)
+
+    def run(self, companies: Iterable[Dict]) -> Iterator[Tuple[int, Dict]]:
+        """Yield (input index, record) pairs as companies finish"""
+        scraper = self.scraper
+        # Spawned workers do not inherit the fetch threads' locks or open sockets
+        context = multiprocessing.get_context('spawn')
+        # Workers load the organization dictionary themselves rather than receive it pickled
+        organizations_path = scraper.organizations.path if scraper.organizations else None
+        with ProcessPoolExecutor(max_workers=self.processes, mp_context=context, initializer=_init_worker,
+                                 initargs=(scraper.parser, organizations_path)) as extractors, \
+                ThreadPoolExecutor(max_workers=scraper.max_workers) as fetchers:
+            pending = {}
+            deadlines: Dict[int, Deadline] = {}
+            # Homepage indexes of companies waiting for their sub-pages
+            homepages: Dict[int, PageIndex] = {}
+            company_iter = enumerate(companies)
+
+            def submit_next() -> bool:
+                for i, company in company_iter:
+                    logger.info(f"Scraping {company['name']} ({company['sector']}) - {company['website']}")
+                    timings = scraper.metrics.start(company)
+                    deadlines[i] = Deadline(scraper.company_budget)
+                    pending[fetchers.submit(self._fetch, [company['website']], timings, deadlines[i])] = \
+                        ('fetch', i, company, {}, timings, None)
+                    return True
+                return False
+
+            for _ in range(self.max_in_flight):
+                if not submit_next():
+                    break
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage, i, company, pages, timings, sitemap = pending.pop(future)
+                    try:
+                        if stage == 'discover':
+                            sitemap = future.result()
+                            pending[extractors.submit(extract_prefetched, company, pages, sitemap)] = \
+                                ('extract', i, company, pages, timings, sitemap)
+                            continue
+                        if stage == 'fetch':
+                            pages.update(future.result())
+                            if pages[canonicalize_url(company['website'])] is None:
+                                logger.warning(f"Failed to fetch {company['name']}, creating fallback data")
+                                company_data = scraper._create_fallback_data(company)
+                            else:
+                                previous, missing = (scraper.reuse_unchanged(company, pages)
+                                                     if scraper.fingerprints else (None, []))
+                                if missing:
+                                    pending[fetchers.submit(self._fetch, missing, timings, deadlines[i])] = \
+                                        ('fetch', i, company, pages, timings, sitemap)
+                                    continue
+                                if previous is None and sitemap is None and scraper.sitemaps:
+                                    pending[fetchers.submit(self._discover, company['website'], timings,
+                                                            deadlines[i])] = \
+                                        ('discover', i, company, pages, timings, None)
+                                    continue
+                                if previous is None:
+                                    pending[extractors.submit(extract_prefetched, company, pages, sitemap,
+                                                              homepages.pop(i, None))] = \
+                                        ('extract', i, company, pages, timings, sitemap)
+                                    continue
+                                company_data = previous
+                        else:
+                            company_data, missing, stats, stages, homepage = future.result()
+                            timings.merge(stages)
+                            if missing:
+                                homepages[i] = homepage
+                                pending[fetchers.submit(self._fetch, missing, timings, deadlines[i])] = \
+                                    ('fetch', i, company, pages, timings, sitemap)
+                                continue
+                            scraper.frontier.merge_stats(stats)
+                            scraper.remember_pages(company, company_data, pages, deadlines[i])
+                    except Exception as e:
+                        logger.error(f"Critical error scraping {company['name']}: {str(e)}")
+                        company_data = scraper._create_fallback_data(company)
+                    homepages.pop(i, None)
+                    scraper.flag_truncated(company_data, deadlines.pop(i))
+                    scraper.metrics.finish(timings, company_data)
+                    yield i, company_data
+                    submit_next()
@@ -0,0 +1,159 @@
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Optional
+from urllib.parse import urlparse
+
+from transport import DeadlineExceeded
+
+
+class _HostState:
+    """Request slots, next start time and adapted delays of one host"""
+
+    __slots__ = ('semaphore', 'active', 'next_slot', 'delay', 'latency', 'crawl_delay')
+
+    def __init__(self, max_per_host: int):
+        self.semaphore = threading.BoundedSemaphore(max_per_host)
+        # Requests holding or waiting for a slot; the state is only evicted when none are
+        self.active = 0
+        self.next_slot = 0.0
+        # Delay while it differs from the base delay, smoothed response time, robots.txt Crawl-delay
+        self.delay: Optional[float] = None
+        self.latency: Optional[float] = None
+        self.crawl_delay: Optional[float] = None
+
+
+class HostPoliteness:
+    """Per-host concurrency limit and minimum delay between requests
+
+    The delay adapts per host: a 429/503 doubles it (or raises it to the
+    server's Retry-After), and a host that answers slowly is spaced out by
+    its recent response time. Successful responses shrink it back towards
+    `delay`, or the host's robots.txt Crawl-delay if that is longer.
+
+    State is kept for the `max_hosts` most recently used hosts. Older ones
+    are dropped once idle (no request in flight or waiting, next start time
+    passed), so memory stays flat over long company lists.
+    """
+
+    def __init__(self, delay: float = 3.0, max_per_host: int = 1, max_delay: float = 60.0, max_hosts: int = 1024):
+        self.delay = delay
+        self.max_per_host = max(1, max_per_host)
+        self.max_delay = max(delay, max_delay)
+        self.max_hosts = max(1, max_hosts)
+        self._lock = threading.Lock()
+        self._hosts: 'OrderedDict[str, _HostState]' = OrderedDict()
+
+    @staticmethod
+    def host_key(url: str) -> str:
+        """Normalise a URL to the host it will be requested from"""
+        host = (urlparse(url).hostname or '').lower()
+        return host[4:] if host.startswith('www.') else host
+
+    def _state(self, host: str) -> _HostState:
+        # Called with the lock held
+        state = self._hosts.get(host)
+        if state is None:
+            # Room is made first, so the new host is never the one evicted
+            self._evict()
+            state = self._hosts[host] = _HostState(self.max_per_host)
+        else:
+            self._hosts.move_to_end(host)
+        return state
+
+    def _evict(self):
+        excess = len(self._hosts) + 1 - self.max_hosts
+        if excess <= 0:
+            return
+        now = time.monotonic()
+        idle = []
+        for host, state in self._hosts.items():
+            if state.active == 0 and state.next_slot <= now:
+                idle.append(host)
+                if len(idle) == excess:
+                    break
+        for host in idle:
+            del self._hosts[host]
+
+    def _base_delay(self, state: _HostState) -> float:
+        return state.crawl_delay or self.delay
+
+    def _reserve_start(self, host: str, max_wait: Optional[float] = None) -> Optional[float]:
+        """Reserve the next start time for a host and return how long to wait
+
+        Returns None, reserving nothing, if that would be longer than `max_wait`.
+        """
+        with self._lock:
+            state = self._state(host)
+            now = time.monotonic()
+            start = max(now, state.next_slot)
+            if max_wait is not None and start - now > max_wait:
+                return None
+            state.next_slot = start + max(state.delay or 0.0, self._base_delay(state))
+            return start - now
+
+    def host_delay(self, url: str) -> float:
+        """Current delay between requests to the URL's host"""
+        with self._lock:
+            state = self._hosts.get(self.host_key(url))
+            if state is None:
+                return self.delay
+            return max(state.delay or 0.0, self._base_delay(state))
+
+    def set_crawl_delay(self, url: str, seconds: float):
+        """Never request the host more often than its robots.txt asks (up to max_delay)"""
+        with self._lock:
+            if seconds > self.delay:
+                self._state(self.host_key(url)).crawl_delay = min(seconds, self.max_delay)
+
+    def throttle(self, url: str, retry_after: Optional[float] = None):
+        """Slow a host down after it answered 429/503"""
+        with self._lock:
+            state = self._state(self.host_key(url))
+            current = state.delay or self._base_delay(state)
+            state.delay = min(self.max_delay, max(current * 2, 1.0, retry_after or 0.0))
+            if retry_after:
+                # Nobody else requests from the host before it asked us to come back
+                resume = time.monotonic() + min(retry_after, self.max_delay)
+                state.next_slot = max(state.next_slot, resume)
+
+    def observe(self, url: str, seconds: float):
+        """Record a successful response time and let the host's delay recover"""
+        with self._lock:
+            state = self._state(self.host_key(url))
+            latency = state.latency = 0.7 * (seconds if state.latency is None else state.latency) + 0.3 * seconds
+            base = self._base_delay(state)
+            floor = min(self.max_delay, max(base, latency))
+            current = state.delay or base
+            relaxed = max(floor, current * 0.75)
+            state.delay = relaxed if relaxed > base else None
+
+    @contextmanager
+    def slot(self, url: str, max_wait: Optional[float] = None):
+        """Hold a request slot for the URL's host, waiting for its delay first
+
+        Raises DeadlineExceeded instead of waiting longer than `max_wait` seconds.
+        """
+        host = self.host_key(url)
+        with self._lock:
+            state = self._state(host)
+            state.active += 1
+        try:
+            start = time.monotonic()
+            if not state.semaphore.acquire(timeout=max_wait):
+                raise DeadlineExceeded(f"no request slot for {host} within {max_wait:.1f}s")
+            try:
+                if max_wait is not None:
+                    max_wait = max(0.0, max_wait - (time.monotonic() - start))
+                wait = self._reserve_start(host, max_wait)
+                if wait is None:
+                    raise DeadlineExceeded(f"next request to {host} is due in more than {max_wait:.1f}s")
+                if wait > 0:
+                    time.sleep(wait)
+                yield
+            finally:
+                state.semaphore.release()
+        finally:
+            with self._lock:
+                state.active -= 1
@@ -0,0 +1,294 @@
+import cProfile
+import functools
+import gc
+import io
+import logging
+import marshal
+import os
+import pstats
+import re
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Extractor name -> EnhancedCompanyScraper method reported separately with `extractors`
+EXTRACTORS = {'description': 'smart_description_extraction', 'offices': 'enhanced_office_extraction',
+              'clients': 'smart_client_extraction', 'news': 'enhanced_news_extraction'}
+
+# What profiled time means: CPU time of the company's thread, or wall time including network waits
+CLOCKS = {'cpu': time.thread_time, 'wall': time.perf_counter}
+
+# Call paths deeper than this, or worth less than a microsecond, are left out of collapsed stacks
+MAX_STACK_DEPTH = 64
+
+_FILE_SAFE_RE = re.compile(r'[^A-Za-z0-9]+')
+
+Function = Tuple[str, int, str]
+
+
+def _label(func: Function) -> str:
+    filename, lineno, name = func
+    if filename == '~':
+        return name  # builtins: '<built-in method time.sleep>'
+    return f"{name} ({os.path.basename(filename)}:{lineno})"
+
+
+def _call_paths(stats: pstats.Stats) -> Iterator[Tuple[List[Function], float, float, float]]:
+    """(call path from a root, own seconds, cumulative seconds, calls) for each path through the call graph
+
+    cProfile keeps caller -> callee totals, not whole stacks, so a callee
+    reached along several paths gets its time split in proportion to what
+    each caller spent in it (the usual approximation, as in gprof2dot).
+    """
+    callees: Dict[Function, Dict[Function, tuple]] = {}
+    roots = []
+    for func, (_, _, _, _, callers) in stats.stats.items():
+        if not callers:
+            roots.append(func)
+        for caller, edge in callers.items():
+            callees.setdefault(caller, {})[func] = edge
+
+    def walk(path: List[Function], own: float, cumulative: float, calls: float):
+        yield path, own, cumulative, calls
+        total = stats.stats[path[-1]][3]
+        share = cumulative / total if total else 0.0
+        for callee, (_, edge_calls, edge_own, edge_cumulative) in callees.get(path[-1], {}).items():
+            # Recursion is folded into the first frame of the function
+            if callee in path or len(path) >= MAX_STACK_DEPTH or edge_cumulative * share < 1e-6:
+                continue
+            yield from walk(path + [callee], edge_own * share, edge_cumulative * share, edge_calls * share)
+
+    for root in roots:
+        _, calls, own, cumulative, _ = stats.stats[root]
+        yield from walk([root], own, cumulative, calls)
+
+
+def _below(path: List[Function], names: Optional[str]) -> Optional[List[Function]]:
+    """The part of the path from the first call of a function named `names`, or None if it has none"""
+    if names is None:
+        return path
+    for i, func in enumerate(path):
+        if func[2] == names:
+            return path[i:]
+    return None
+
+
+def collapsed_stacks(stats: pstats.Stats, root: Optional[str] = None) -> Dict[str, int]:
+    """'caller;callee' -> microseconds of own time, the input flamegraph.pl and speedscope read
+
+    With `root` (a function name), only what ran below that function, with it as the root frame.
+    """
+    stacks: Dict[str, int] = {}
+    for path, own, _, _ in _call_paths(stats):
+        path = _below(path, root)
+        if path and own >= 1e-6:
+            stack = ';'.join(_label(frame) for frame in path)
+            stacks[stack] = stacks.get(stack, 0) + int(own * 1e6)
+    return stacks
+
+
+def write_collapsed(stacks: Dict[str, int], path: str):
+    with open(path, 'w', encoding='utf-8') as f:
+        for stack, microseconds in sorted(stacks.items()):
+            f.write(f"{stack} {microseconds}\n")
+
+
+def write_subtree_stats(stats: pstats.Stats, root: str, path: str) -> bool:
+    """Write a pstats file of only what ran below the function named `root`; False if it never ran"""
+    subtree: Dict[Function, list] = {}
+    for call_path, own, cumulative, calls in _call_paths(stats):
+        call_path = _below(call_path, root)
+        if not call_path:
+            continue
+        entry = subtree.setdefault(call_path[-1], [0.0, 0.0, 0.0, 0.0, {}])
+        edges = [entry] + ([entry[4].setdefault(call_path[-2], [0.0, 0.0, 0.0, 0.0])] if len(call_path) > 1 else [])
+        for totals in edges:
+            totals[0] += calls
+            totals[1] += calls
+            totals[2] += own
+            totals[3] += cumulative
+    if not subtree:
+        return False
+    # The layout pstats.Stats.dump_stats writes: {function: (cc, nc, tt, ct, {caller: (cc, nc, tt, ct)})}
+    table = {func: (round(cc), round(nc), tt, ct, {caller: (round(e[0]), round(e[1]), e[2], e[3])
+                                                    for caller, e in callers.items()})
+             for func, (cc, nc, tt, ct, callers) in subtree.items()}
+    with open(path, 'wb') as f:
+        marshal.dump(table, f)
+    return True
+
+
+def _reset_peak():
+    # tracemalloc.reset_peak() is new in Python 3.9; before that the peak covers the whole run
+    reset = getattr(tracemalloc, 'reset_peak', None)
+    if reset:
+        reset()
+
+
+def _without_profiler(snapshot: tracemalloc.Snapshot) -> tracemalloc.Snapshot:
+    return snapshot.filter_traces([tracemalloc.Filter(False, tracemalloc.__file__),
+                                   tracemalloc.Filter(False, __file__),
+                                   tracemalloc.Filter(False, '<frozen importlib._bootstrap*>'),
+                                   tracemalloc.Filter(False, '<unknown>')])
+
+
+class CompanyProfiler:
+    """cProfile and tracemalloc reports per company, plus the hottest functions and biggest allocators of the run
+
+    instrument() wraps a scraper's scrape_company_enhanced on that instance
+    only, so a scraper without a profiler runs exactly the code it always did.
+
+    For each company the profile directory gets `<id>-<name>.pstats`
+    (for pstats, snakeviz), `<id>-<name>.collapsed` (for flamegraph.pl or
+    speedscope) and `<id>-<name>.alloc.txt`, the lines whose allocations
+    the company left behind and its peak traced memory. With `extractors`,
+    each extractor also gets `<id>-<name>.<extractor>.pstats/.collapsed`,
+    cut from the company's call graph rather than profiled separately, so
+    the company profile stays whole. finish() writes the same for the whole
+    run (`run.*`) and `summary.txt`.
+
+    Times are CPU time of the company's thread by default, so the code that
+    burns CPU is not buried under calls that wait for the network (the run
+    metrics already break those waits down); clock='wall' counts them too.
+
+    Companies are profiled one at a time: cProfile sees only the thread that
+    enabled it (and from Python 3.12 only one profiler may run at a time),
+    and a tracemalloc snapshot covers the whole process. Sub-pages are still
+    fetched in parallel, and only the wait for them shows in the profile.
+    Extraction must run in the fetch threads (no processes). tracemalloc
+    slows Python code down, so compare timings between profiled runs only.
+    """
+
+    def __init__(self, directory: str = 'profiles', top: int = 20, extractors: bool = False, clock: str = 'cpu'):
+        self.directory = directory
+        self.top = top
+        self.extractors = extractors
+        self._timer = CLOCKS[clock]
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._run_stats: Optional[pstats.Stats] = None
+        # (filename, lineno) -> [bytes, blocks] left allocated, summed over companies
+        self._allocators: Dict[Tuple[str, int], List[int]] = {}
+        self.stats = {'companies': 0, 'seconds': 0.0, 'peak_bytes': 0, 'peak_company': ''}
+
+    def instrument(self, scraper):
+        """Profile every scrape_company_enhanced call of this scraper"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        scraper.scrape_company_enhanced = self._wrap_company(scraper.scrape_company_enhanced)
+
+    def _wrap_company(self, scrape):
+        @functools.wraps(scrape)
+        def profiled(company: Dict, *args, **kwargs):
+            with self.profile(company):
+                return scrape(company, *args, **kwargs)
+        return profiled
+
+    @contextmanager
+    def profile(self, company: Dict):
+        """Profile one company; blocks while another company is being profiled"""
+        with self._lock:
+            profiler = cProfile.Profile(self._timer)
+            # Garbage from earlier companies would otherwise be freed during this one and blur its allocations
+            gc.collect()
+            _reset_peak()
+            before = tracemalloc.take_snapshot()
+            start = time.perf_counter()
+            profiler.enable()
+            try:
+                yield
+            finally:
+                profiler.disable()
+                elapsed = time.perf_counter() - start
+                peak = tracemalloc.get_traced_memory()[1]
+                gc.collect()
+                after = tracemalloc.take_snapshot()
+                self._report(company, profiler, before, after, elapsed, peak)
+
+    def _report(self, company: Dict, profiler: cProfile.Profile, before: tracemalloc.Snapshot,
+                after: tracemalloc.Snapshot, elapsed: float, peak: int):
+        name = _FILE_SAFE_RE.sub('-', str(company['name'])).strip('-')[:60]
+        stem = os.path.join(self.directory, f"{company['id']}-{name}")
+        stats = pstats.Stats(profiler)
+        stats.dump_stats(f"{stem}.pstats")
+        write_collapsed(collapsed_stacks(stats), f"{stem}.collapsed")
+        if self.extractors:
+            for extractor, method in EXTRACTORS.items():
+                if write_subtree_stats(stats, method, f"{stem}.{extractor}.pstats"):
+                    write_collapsed(collapsed_stacks(stats, method), f"{stem}.{extractor}.collapsed")
+
+        differences = [difference for difference in _without_profiler(after).compare_to(
+            _without_profiler(before), 'lineno') if difference.size_diff > 0]
+        with open(f"{stem}.alloc.txt", 'w', encoding='utf-8') as f:
+            f.write(f"{company['name']}: peak traced memory {peak / 1024:.1f} KiB, {elapsed:.2f}s\n")
+            for difference in differences[:self.top]:
+                frame = difference.traceback[0]
+                f.write(f"{difference.size_diff / 1024:+10.1f} KiB {difference.count_diff:+7d} blocks  "
+                        f"{frame.filename}:{frame.lineno}\n")
+        for difference in differences:
+            frame = difference.traceback[0]
+            totals = self._allocators.setdefault((frame.filename, frame.lineno), [0, 0])
+            totals[0] += difference.size_diff
+            totals[1] += difference.count_diff
+
+        if self._run_stats is None:
+            self._run_stats = stats
+        else:
+            self._run_stats.add(stats)
+        self.stats['companies'] += 1
+        self.stats['seconds'] += elapsed
+        if peak > self.stats['peak_bytes']:
+            self.stats['peak_bytes'], self.stats['peak_company'] = peak, company['name']
+        logger.info(f"Profiled {company['name']}: {elapsed:.2f}s, {stats.total_calls} calls, "
+                    f"peak traced memory {peak / 1024:.0f} KiB -> {stem}.pstats")
+
+    def hottest(self) -> List[Tuple[Function, int, float, float]]:
+        """(function, calls, own seconds, cumulative seconds) for the top functions by own time"""
+        if self._run_stats is None:
+            return []
+        rows = [(func, nc, tt, ct) for func, (_, nc, tt, ct, _) in self._run_stats.stats.items()]
+        return sorted(rows, key=lambda row: -row[2])[:self.top]
+
+    def biggest_allocators(self) -> List[Tuple[Tuple[str, int], int, int]]:
+        """((filename, lineno), bytes, blocks) left allocated by the most memory across companies"""
+        rows = [(line, size, count) for line, (size, count) in self._allocators.items()]
+        return sorted(rows, key=lambda row: -row[1])[:self.top]
+
+    def finish(self):
+        """Write the run-wide profile, collapsed stacks and summary, and stop tracing allocations"""
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        if self._run_stats is None:
+            return
+        self._run_stats.dump_stats(os.path.join(self.directory, 'run.pstats'))
+        write_collapsed(collapsed_stacks(self._run_stats), os.path.join(self.directory, 'run.collapsed'))
+        with open(os.path.join(self.directory, 'summary.txt'), 'w', encoding='utf-8') as f:
+            f.write(self.summary())
+
+    def summary(self) -> str:
+        out = io.StringIO()
+        out.write(f"{self.stats['companies']} companies profiled in {self.stats['seconds']:.2f}s; highest peak "
+                  f"{self.stats['peak_bytes'] / 1024:.0f} KiB ({self.stats['peak_company']})\n")
+        out.write(f"\nHottest functions by own time:\n{'own s':>9} {'cum s':>9} {'calls':>9}  function\n")
+        for func, calls, own, cumulative in self.hottest():
+            out.write(f"{own:>9.3f} {cumulative:>9.3f} {calls:>9}  {_label(func)}\n")
+        out.write(f"\nBiggest allocators (memory left allocated after each company):\n"
+                  f"{'KiB':>9} {'blocks':>9}  line\n")
+        for (filename, lineno), size, count in self.biggest_allocators():
+            out.write(f"{size / 1024:>9.1f} {count:>9}  {filename}:{lineno}\n")
+        return out.getvalue()
+
+    def log_stats(self):
+        logger.info("Profile Summary:")
+        logger.info(f"  Companies profiled: {self.stats['companies']}, highest peak traced memory "
+                    f"{self.stats['peak_bytes'] / 1024:.0f} KiB ({self.stats['peak_company']})")
+        for func, calls, own, cumulative in self.hottest()[:5]:
+            logger.info(f"  {own:.3f}s own, {cumulative:.3f}s cumulative, {calls} calls: {_label(func)}")
+        for (filename, lineno), size, count in self.biggest_allocators()[:5]:
+            logger.info(f"  {size / 1024:.1f} KiB left allocated in {count} blocks: {filename}:{lineno}")
+        logger.info(f"  Full reports in {self.directory} (summary.txt, run.pstats, run.collapsed)")
+
@@ -0,0 +1,100 @@
+from typing import Dict, Optional, Tuple
+
+# Record keys in the order the extractors write them; the optional ones are left out when unset
+COMPANY_FIELDS = ('company_id', 'company_name', 'company_website', 'sector', 'description', 'offices', 'clients',
+                  'news', 'scrape_date', 'data_quality', 'data_sources', 'truncated')
+_OPTIONAL_FIELDS = frozenset({'data_sources', 'truncated'})
+
+
+class Office:
+    """One office location of a company"""
+
+    __slots__ = ('location', 'is_hq', 'address')
+
+    def __init__(self, location: str = '', is_hq: bool = False, address: str = ''):
+        self.location = location
+        self.is_hq = is_hq
+        self.address = address
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Office':
+        return cls(data.get('location', ''), data.get('is_hq', False), data.get('address', ''))
+
+    def to_dict(self) -> Dict:
+        return {'location': self.location, 'is_hq': self.is_hq, 'address': self.address}
+
+
+class NewsItem:
+    """One news article or update"""
+
+    __slots__ = ('title', 'date', 'url', 'summary')
+
+    def __init__(self, title: str = '', date: str = '', url: str = '', summary: str = ''):
+        self.title = title
+        self.date = date
+        self.url = url
+        self.summary = summary
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'NewsItem':
+        return cls(data.get('title', ''), data.get('date', ''), data.get('url', ''), data.get('summary', ''))
+
+    def to_dict(self) -> Dict:
+        return {'title': self.title, 'date': self.date, 'url': self.url, 'summary': self.summary}
+
+
+class CompanyRecord:
+    """A finished company record, held compactly until it is exported
+
+    The extractors and every store work with plain dicts (the JSON shape);
+    records kept in memory for a whole run use this form instead, which
+    is about 30% smaller. to_dict() gives back the same dict, keys in the
+    same order, including any keys it does not know about.
+    """
+
+    __slots__ = COMPANY_FIELDS + ('extra',)
+
+    def __init__(self, company_id, company_name: str, company_website: str, sector: str = '',
+                 description: str = '', offices: Tuple[Office, ...] = (), clients: Tuple[str, ...] = (),
+                 news: Tuple[NewsItem, ...] = (), scrape_date: str = '', data_quality: str = '',
+                 data_sources: Optional[Dict[str, str]] = None, truncated: Optional[Tuple[str, ...]] = None,
+                 extra: Optional[Dict] = None):
+        self.company_id = company_id
+        self.company_name = company_name
+        self.company_website = company_website
+        self.sector = sector
+        self.description = description
+        self.offices = offices
+        self.clients = clients
+        self.news = news
+        self.scrape_date = scrape_date
+        self.data_quality = data_quality
+        self.data_sources = data_sources
+        self.truncated = truncated
+        self.extra = extra
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'CompanyRecord':
+        extra = {key: value for key, value in data.items() if key not in COMPANY_FIELDS}
+        truncated = data.get('truncated')
+        return cls(data['company_id'], data['company_name'], data['company_website'], data.get('sector', ''),
+                   data.get('description', ''), tuple(Office.from_dict(office) for office in data.get('offices', ())),
+                   tuple(data.get('clients', ())), tuple(NewsItem.from_dict(item) for item in data.get('news', ())),
+                   data.get('scrape_date', ''), data.get('data_quality', ''), data.get('data_sources'),
+                   tuple(truncated) if truncated is not None else None, extra or None)
+
+    def to_dict(self) -> Dict:
+        record = {}
+        for field in COMPANY_FIELDS:
+            value = getattr(self, field)
+            if value is None and field in _OPTIONAL_FIELDS:
+                continue
+            if field in ('offices', 'news'):
+                value = [item.to_dict() for item in value]
+            elif field in ('clients', 'truncated'):
+                value = list(value)
+            record[field] = value
+        if self.extra:
+            record.update(self.extra)
+        return record
+
@@ -0,0 +1,251 @@
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+from urllib.parse import quote
+
+from exporters import (CLIENT_COLUMNS, COMPANY_COLUMNS, NEWS_COLUMNS, OFFICE_COLUMNS, client_rows, company_rows,
+                       news_rows, office_rows)
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS runs (
+        run_id INTEGER PRIMARY KEY,
+        started_at REAL NOT NULL,
+        finished_at REAL
+    );
+    CREATE TABLE IF NOT EXISTS companies (
+        company_id INTEGER PRIMARY KEY,
+        company_name TEXT NOT NULL,
+        company_website TEXT NOT NULL,
+        sector TEXT,
+        description TEXT,
+        data_quality TEXT,
+        scrape_date TEXT,
+        record TEXT NOT NULL,
+        run_id INTEGER NOT NULL,
+        updated_at REAL NOT NULL,
+        input_position INTEGER
+    );
+    CREATE TABLE IF NOT EXISTS offices (
+        company_id INTEGER NOT NULL,
+        office_id TEXT PRIMARY KEY,
+        location TEXT,
+        address TEXT,
+        is_headquarters INTEGER NOT NULL,
+        position INTEGER NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS clients (
+        company_id INTEGER NOT NULL,
+        client_id TEXT PRIMARY KEY,
+        client_name TEXT,
+        position INTEGER NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS news (
+        company_id INTEGER NOT NULL,
+        news_id TEXT PRIMARY KEY,
+        news_title TEXT,
+        news_date TEXT,
+        news_url TEXT,
+        news_summary TEXT,
+        published_date TEXT,
+        position INTEGER NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_companies_sector ON companies (sector);
+    CREATE INDEX IF NOT EXISTS idx_companies_run ON companies (run_id);
+    CREATE INDEX IF NOT EXISTS idx_offices_company ON offices (company_id, position);
+    CREATE INDEX IF NOT EXISTS idx_offices_hq ON offices (is_headquarters, company_id);
+    CREATE INDEX IF NOT EXISTS idx_clients_company ON clients (company_id, position);
+    CREATE INDEX IF NOT EXISTS idx_clients_name ON clients (client_name);
+    CREATE INDEX IF NOT EXISTS idx_news_company ON news (company_id, position);
+    CREATE INDEX IF NOT EXISTS idx_news_published ON news (published_date);
+"""
+
+# Detail tables: name, sheet columns, row generator
+DETAIL_TABLES = [('offices', OFFICE_COLUMNS, office_rows), ('clients', CLIENT_COLUMNS, client_rows),
+                 ('news', NEWS_COLUMNS, news_rows)]
+# Export sheet -> table and the sheet's columns
+_SHEETS = {'Companies': ('companies', COMPANY_COLUMNS), 'Offices': ('offices', OFFICE_COLUMNS),
+           'Clients': ('clients', CLIENT_COLUMNS), 'News': ('news', NEWS_COLUMNS)}
+
+_COMPANY_FIELDS = COMPANY_COLUMNS + ['record', 'run_id', 'updated_at', 'input_position']
+_UPSERT_COMPANY = (f"INSERT INTO companies ({', '.join(_COMPANY_FIELDS)}) "
+                   f"VALUES ({', '.join('?' * len(_COMPANY_FIELDS))}) ON CONFLICT (company_id) DO UPDATE SET "
+                   + ', '.join(f"{field} = excluded.{field}" for field in _COMPANY_FIELDS[1:]))
+
+
+def _insert_detail(table: str, columns: List[str]) -> str:
+    # News rows also carry their date normalized for range queries
+    fields = columns + (['published_date'] if table == 'news' else []) + ['position']
+    return f"INSERT INTO {table} ({', '.join(fields)}) VALUES ({', '.join('?' * len(fields))})"
+
+
+_INSERT_DETAIL = {table: _insert_detail(table, columns) for table, columns, _ in DETAIL_TABLES}
+
+_ISO_DATE_RE = re.compile(r'(\d{4})-(\d{2})-(\d{2})')
+_MONTH_DATE_RE = re.compile(r'([A-Za-z]{3})[a-z]*\.?\s+(\d{1,2}),?\s+(\d{4})')
+
+
+def iso_date(text: str) -> Optional[str]:
+    """YYYY-MM-DD for the unambiguous date formats the news extractors return, else None"""
+    match = _ISO_DATE_RE.search(text or '')
+    if match:
+        return match.group()
+    match = _MONTH_DATE_RE.search(text or '')
+    if match:
+        try:
+            return datetime.strptime(' '.join(match.groups()), '%b %d %Y').strftime('%Y-%m-%d')
+        except ValueError:
+            return None
+    # 03/04/2024 could be March or April: left out of date queries rather than guessed
+    return None
+
+
+class ResultStore:
+    """Company records in a SQLite database, as companies/offices/clients/news tables plus the full record
+
+    The tables mirror the Excel sheets and are indexed for queries such as
+    headquarters by country or news after a date. Each finished company is
+    upserted in one transaction, so readers see either its old rows or its
+    new ones. Records also stay whole (as JSON) for the JSON export.
+
+    Every run is numbered. A run that was interrupted is resumed: companies
+    it already stored are skipped. After a finished run the next one scrapes
+    every company again and replaces their rows as it goes, so the store
+    stays queryable throughout a nightly refresh.
+
+    The store accumulates across runs: companies dropped from the list, or
+    scraped from another list into the same file, keep their rows. The
+    readers return every stored company by id; run_records and run_tables
+    return only the current run's, in the order of its company list.
+
+    A store opened read_only (to export or inspect it) starts no run and
+    never writes. Without wal the rollback journal is used instead, for
+    databases on a network filesystem where WAL's shared memory does not
+    work; readers then block writers while they read.
+    """
+
+    def __init__(self, path: str, fresh: bool = False, read_only: bool = False, wal: bool = True):
+        self.path = path
+        self._lock = threading.Lock()
+        # Readers never write, so they cannot create a missing file or take write locks
+        self._read_uri = f"file:{quote(os.path.abspath(path))}?mode=ro"
+        if read_only:
+            self.run_id = None
+            self._conn = sqlite3.connect(self._read_uri, uri=True, check_same_thread=False)
+            return
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        if wal:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            # With WAL, NORMAL only syncs at checkpoints; a crash can lose the last commits but not corrupt the file
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+        else:
+            self._conn.execute('PRAGMA journal_mode=DELETE')
+        self._conn.executescript(SCHEMA)
+        columns = {row[1] for row in self._conn.execute('PRAGMA table_info(companies)')}
+        if 'input_position' not in columns:
+            # Stores written before input order was kept
+            self._conn.execute('ALTER TABLE companies ADD COLUMN input_position INTEGER')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_companies_run_position '
+                           'ON companies (run_id, input_position)')
+
+        last = self._conn.execute('SELECT run_id, finished_at FROM runs ORDER BY run_id DESC LIMIT 1').fetchone()
+        if last and last[1] is None and not fresh:
+            self.run_id = last[0]
+        else:
+            self.run_id = self._conn.execute('INSERT INTO runs (started_at) VALUES (?)', (time.time(),)).lastrowid
+        self._conn.commit()
+
+    def completed_ids(self) -> Set:
+        """Company ids already stored by this run"""
+        with self._lock:
+            return {row[0] for row in self._conn.execute('SELECT company_id FROM companies WHERE run_id = ?',
+                                                         (self.run_id,))}
+
+    def append(self, record: Dict, position: Optional[int] = None):
+        """Insert or replace one company's rows in every table; position is its place in the run's company list"""
+        rows = self._rows(record, position)
+        with self._lock, self._conn:
+            self._write(record['company_id'], *rows)
+
+    def _rows(self, record: Dict, position: Optional[int] = None) -> Tuple[List, Dict[str, List[List]]]:
+        """(companies row, detail table -> rows) of one record, built outside the lock"""
+        company = next(company_rows([record])) + [json.dumps(record, ensure_ascii=False), self.run_id, time.time(),
+                                                  position]
+        details = {table: [row + ([iso_date(row[3])] if table == 'news' else []) + [position]
+                           for position, row in enumerate(rows([record]))]
+                   for table, _, rows in DETAIL_TABLES}
+        return company, details
+
+    def _write(self, company_id, company: List, details: Dict[str, List[List]]):
+        # Runs inside the caller's transaction
+        self._conn.execute(_UPSERT_COMPANY, company)
+        for table, values in details.items():
+            # Lists can shrink between runs, so the company's old rows go first
+            self._conn.execute(f"DELETE FROM {table} WHERE company_id = ?", (company_id,))
+            self._conn.executemany(_INSERT_DETAIL[table], values)
+
+    def finish(self):
+        """Mark the run complete, so the next one starts over instead of resuming"""
+        with self._lock, self._conn:
+            self._conn.execute('UPDATE runs SET finished_at = ? WHERE run_id = ?', (time.time(), self.run_id))
+
+    def iter_records(self) -> Iterator[Dict]:
+        """Every stored record, by company id"""
+        for (record,) in self._read('SELECT record FROM companies ORDER BY company_id'):
+            yield json.loads(record)
+
+    def run_records(self) -> Iterator[Dict]:
+        """Records stored by the current run, in the order of its company list"""
+        for (record,) in self._read('SELECT record FROM companies WHERE run_id = ? '
+                                    'ORDER BY input_position, company_id', (self.run_id,)):
+            yield json.loads(record)
+
+    def table_rows(self, sheet: str) -> Iterator[List]:
+        """Rows of one export sheet ('Companies', 'Offices', ...) with the sheet's columns, for every company"""
+        table, columns = _SHEETS[sheet]
+        order = 'company_id' if table == 'companies' else 'company_id, position'
+        yield from self._sheet_rows(table, self._read(f"SELECT {', '.join(columns)} FROM {table} ORDER BY {order}"))
+
+    def run_table_rows(self, sheet: str) -> Iterator[List]:
+        """Rows of one export sheet for the current run's companies, in the order of its company list"""
+        table, columns = _SHEETS[sheet]
+        if table == 'companies':
+            sql = (f"SELECT {', '.join(columns)} FROM companies WHERE run_id = ? "
+                   "ORDER BY input_position, company_id")
+        else:
+            sql = (f"SELECT {', '.join('t.' + column for column in columns)} FROM {table} t "
+                   "JOIN companies c ON c.company_id = t.company_id WHERE c.run_id = ? "
+                   "ORDER BY c.input_position, c.company_id, t.position")
+        yield from self._sheet_rows(table, self._read(sql, (self.run_id,)))
+
+    @staticmethod
+    def _sheet_rows(table: str, rows: Iterator[tuple]) -> Iterator[List]:
+        for row in rows:
+            row = list(row)
+            if table == 'offices':
+                row[-1] = bool(row[-1])
+            yield row
+
+    def _read(self, sql: str, params: tuple = ()) -> Iterator[tuple]:
+        # A connection per read: in WAL mode it sees a consistent snapshot and never blocks the writer
+        conn = sqlite3.connect(self._read_uri, uri=True)
+        try:
+            cursor = conn.execute(sql, params)
+            while True:
+                batch = cursor.fetchmany(1000)
+                if not batch:
+                    return
+                yield from batch
+        finally:
+            conn.close()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
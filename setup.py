@@ -5,13 +5,25 @@ setup(
     version="1.0.0",
     description="Web scraper for Net Zero companies data extraction",
     author="Data Engineer",
-    packages=find_packages(),
+    # benchmarks/ and tests/ run from a source checkout and are not installed as top-level packages
+    packages=find_packages(exclude=["benchmarks", "benchmarks.*", "tests", "tests.*"]),
+    py_modules=[
+        "address_matcher", "checkpoint", "cli", "client_matcher", "company_sources", "discovery", "dom_index",
+        "exporters", "fingerprints", "frontier", "http_cache", "main", "metrics", "parsers", "pipeline",
+        "politeness", "profiling", "records", "result_store", "structured_data", "transport", "work_queue"
+    ],
+    entry_points={
+        "console_scripts": ["net-zero-scraper=cli:main"]
+    },
     install_requires=[
         "requests>=2.31.0",
         "beautifulsoup4>=4.12.2",
-        "pandas>=2.0.3",
         "openpyxl>=3.1.2",
         "lxml>=4.9.3"
     ],
+    extras_require={
+        # Only the legacy DataFrame exporter in benchmarks/export.py uses pandas
+        "bench": ["pandas>=2.0.3"]
+    },
     python_requires=">=3.8"
-)
\ No newline at end of file
+)
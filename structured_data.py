@@ -0,0 +1,219 @@
+import json
+import logging
+import re
+from typing import Dict, Iterator, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# schema.org types whose description and address describe the company or one of its sites
+ORGANIZATION_TYPES = frozenset({'Organization', 'Corporation', 'LocalBusiness', 'NGO', 'OnlineBusiness',
+                                'ProfessionalService', 'GovernmentOrganization', 'Place'})
+ARTICLE_TYPES = frozenset({'NewsArticle', 'Article', 'BlogPosting', 'Report', 'AnalysisNewsArticle',
+                           'ReportageNewsArticle', 'TechArticle'})
+ADDRESS_FIELDS = ('streetAddress', 'addressLocality', 'addressRegion', 'postalCode', 'addressCountry')
+
+# Typed nodes read per page, so a huge @graph or product catalogue cannot stall extraction
+MAX_NODES = 500
+MAX_DEPTH = 20
+
+_ISO_DATE_RE = re.compile(r'\d{4}-\d{2}-\d{2}')
+# HTML comment or CDATA wrappers some CMSs put around the JSON
+_JSON_WRAPPER_RE = re.compile(r'^\s*(?:<!--|(?://\s*)?<!\[CDATA\[)|(?:-->|(?://\s*)?\]\]>)\s*$')
+# Microdata elements whose value is an attribute rather than their text
+_VALUE_ATTRIBUTES = {'meta': 'content', 'a': 'href', 'link': 'href', 'area': 'href', 'img': 'src',
+                     'audio': 'src', 'video': 'src', 'source': 'src', 'iframe': 'src', 'embed': 'src',
+                     'object': 'data', 'time': 'datetime', 'data': 'value', 'meter': 'value'}
+
+
+def _type_names(node: Dict) -> List[str]:
+    """'@type' values without their vocabulary prefix ('https://schema.org/Organization' -> 'Organization')"""
+    types = node.get('@type') or []
+    if isinstance(types, str):
+        types = types.split()
+    elif not isinstance(types, list):
+        types = [types]
+    return [str(t).rsplit('/', 1)[-1].rsplit(':', 1)[-1] for t in types]
+
+
+def _first(value):
+    while isinstance(value, list):
+        value = value[0] if value else None
+    return value
+
+
+def _text(value) -> str:
+    """A property as plain text: the string itself, or the name/@value of a nested object"""
+    value = _first(value)
+    if isinstance(value, dict):
+        value = value.get('name') or value.get('@value') or value.get('@id')
+        value = _first(value)
+    return ' '.join(value.split()) if isinstance(value, str) else ''
+
+
+def _values(value) -> List:
+    return value if isinstance(value, list) else [value]
+
+
+def _date(value) -> str:
+    text = _text(value)
+    match = _ISO_DATE_RE.match(text)
+    return match.group() if match else text
+
+
+def _format_address(value) -> str:
+    """One line from a PostalAddress object, or the address string itself"""
+    if isinstance(value, dict):
+        return ', '.join(part for part in (_text(value.get(field)) for field in ADDRESS_FIELDS) if part)
+    return _text(value)
+
+
+def _microdata_value(value):
+    """Resolve an itemprop element to its value the way the microdata spec does"""
+    if isinstance(value, dict):
+        return {key: [_microdata_value(v) for v in values] if key != '@type' else values
+                for key, values in value.items()}
+    attribute = _VALUE_ATTRIBUTES.get(value.name)
+    if attribute and value.get(attribute) is not None:
+        return value.get(attribute)
+    return value.get_text()
+
+
+def _typed_nodes(data, depth: int = 0) -> Iterator[Dict]:
+    """Every object with an @type in a JSON-LD document, in document order"""
+    if depth > MAX_DEPTH:
+        return
+    if isinstance(data, list):
+        for item in data:
+            yield from _typed_nodes(item, depth + 1)
+    elif isinstance(data, dict):
+        if '@type' in data:
+            yield data
+        for key, value in data.items():
+            if isinstance(value, (dict, list)):
+                yield from _typed_nodes(value, depth + 1)
+
+
+class StructuredData:
+    """Description, addresses and dated news items a page declares as schema.org data or OpenGraph tags
+
+    JSON-LD scripts and microdata items are read into the same nested
+    object shape, so one set of rules serves both. Each field remembers
+    which source filled it ('json-ld', 'microdata' or 'opengraph').
+    """
+
+    def __init__(self, page):
+        self.description = ''
+        self.description_source = ''
+        self.offices: List[Dict] = []
+        self.offices_source = ''
+        self.news: List[Dict] = []
+        self.news_source = ''
+
+        nodes = list(self._nodes(page))
+        self._read_description(nodes)
+        self._read_offices(nodes)
+        self._read_news(nodes)
+        if not self.news:
+            self._read_opengraph_article(page)
+
+    def _nodes(self, page) -> Iterator[Tuple[str, Dict]]:
+        count = 0
+        for source, documents in (('json-ld', self._json_ld(page.json_ld)),
+                                  ('microdata', (_microdata_value(item) for item in page.microdata))):
+            for document in documents:
+                for node in _typed_nodes(document):
+                    yield source, node
+                    count += 1
+                    if count >= MAX_NODES:
+                        return
+
+    @staticmethod
+    def _json_ld(scripts: List[str]) -> Iterator:
+        for script in scripts:
+            try:
+                yield json.loads(_JSON_WRAPPER_RE.sub('', script))
+            except ValueError as e:
+                logger.debug(f"Skipping malformed JSON-LD: {e}")
+
+    def _read_description(self, nodes: List[Tuple[str, Dict]]):
+        for source, node in nodes:
+            if ORGANIZATION_TYPES.intersection(_type_names(node)):
+                description = _text(node.get('description'))
+                if len(description) > 50:
+                    self.description, self.description_source = description, source
+                    return
+
+    def _read_offices(self, nodes: List[Tuple[str, Dict]]):
+        seen = set()
+        sources = []
+        hq = None
+        for source, node in nodes:
+            types = _type_names(node)
+            if ORGANIZATION_TYPES.intersection(types):
+                # The first organization on a page is the company itself: its own address is the headquarters
+                is_hq = hq is None
+                hq = False
+                addresses = [(address, is_hq) for address in _values(node.get('address'))]
+                for location in _values(node.get('location')):
+                    if isinstance(location, dict):
+                        addresses.extend((address, False) for address in _values(location.get('address')))
+            elif 'PostalAddress' in types:
+                addresses = [(node, False)]
+            else:
+                continue
+            for address, is_hq in addresses:
+                formatted = _format_address(address)
+                if not formatted or formatted.lower() in seen:
+                    continue
+                seen.add(formatted.lower())
+                self.offices.append({
+                    'location': formatted,
+                    'is_hq': is_hq or 'headquarters' in formatted.lower(),
+                    'address': formatted
+                })
+                sources.append(source)
+        self.offices_source = '+'.join(dict.fromkeys(sources))
+
+    def _read_news(self, nodes: List[Tuple[str, Dict]]):
+        seen = set()
+        sources = []
+        for source, node in nodes:
+            if not ARTICLE_TYPES.intersection(_type_names(node)):
+                continue
+            title = _text(node.get('headline')) or _text(node.get('name'))
+            date = _date(node.get('datePublished') or node.get('dateCreated'))
+            # Same minimum title length as the heuristic parser; undated items are left to it
+            if len(title) < 10 or not date or title in seen:
+                continue
+            seen.add(title)
+            summary = _text(node.get('description'))
+            self.news.append({
+                'title': title,
+                'date': date,
+                'url': _text(node.get('url')) or _text(node.get('mainEntityOfPage')),
+                'summary': summary[:200] + "..." if summary else ""
+            })
+            sources.append(source)
+        self.news_source = '+'.join(dict.fromkeys(sources))
+
+    def _read_opengraph_article(self, page):
+        """The page itself, when it is an article with a publication time"""
+        og_type = page.find_meta('property', 'og:type')
+        if not og_type or og_type.get('content', '').strip().lower() != 'article':
+            return
+        published = page.find_meta('property', 'article:published_time')
+        title = page.find_meta('property', 'og:title')
+        date = _date(published.get('content')) if published else ''
+        title = _text(title.get('content')) if title else ''
+        if len(title) < 10 or not date:
+            return
+        url = page.find_meta('property', 'og:url')
+        summary = page.find_meta('property', 'og:description')
+        summary = _text(summary.get('content')) if summary else ''
+        self.news.append({
+            'title': title,
+            'date': date,
+            'url': _text(url.get('content')) if url else '',
+            'summary': summary[:200] + "..." if summary else ""
+        })
+        self.news_source = 'opengraph'
@@ -0,0 +1,23 @@
+import logging
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.memory import MAX_KB_PER_COMPANY, peak_kb_per_company  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def quiet_logs():
+    logging.disable(logging.CRITICAL)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+@pytest.mark.parametrize('parser', ['lxml', 'html.parser'])
+def test_peak_memory_per_in_flight_company_stays_under_ceiling(parser):
+    # Same measurement as `python -m benchmarks.memory`: 32 companies with 60 KB pages held at once
+    peak = peak_kb_per_company(parser, count=32, page_kb=60)
+    assert peak <= MAX_KB_PER_COMPANY, f"{peak:.0f} KB peak per company with {parser}"
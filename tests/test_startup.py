@@ -0,0 +1,31 @@
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.export import synthetic_record  # noqa: E402
+from benchmarks.startup import CLI, HEAVY_MODULES, import_times  # noqa: E402
+
+
+@pytest.fixture(scope='module')
+def records(tmp_path_factory):
+    path = tmp_path_factory.mktemp('startup') / 'records.jsonl'
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(100):
+            f.write(json.dumps(synthetic_record(i)) + '\n')
+    return str(path)
+
+
+@pytest.mark.parametrize('command', ['help', 'stats', 'export json'])
+def test_light_commands_do_not_import_heavy_dependencies(command, records, tmp_path):
+    args = {'help': [CLI, '--help'],
+            'stats': [CLI, 'stats', '--input-jsonl', records],
+            'export json': [CLI, 'export', '--input-jsonl', records, '--format', 'json',
+                            '--json', str(tmp_path / 'records.json')]}[command]
+    imported = import_times(args)
+    assert imported, f"{command} did not run"
+    heavy = sorted(module for module in imported if module.split('.')[0] in HEAVY_MODULES)
+    assert not heavy, f"{command} imports {', '.join(heavy)}"
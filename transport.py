@@ -0,0 +1,203 @@
+import logging
+import os
+import random
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Optional
+
+from urllib3.exceptions import NewConnectionError
+
+logger = logging.getLogger(__name__)
+
+# Responses worth another attempt; everything else (404, 403, ...) is final
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# The server is asking us to slow down, not failing
+THROTTLE_STATUSES = frozenset({429, 503})
+# Unreachable hosts fail on connect after this many seconds instead of the full read timeout
+CONNECT_TIMEOUT = 5.0
+
+
+def is_dns_failure(error: Exception) -> bool:
+    """Whether a requests ConnectionError came from a hostname that does not resolve"""
+    reason = getattr(error.args[0], 'reason', None) if error.args else None
+    if not isinstance(reason, NewConnectionError):
+        return False
+    # urllib3 2 raises NameResolutionError; 1.x only says so in the message
+    return type(reason).__name__ == 'NameResolutionError' or 'Name or service not known' in str(reason) \
+        or 'getaddrinfo failed' in str(reason)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _shutdown(response):
+    """Shut down a streamed response's connection, so a read blocked in another thread returns at once"""
+    # close() would first wait for the reading thread to release the buffered reader; shutting down
+    # a duplicate of the socket's descriptor acts on the connection itself without that lock
+    try:
+        with socket.socket(fileno=os.dup(response.raw.fileno())) as sock:
+            sock.shutdown(socket.SHUT_RDWR)
+    except (OSError, ValueError):
+        # Already finished and closed
+        pass
+
+
+class DeadlineExceeded(Exception):
+    """A request could not be made or finished within its company's time budget"""
+
+
+class Deadline:
+    """Time budget for everything fetched on behalf of one company
+
+    Request timeouts, politeness waits and retry backoff are cut to the time
+    that is left, and nothing new starts once it is used up, so a slow site
+    costs at most about `seconds`. None means no limit. URLs given up on
+    because the budget ran out are collected in `truncated`.
+    """
+
+    def __init__(self, seconds: Optional[float] = None):
+        self.seconds = seconds
+        self.expires = time.monotonic() + seconds if seconds else None
+        self.truncated: List[str] = []
+        self._lock = threading.Lock()
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left, or None without a limit"""
+        return None if self.expires is None else max(0.0, self.expires - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.expires is not None and time.monotonic() >= self.expires
+
+    def timeout(self, seconds: float) -> float:
+        """A request timeout cut to the time that is left"""
+        remaining = self.remaining()
+        return seconds if remaining is None else max(0.001, min(seconds, remaining))
+
+    @contextmanager
+    def guard(self, response):
+        """Cut a streamed response's connection when the deadline passes
+
+        Read timeouts apply to each read, so a body that keeps trickling in
+        would otherwise download past the deadline.
+        """
+        if self.expires is None:
+            yield
+            return
+        timer = threading.Timer(self.remaining(), _shutdown, (response,))
+        timer.daemon = True
+        timer.start()
+        try:
+            yield
+        finally:
+            timer.cancel()
+
+    def truncate(self, url: str):
+        """Note a URL that was skipped or abandoned for lack of time"""
+        with self._lock:
+            if url not in self.truncated:
+                self.truncated.append(url)
+
+
+class RetryPolicy:
+    """How often and how long to back off before retrying a failed request
+
+    Backoff is exponential with full jitter, so hosts that fail together are
+    not retried in lockstep. A Retry-After longer than `max_backoff` is not
+    waited for at all: a worker thread is worth more than one page.
+    """
+
+    def __init__(self, retries: int = 2, backoff: float = 1.0, max_backoff: float = 30.0):
+        self.retries = max(0, retries)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> Optional[float]:
+        """Seconds to sleep before retry number `attempt` + 1, or None to give up"""
+        if attempt >= self.retries:
+            return None
+        if retry_after is not None and retry_after > self.max_backoff:
+            return None
+        jittered = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+        return max(jittered, retry_after or 0.0)
+
+
+class _Circuit:
+    def __init__(self, cooldown: float):
+        self.failures = 0
+        self.cooldown = cooldown
+        self.open_until = 0.0
+        self.trial = False
+
+
+class CircuitBreaker:
+    """Per-host circuit breaker that stops spending requests on hosts that keep failing
+
+    After `failures` consecutive failed attempts the circuit opens and requests
+    to the host fail immediately. Once `cooldown` seconds have passed a single
+    trial request is let through: success closes the circuit, failure opens it
+    again for twice as long (up to `max_cooldown`).
+    """
+
+    def __init__(self, failures: int = 5, cooldown: float = 60.0, max_cooldown: float = 900.0):
+        self.failures = max(1, failures)
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.stats = {'opened': 0, 'skipped': 0}
+        self._lock = threading.Lock()
+        self._circuits: Dict[str, _Circuit] = {}
+
+    def allow(self, host: str) -> bool:
+        """Whether a request to the host may go out now"""
+        with self._lock:
+            circuit = self._circuits.get(host)
+            if circuit is None or circuit.failures < self.failures:
+                return True
+            if time.monotonic() >= circuit.open_until and not circuit.trial:
+                circuit.trial = True
+                return True
+            self.stats['skipped'] += 1
+            return False
+
+    def success(self, host: str):
+        with self._lock:
+            self._circuits.pop(host, None)
+
+    def release(self, host: str):
+        """Give up a request that ended without a verdict (e.g. abandoned at a deadline), so a trial can run again"""
+        with self._lock:
+            circuit = self._circuits.get(host)
+            if circuit:
+                circuit.trial = False
+
+    def failure(self, host: str):
+        with self._lock:
+            circuit = self._circuits.setdefault(host, _Circuit(self.cooldown))
+            circuit.failures += 1
+            if circuit.trial:
+                # The trial request failed: back off harder before the next one
+                circuit.trial = False
+                circuit.cooldown = min(self.max_cooldown, circuit.cooldown * 2)
+            elif circuit.failures != self.failures:
+                return
+            circuit.open_until = time.monotonic() + circuit.cooldown
+            self.stats['opened'] += 1
+        logger.warning(f"Circuit open for {host}: {circuit.failures} consecutive failures, "
+                       f"pausing requests for {circuit.cooldown:.0f}s")
+
+    def log_stats(self):
+        logger.info("Circuit Breaker Summary:")
+        logger.info(f"  Circuits opened: {self.stats['opened']}, "
+                    f"requests skipped for failing hosts: {self.stats['skipped']}")
@@ -0,0 +1,213 @@
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional
+from urllib.parse import quote
+
+from result_store import ResultStore
+
+logger = logging.getLogger(__name__)
+
+STATES = ('pending', 'leased', 'done', 'failed')
+
+QUEUE_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS queue (
+        company_id INTEGER PRIMARY KEY,
+        company TEXT NOT NULL,
+        state TEXT NOT NULL DEFAULT 'pending',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        worker TEXT,
+        lease_expires REAL,
+        error TEXT,
+        updated_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_queue_state ON queue (state, company_id);
+    CREATE INDEX IF NOT EXISTS idx_queue_lease ON queue (state, lease_expires);
+    CREATE INDEX IF NOT EXISTS idx_queue_worker ON queue (worker, state);
+"""
+
+# A lease that ran out is retried, or failed for good once the company has had all its attempts
+_RETRY_OR_FAIL = "state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, worker = NULL, lease_expires = NULL"
+
+
+def default_worker_id() -> str:
+    """host:pid, unique among the workers sharing a queue"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _counts(conn: sqlite3.Connection) -> Dict[str, int]:
+    counts = dict.fromkeys(STATES, 0)
+    counts.update(conn.execute('SELECT state, COUNT(*) FROM queue GROUP BY state').fetchall())
+    return counts
+
+
+def queue_counts(path: str) -> Dict[str, int]:
+    """Companies per state in a database's work queue, read-only; empty if it has no queue"""
+    conn = sqlite3.connect(f"file:{quote(os.path.abspath(path))}?mode=ro", uri=True)
+    try:
+        if not conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'queue'").fetchone():
+            return {}
+        return _counts(conn)
+    finally:
+        conn.close()
+
+
+class WorkQueue(ResultStore):
+    """Companies to scrape shared by many workers, kept in the result store's database
+
+    Each company is pending, leased (claimed by one worker until its lease
+    expires), done or failed. Workers claim a batch at a time and renew
+    their leases with heartbeats while they work (see keep_alive). A
+    finished record is stored and its company marked done in one
+    transaction, so a company is never done without its rows, and a worker
+    whose lease was taken over by another cannot overwrite the newer record.
+
+    A lease that runs out (the worker crashed, hung or lost its machine) is
+    claimed again by the next worker; after max_attempts leases a company
+    is failed instead. The tables are the result store's, so the results are
+    exported and inspected the same way (`net-zero-scraper export --store`).
+
+    Workers may run on several machines sharing the database's filesystem.
+    WAL only works within one host, so they then all open it with wal=False;
+    lease expiry uses the wall clock, so their clocks must be kept in sync.
+    """
+
+    def __init__(self, path: str, lease_seconds: float = 120.0, max_attempts: int = 3, wal: bool = True):
+        super().__init__(path, wal=wal)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max(1, max_attempts)
+        # Claims from many workers queue up for the write lock instead of failing
+        self._conn.execute('PRAGMA busy_timeout = 60000')
+        self._conn.executescript(QUEUE_SCHEMA)
+        self.stats = {'claimed': 0, 'completed': 0, 'retried': 0, 'failed': 0, 'lost': 0, 'expired': 0}
+
+    def add(self, companies: Iterable[Dict], batch_size: int = 1000) -> int:
+        """Queue companies as pending; ones already in the queue keep their state. Returns how many were added"""
+        added = 0
+        batch = []
+        for company in companies:
+            batch.append((company['id'], json.dumps(company, ensure_ascii=False), time.time()))
+            if len(batch) >= batch_size:
+                added += self._add(batch)
+                batch = []
+        if batch:
+            added += self._add(batch)
+        return added
+
+    def _add(self, rows: List[tuple]) -> int:
+        with self._lock, self._conn:
+            return self._conn.executemany('INSERT INTO queue (company_id, company, updated_at) VALUES (?, ?, ?) '
+                                          'ON CONFLICT (company_id) DO NOTHING', rows).rowcount
+
+    def claim(self, worker: str, count: int) -> List[Dict]:
+        """Lease up to count pending companies to the worker, in id order"""
+        now = time.time()
+        with self._lock, self._conn:
+            # Take the write lock before reading, so two workers never select the same companies
+            self._conn.execute('BEGIN IMMEDIATE')
+            expired = self._conn.execute(
+                f"UPDATE queue SET error = 'lease of ' || worker || ' expired', updated_at = ?, {_RETRY_OR_FAIL} "
+                "WHERE state = 'leased' AND lease_expires < ?", (now, self.max_attempts, now)).rowcount
+            rows = self._conn.execute("SELECT company_id, company FROM queue WHERE state = 'pending' "
+                                      "ORDER BY company_id LIMIT ?", (count,)).fetchall()
+            self._conn.executemany("UPDATE queue SET state = 'leased', worker = ?, lease_expires = ?, "
+                                   "attempts = attempts + 1, updated_at = ? WHERE company_id = ?",
+                                   [(worker, now + self.lease_seconds, now, company_id) for company_id, _ in rows])
+        if expired:
+            logger.warning(f"Re-queued {expired} companies whose lease expired")
+        self.stats['expired'] += expired
+        self.stats['claimed'] += len(rows)
+        return [json.loads(company) for _, company in rows]
+
+    def heartbeat(self, worker: str) -> int:
+        """Extend all of the worker's leases by lease_seconds; returns how many it still holds"""
+        with self._lock, self._conn:
+            return self._conn.execute("UPDATE queue SET lease_expires = ? WHERE worker = ? AND state = 'leased'",
+                                      (time.time() + self.lease_seconds, worker)).rowcount
+
+    @contextmanager
+    def keep_alive(self, worker: str):
+        """Send the worker's heartbeat every third of the lease time until the block exits"""
+        stop = threading.Event()
+
+        def beat():
+            while not stop.wait(self.lease_seconds / 3):
+                try:
+                    self.heartbeat(worker)
+                except sqlite3.Error as e:
+                    logger.warning(f"Heartbeat of {worker} failed: {e}")
+
+        thread = threading.Thread(target=beat, name=f"heartbeat {worker}", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+
+    def complete(self, worker: str, company_id, record: Dict) -> bool:
+        """Store the record and mark the company done atomically; False (nothing stored) if the lease was lost"""
+        rows = self._rows(record)
+        with self._lock, self._conn:
+            done = self._conn.execute("UPDATE queue SET state = 'done', lease_expires = NULL, error = NULL, "
+                                      "updated_at = ? WHERE company_id = ? AND worker = ? AND state = 'leased'",
+                                      (time.time(), company_id, worker)).rowcount
+            if done:
+                self._write(record['company_id'], *rows)
+        if not done:
+            logger.warning(f"Lease on company {company_id} was lost; its record is discarded")
+        self.stats['completed' if done else 'lost'] += 1
+        return bool(done)
+
+    def fail(self, worker: str, company_id, error: str) -> Optional[str]:
+        """Give up the lease after an error: the company is retried, or failed once out of attempts
+
+        Returns the company's new state, or None if the lease was already lost.
+        """
+        with self._lock, self._conn:
+            updated = self._conn.execute(f"UPDATE queue SET error = ?, updated_at = ?, {_RETRY_OR_FAIL} "
+                                         "WHERE company_id = ? AND worker = ? AND state = 'leased'",
+                                         (error, time.time(), self.max_attempts, company_id, worker)).rowcount
+            state = (self._conn.execute('SELECT state FROM queue WHERE company_id = ?', (company_id,)).fetchone()[0]
+                     if updated else None)
+        if state:
+            self.stats['retried' if state == 'pending' else 'failed'] += 1
+        return state
+
+    def release(self, worker: str, company_ids: Iterable):
+        """Hand leased companies the worker has not started back to the queue, without using up an attempt"""
+        with self._lock, self._conn:
+            self._conn.executemany("UPDATE queue SET state = 'pending', worker = NULL, lease_expires = NULL, "
+                                   "attempts = attempts - 1 WHERE company_id = ? AND worker = ? AND state = 'leased'",
+                                   [(company_id, worker) for company_id in company_ids])
+
+    def next_expiry(self) -> Optional[float]:
+        """Seconds until the first outstanding lease runs out (0 if one already has), None if none are leased"""
+        with self._lock:
+            expires = self._conn.execute("SELECT MIN(lease_expires) FROM queue WHERE state = 'leased'").fetchone()[0]
+        return None if expires is None else max(0.0, expires - time.time())
+
+    def counts(self) -> Dict[str, int]:
+        """Companies per state"""
+        with self._lock:
+            return _counts(self._conn)
+
+    # Every worker's run stores into the same queue, so its results are the whole database
+    def run_records(self) -> Iterator[Dict]:
+        return self.iter_records()
+
+    def run_table_rows(self, sheet: str) -> Iterator[List]:
+        return self.table_rows(sheet)
+
+    def log_stats(self):
+        counts = self.counts()
+        logger.info("Work Queue Summary:")
+        logger.info(f"  This worker: {self.stats['completed']} completed, {self.stats['retried']} errors retried, "
+                    f"{self.stats['failed']} failed, {self.stats['lost']} leases lost, "
+                    f"{self.stats['expired']} expired leases re-queued")
+        logger.info("  Queue: " + ', '.join(f"{counts[state]} {state}" for state in STATES))